@@ -0,0 +1,419 @@
+"""A local stand-in for the ClickUp API used by the benchmarks.
+
+Serves a generated workspace (teams, spaces, folders, lists and paginated
+tasks) with configurable latency, payload size and rate limiting, so client
+throughput can be measured without touching the real API or its quota.
+
+Run it on its own to point the CLI at it by hand::
+
+    python benchmarks/mock_server.py --port 8765 --latency 0.02
+    python src/main.py --base-url http://127.0.0.1:8765/api/v2/ list-teams
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+API_PREFIX = "/api/v2/"
+TASK_PAGE_SIZE = 100
+
+
+@dataclass
+class MockConfig:
+    """The shape of the generated workspace and how the server behaves."""
+
+    teams: int = 2
+    spaces_per_team: int = 10
+    folders_per_space: int = 2
+    lists_per_folder: int = 3
+    folderless_lists: int = 1
+    tasks_per_list: int = 150
+    latency: float = 0.0
+    jitter: float = 0.0
+    payload_bytes: int = 0
+    rate_limit: int = 100_000
+    throttle_every: int = 0
+    retry_after: float = 0.0
+    # Requests served at once; more wait their turn, so latency grows with load.
+    capacity: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class Workspace:
+    """Generates the objects served by the mock server.
+
+    IDs encode their ancestry (``1_0`` is space 0 of team 1) so every
+    endpoint can be answered without storing the whole tree. Spaces created,
+    renamed or deleted through the API are tracked on top of it.
+    """
+
+    def __init__(self, config: MockConfig):
+        self.config = config
+        self.padding = "x" * config.payload_bytes
+        self._lock = threading.Lock()
+        self._created: Dict[str, List[Dict[str, Any]]] = {}
+        self._renamed: Dict[str, str] = {}
+        self._deleted = set()
+        self._next_id = 0
+        self._webhooks: Dict[str, Dict[str, Any]] = {}
+
+    def _object(self, object_id: str, name: str, **fields) -> Dict[str, Any]:
+        obj = {"id": object_id, "name": name, **fields}
+        if self.padding:
+            obj["description"] = self.padding
+        return obj
+
+    def team_ids(self) -> List[str]:
+        return [str(index + 1) for index in range(self.config.teams)]
+
+    def teams(self) -> List[Dict[str, Any]]:
+        return [self._object(team_id, f"Team {team_id}", color="#7b68ee")
+                for team_id in self.team_ids()]
+
+    def _space(self, space_id: str) -> Dict[str, Any]:
+        name = self._renamed.get(space_id, f"Space {space_id}")
+        return self._object(space_id, name, private=False,
+                            statuses=[{"status": "open"}, {"status": "closed"}])
+
+    def spaces(self, team_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            spaces = [self._space(f"{team_id}_{index}")
+                      for index in range(self.config.spaces_per_team)]
+            spaces += [dict(space, name=self._renamed.get(space["id"], space["name"]))
+                       for space in self._created.get(team_id, [])]
+            return [space for space in spaces if space["id"] not in self._deleted]
+
+    def space(self, space_id: str) -> Optional[Dict[str, Any]]:
+        team_id = space_id.split("_", 1)[0]
+        return next((space for space in self.spaces(team_id) if space["id"] == space_id),
+                    None)
+
+    def create_space(self, team_id: str, name: str) -> Dict[str, Any]:
+        with self._lock:
+            self._next_id += 1
+            space = self._object(f"{team_id}_new{self._next_id}", name, private=False)
+            self._created.setdefault(team_id, []).append(space)
+            return space
+
+    def rename_space(self, space_id: str, name: str):
+        with self._lock:
+            self._renamed[space_id] = name
+
+    def delete_space(self, space_id: str):
+        with self._lock:
+            self._deleted.add(space_id)
+
+    def _lists(self, parent_id: str, count: int, prefix: str = "") -> List[Dict[str, Any]]:
+        return [self._object(f"{parent_id}_{prefix}{index}", f"List {parent_id}_{prefix}{index}",
+                             task_count=self.config.tasks_per_list)
+                for index in range(count)]
+
+    def folders(self, space_id: str) -> List[Dict[str, Any]]:
+        return [self._object(folder_id, f"Folder {folder_id}",
+                             lists=self._lists(folder_id, self.config.lists_per_folder))
+                for folder_id in (f"{space_id}_{index}"
+                                  for index in range(self.config.folders_per_space))]
+
+    def folder_lists(self, folder_id: str) -> List[Dict[str, Any]]:
+        return self._lists(folder_id, self.config.lists_per_folder)
+
+    def folderless_lists(self, space_id: str) -> List[Dict[str, Any]]:
+        return self._lists(space_id, self.config.folderless_lists, prefix="l")
+
+    def _task(self, list_id: str, index: int) -> Dict[str, Any]:
+        task_id = f"{list_id}_{index}"
+        return self._object(
+            task_id, self._renamed.get(task_id, f"Task {task_id}"),
+            status={"status": "closed" if index % 5 == 0 else "open"},
+            date_updated=str(1_700_000_000_000 + index * 1000),
+            list={"id": list_id}, tags=[], assignees=[])
+
+    def tasks(self, list_id: str, page: int) -> Tuple[List[Dict[str, Any]], bool]:
+        start = page * TASK_PAGE_SIZE
+        end = min(start + TASK_PAGE_SIZE, self.config.tasks_per_list)
+        tasks = [self._task(list_id, index) for index in range(start, end)]
+        return tasks, end >= self.config.tasks_per_list
+
+    def task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        list_id, _, index = task_id.rpartition("_")
+        if task_id in self._deleted or not index.isdigit():
+            return None
+        if int(index) >= self.config.tasks_per_list:
+            return None
+        return dict(self._task(list_id, int(index)), team_id=task_id.split("_", 1)[0])
+
+    def rename_task(self, task_id: str, name: str):
+        with self._lock:
+            self._renamed[task_id] = name
+
+    def create_webhook(self, team_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            self._next_id += 1
+            webhook_id = f"wh{self._next_id}"
+            webhook = {"id": webhook_id, "userid": 1, "team_id": int(team_id),
+                       "endpoint": payload.get("endpoint", ""),
+                       "events": payload.get("events", ["*"]),
+                       "space_id": payload.get("space_id"),
+                       "health": {"status": "active", "fail_count": 0},
+                       "secret": f"secret-{webhook_id}"}
+            self._webhooks[webhook_id] = webhook
+            return {"id": webhook_id, "webhook": webhook}
+
+    def webhooks(self, team_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [webhook for webhook in self._webhooks.values()
+                    if str(webhook["team_id"]) == team_id]
+
+    def delete_webhook(self, webhook_id: str) -> bool:
+        with self._lock:
+            return self._webhooks.pop(webhook_id, None) is not None
+
+    def team_tasks(self, team_id: str, page: int) -> Tuple[List[Dict[str, Any]], bool]:
+        # Team-wide task pages only cover the first list of each space.
+        list_ids = [f"{team_id}_{index}_0_0" for index in range(self.config.spaces_per_team)]
+        per_list = self.config.tasks_per_list
+        start = page * TASK_PAGE_SIZE
+        end = min(start + TASK_PAGE_SIZE, per_list * len(list_ids))
+        tasks = [self._task(list_ids[index // per_list], index % per_list)
+                 for index in range(start, end)]
+        return tasks, end >= per_list * len(list_ids)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this, delayed ACKs
+    # add ~40 ms to every keep-alive response.
+    disable_nagle_algorithm = True
+    server: "_Server"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status: int, body: Any = None, headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(body if body is not None else {}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _handle(self, method: str):
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length)) if length else {}
+        mock = self.server.mock
+        config = mock.config
+        with mock.serving():
+            if config.latency or config.jitter:
+                time.sleep(config.latency + random.uniform(0, config.jitter))
+
+        headers, throttled = mock.admit()
+        if throttled:
+            self._reply(429, {"err": "Rate limit reached", "ECODE": "APP_002"}, headers)
+            return
+        url = urlsplit(self.path)
+        if not url.path.startswith(API_PREFIX):
+            self._reply(404, {"err": "Route not found"}, headers)
+            return
+        segments = url.path[len(API_PREFIX):].strip("/").split("/")
+        page = int(parse_qs(url.query).get("page", ["0"])[0])
+        status, body = mock.route(method, segments, page, payload)
+        self._reply(status, body, headers)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    mock: "MockClickUpServer"
+
+
+class MockClickUpServer:
+    """A threaded HTTP server emulating the ClickUp endpoints the client uses.
+
+    Usable as a context manager; ``url`` is the base URL to give the client.
+    """
+
+    def __init__(self, config: Optional[MockConfig] = None, host: str = "127.0.0.1",
+                 port: int = 0):
+        """
+        Initializes the MockClickUpServer.
+
+        Args:
+            config: The workspace shape and behaviour, defaults when omitted.
+            host: The interface to listen on.
+            port: The port to listen on, or 0 for any free port.
+        """
+        self.config = config or MockConfig()
+        self.workspace = Workspace(self.config)
+        self.requests = 0
+        self.throttled = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+        self._slots = (threading.BoundedSemaphore(self.config.capacity)
+                       if self.config.capacity else None)
+        self._window_start = time.time()
+        self._window_count = 0
+        self._httpd = _Server((host, port), _Handler)
+        self._httpd.mock = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def serve_forever(self):
+        """Serves requests in the calling thread until stop() is called."""
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+
+    def start(self) -> "MockClickUpServer":
+        """Serves requests in a background thread."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "MockClickUpServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @contextmanager
+    def serving(self):
+        """Tracks a request in flight, waiting for a slot when capacity is limited."""
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            if self._slots is None:
+                yield
+            else:
+                with self._slots:
+                    yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def admit(self) -> Tuple[Dict[str, str], bool]:
+        """Counts a request against the rate limit.
+
+        Returns the ``X-RateLimit-*`` headers to send and whether the request
+        is rejected, either because the one-minute window is exhausted or
+        because it is one of the ``throttle_every`` forced rejections.
+        """
+        config = self.config
+        with self._lock:
+            self.requests += 1
+            now = time.time()
+            if now - self._window_start >= 60:
+                self._window_start, self._window_count = now, 0
+            self._window_count += 1
+            reset = self._window_start + 60
+            headers = {
+                "X-RateLimit-Limit": str(config.rate_limit),
+                "X-RateLimit-Remaining": str(max(0, config.rate_limit - self._window_count)),
+                "X-RateLimit-Reset": str(int(reset)),
+            }
+            throttled = self._window_count > config.rate_limit or bool(
+                config.throttle_every and self.requests % config.throttle_every == 0)
+            if throttled:
+                self.throttled += 1
+                retry_after = (config.retry_after if self._window_count <= config.rate_limit
+                               else reset - now)
+                headers["Retry-After"] = f"{retry_after:g}"
+        return headers, throttled
+
+    def route(self, method: str, segments: List[str], page: int,
+              payload: Dict[str, Any]) -> Tuple[int, Any]:
+        """Answers one API call with a status code and a JSON body."""
+        workspace = self.workspace
+        resource, object_id, child = (segments + [None, None])[:3]
+        if method == "GET":
+            if segments == ["team"]:
+                return 200, {"teams": workspace.teams()}
+            if resource == "team" and child == "space":
+                return 200, {"spaces": workspace.spaces(object_id)}
+            if resource == "team" and child == "task":
+                tasks, last_page = workspace.team_tasks(object_id, page)
+                return 200, {"tasks": tasks, "last_page": last_page}
+            if resource == "space" and child is None:
+                space = workspace.space(object_id)
+                return (200, space) if space else (404, {"err": "Space not found"})
+            if resource == "space" and child == "folder":
+                return 200, {"folders": workspace.folders(object_id)}
+            if resource == "space" and child == "list":
+                return 200, {"lists": workspace.folderless_lists(object_id)}
+            if resource == "folder" and child == "list":
+                return 200, {"lists": workspace.folder_lists(object_id)}
+            if resource == "list" and child == "task":
+                tasks, last_page = workspace.tasks(object_id, page)
+                return 200, {"tasks": tasks, "last_page": last_page}
+            if resource == "task" and child is None:
+                task = workspace.task(object_id)
+                return (200, task) if task else (404, {"err": "Task not found"})
+            if resource == "team" and child == "webhook":
+                return 200, {"webhooks": workspace.webhooks(object_id)}
+        elif method == "POST" and resource == "team" and child == "space":
+            return 200, workspace.create_space(object_id, payload.get("name", ""))
+        elif method == "POST" and resource == "team" and child == "webhook":
+            return 200, workspace.create_webhook(object_id, payload)
+        elif method == "DELETE" and resource == "webhook" and child is None:
+            if workspace.delete_webhook(object_id):
+                return 200, {}
+            return 404, {"err": "Webhook not found"}
+        elif method == "PUT" and resource == "space" and child is None:
+            workspace.rename_space(object_id, payload.get("name", ""))
+            return 200, workspace.space(object_id)
+        elif method == "DELETE" and resource == "space" and child is None:
+            workspace.delete_space(object_id)
+            return 200, {}
+        return 404, {"err": "Route not found"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a mock ClickUp API locally.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    defaults = MockConfig()
+    for name, value in defaults.as_dict().items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+    args = parser.parse_args()
+    config = MockConfig(**{name: getattr(args, name) for name in defaults.as_dict()})
+    server = MockClickUpServer(config, host=args.host, port=args.port)
+    print(f"Serving a mock ClickUp API on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
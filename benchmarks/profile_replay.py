@@ -0,0 +1,103 @@
+"""Profiles CLI commands on a replayed cassette of a large workspace.
+
+The first run records the cassette from the mock server. Later runs replay
+it from memory, so the profile shows JSON parsing, models and output
+rendering rather than the network::
+
+    python benchmarks/profile_replay.py
+    python benchmarks/profile_replay.py --command "--output json list-spaces 1" --sort tottime
+    python benchmarks/profile_replay.py --rerecord --payload-bytes 4096
+"""
+import argparse
+import contextlib
+import cProfile
+import io
+import json
+import os
+import pstats
+import shlex
+import sys
+import tempfile
+import time
+from typing import List
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path[:0] = [HERE, ROOT]
+
+from mock_server import API_PREFIX, MockClickUpServer, MockConfig  # noqa: E402
+from src.transport import open_recording  # noqa: E402
+
+DEFAULT_CASSETTE = os.path.join(tempfile.gettempdir(), "clickup_profile.jsonl.gz")
+DEFAULT_COMMANDS = ["list-spaces 1", "--output json list-spaces 1", "sync"]
+
+
+def run_cli(argv: List[str]):
+    """Runs the CLI in this process with its output discarded."""
+    from src import main as cli
+    sys.argv = ["main.py", "--log-file", "", *argv]
+    with contextlib.redirect_stdout(io.StringIO()):
+        cli.main()
+
+
+def record(path: str, config: MockConfig, commands: List[str], workdir: str):
+    """Records ``commands`` against a fresh mock server into the cassette."""
+    if os.path.exists(path):
+        os.remove(path)
+    with MockClickUpServer(config) as server:
+        for command in commands:
+            run_cli(["--base-url", server.url, "--record", path,
+                     "--mirror", os.path.join(workdir, "record.sqlite"), *shlex.split(command)])
+
+
+def recorded_base_url(path: str) -> str:
+    """Returns the API root the cassette was recorded against."""
+    with open_recording(path) as stream:
+        url = json.loads(stream.readline())["url"]
+    return url[:url.index(API_PREFIX) + len(API_PREFIX)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cassette', default=DEFAULT_CASSETTE,
+                        help='The cassette file (default: %(default)s).')
+    parser.add_argument('--rerecord', action='store_true',
+                        help='Record the cassette again even if it exists.')
+    parser.add_argument('--command', action='append', dest='commands', metavar='ARGS',
+                        help='A CLI command line to profile (repeatable; default: '
+                             f'{", ".join(DEFAULT_COMMANDS)}).')
+    parser.add_argument('--sort', default='cumulative', help='The pstats sort key.')
+    parser.add_argument('--limit', type=int, default=25, help='How many functions to show.')
+    parser.add_argument('--spaces', type=int, default=2000)
+    parser.add_argument('--tasks', type=int, default=2000)
+    parser.add_argument('--payload-bytes', type=int, default=1024)
+    args = parser.parse_args()
+    commands = args.commands or DEFAULT_COMMANDS
+    os.environ.setdefault("CLICKUP_API_TOKEN", "profile")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.rerecord or not os.path.exists(args.cassette):
+            config = MockConfig(teams=1, spaces_per_team=args.spaces, folders_per_space=0,
+                                lists_per_folder=0, folderless_lists=1,
+                                tasks_per_list=max(1, args.tasks // args.spaces),
+                                payload_bytes=args.payload_bytes)
+            started = time.perf_counter()
+            record(args.cassette, config, commands, workdir)
+            print(f"Recorded {args.cassette} ({os.path.getsize(args.cassette) / 1024:.0f} KiB) "
+                  f"in {time.perf_counter() - started:.1f}s.", file=sys.stderr)
+        base_url = recorded_base_url(args.cassette)
+
+        for command in commands:
+            argv = ["--replay", args.cassette, "--base-url", base_url,
+                    "--mirror", os.path.join(workdir, "replay.sqlite"), *shlex.split(command)]
+            profile = cProfile.Profile()
+            started = time.perf_counter()
+            profile.enable()
+            run_cli(argv)
+            profile.disable()
+            print(f"\n== {command}: {time.perf_counter() - started:.3f}s", file=sys.stderr)
+            pstats.Stats(profile, stream=sys.stderr).sort_stats(args.sort).print_stats(args.limit)
+
+
+if __name__ == '__main__':
+    main()
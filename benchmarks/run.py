@@ -0,0 +1,373 @@
+"""Benchmarks the client against the local mock ClickUp server.
+
+Each scenario runs in a fresh child process so its peak RSS is its own.
+Results are printed, compared with the last run recorded for another commit
+and appended to ``benchmarks/results.jsonl``::
+
+    python benchmarks/run.py
+    python benchmarks/run.py --scenario threads --latency 0.02 --concurrency 32
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path[:0] = [HERE, ROOT]
+
+from mock_server import MockClickUpServer, MockConfig  # noqa: E402
+
+DEFAULT_RESULTS = os.path.join(HERE, "results.jsonl")
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Returns the ``q`` quantile of ``values`` by linear interpolation."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def peak_rss_kib(who: int = 0) -> Optional[int]:
+    """Returns the peak resident set size of this process (or its children) in KiB."""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if who else resource.RUSAGE_SELF)
+    # macOS reports bytes, Linux kilobytes.
+    return usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss
+
+
+def _timed(operation: Callable[[], Any], latencies: List[float]):
+    started = time.perf_counter()
+    operation()
+    latencies.append(time.perf_counter() - started)
+
+
+def _space_ids(config: MockConfig) -> List[str]:
+    return [f"{team}_{index}" for team in range(1, config.teams + 1)
+            for index in range(config.spaces_per_team)]
+
+
+def _client(base_url: str, concurrency: int, config: MockConfig, models: bool = False,
+            limiter=None):
+    from src.clickup_client import ClickUpClient
+    from src.rate_limit import RateLimitScheduler
+    return ClickUpClient("benchmark", base_url=base_url, pool_maxsize=concurrency,
+                         scheduler=RateLimitScheduler(requests_per_minute=config.rate_limit),
+                         models=models, limiter=limiter)
+
+
+def scenario_sync(base_url, ops, concurrency, config) -> List[float]:
+    """One request at a time on a single pooled connection."""
+    client = _client(base_url, 1, config)
+    space_ids = _space_ids(config)
+    latencies: List[float] = []
+    for index in range(ops):
+        _timed(lambda: client.get_space(space_ids[index % len(space_ids)]), latencies)
+    client.close()
+    return latencies
+
+
+def scenario_threads(base_url, ops, concurrency, config, limiter=None) -> List[float]:
+    """Many threads sharing one client, as batch does."""
+    client = _client(base_url, concurrency, config, limiter=limiter)
+    space_ids = _space_ids(config)
+    latencies: List[float] = []
+    with ThreadPoolExecutor(concurrency) as executor:
+        list(executor.map(
+            lambda index: _timed(lambda: client.get_space(space_ids[index % len(space_ids)]),
+                                 latencies),
+            range(ops)))
+    client.close()
+    return latencies
+
+
+def scenario_threads_adaptive(base_url, ops, concurrency, config) -> List[float]:
+    """The threads scenario with an AdaptiveLimiter choosing the concurrency."""
+    from src.adaptive import AdaptiveLimiter
+    limiter = AdaptiveLimiter(max_limit=concurrency)
+    return scenario_threads(base_url, ops, concurrency, config, limiter=limiter)
+
+
+def scenario_threads_logged(base_url, ops, concurrency, config) -> List[float]:
+    """The threads scenario with every HTTP attempt logged as JSON at debug level."""
+    from src import logs
+    for handler in logging.getLogger().handlers:
+        handler.setLevel(logging.ERROR)
+    with tempfile.TemporaryDirectory() as workdir:
+        logs.setup_logging(os.path.join(workdir, "benchmark.log"), level=logging.DEBUG,
+                           fmt="json")
+        try:
+            return scenario_threads(base_url, ops, concurrency, config)
+        finally:
+            logs.shutdown_logging()
+
+
+def scenario_async(base_url, ops, concurrency, config) -> List[float]:
+    """AsyncClickUpClient with its concurrency cap."""
+    from src.async_client import AsyncClickUpClient
+    space_ids = _space_ids(config)
+    latencies: List[float] = []
+
+    async def fetch(client, index):
+        started = time.perf_counter()
+        await client.get_space(space_ids[index % len(space_ids)])
+        latencies.append(time.perf_counter() - started)
+
+    async def run():
+        client = AsyncClickUpClient("benchmark", base_url=base_url,
+                                    max_concurrency=concurrency,
+                                    client=_client(base_url, concurrency, config))
+        async with client:
+            await asyncio.gather(*(fetch(client, index) for index in range(ops)))
+
+    asyncio.run(run())
+    return latencies
+
+
+def scenario_stream(base_url, ops, concurrency, config) -> List[float]:
+    """Paginated, streamed task listings; one op is a whole list."""
+    client = _client(base_url, 1, config)
+    latencies: List[float] = []
+    list_ids = [f"{space_id}_0_0" for space_id in _space_ids(config)]
+    for index in range(ops):
+        _timed(lambda: sum(1 for _ in client.iter_tasks(list_ids[index % len(list_ids)])),
+               latencies)
+    client.close()
+    return latencies
+
+
+def _retain(base_url, ops, config, models: bool) -> List[float]:
+    client = _client(base_url, 1, config, models=models)
+    latencies: List[float] = []
+    retained: List[Any] = []
+    list_ids = [f"{space_id}_0_0" for space_id in _space_ids(config)]
+    for index in range(ops):
+        _timed(lambda: retained.extend(client.iter_tasks(list_ids[index % len(list_ids)])),
+               latencies)
+    client.close()
+    return latencies
+
+
+def scenario_retain(base_url, ops, concurrency, config) -> List[float]:
+    """Task listings kept in memory as dicts; compare peak RSS with retain-models."""
+    return _retain(base_url, ops, config, models=False)
+
+
+def scenario_retain_models(base_url, ops, concurrency, config) -> List[float]:
+    """Task listings kept in memory as slotted models."""
+    return _retain(base_url, ops, config, models=True)
+
+
+def scenario_crawl(base_url, ops, concurrency, config) -> List[float]:
+    """Full workspace crawls; one op is a whole crawl."""
+    from src.async_client import AsyncClickUpClient
+    from src.crawler import JsonlSink, crawl_to_sink
+    latencies: List[float] = []
+    with open(os.devnull, "w") as devnull:
+        for _ in range(ops):
+            client = AsyncClickUpClient("benchmark", base_url=base_url,
+                                        max_concurrency=concurrency,
+                                        client=_client(base_url, concurrency, config))
+            _timed(lambda: crawl_to_sink(client, JsonlSink(devnull)), latencies)
+            client.close()
+            client.client.close()
+    return latencies
+
+
+def scenario_cli(base_url, ops, concurrency, config) -> List[float]:
+    """Sequential CLI invocations, dominated by start-up time."""
+    env = dict(os.environ, CLICKUP_API_TOKEN="benchmark", CLICKUP_BASE_URL=base_url)
+    workdir = tempfile.mkdtemp()  # receives the CLI's log file
+    command = [sys.executable, os.path.join(ROOT, "src", "main.py"), "--output", "jsonl",
+               "list-spaces", "1"]
+    latencies: List[float] = []
+    for _ in range(ops):
+        _timed(lambda: subprocess.run(command, env=env, cwd=workdir, check=True,
+                                      stdout=subprocess.DEVNULL), latencies)
+    return latencies
+
+
+def scenario_remote(base_url, ops, concurrency, config) -> List[float]:
+    """Sequential thin-client invocations against a warm agent daemon."""
+    workdir = tempfile.mkdtemp()
+    socket_path = os.path.join(workdir, "agent.sock")
+    env = dict(os.environ, CLICKUP_API_TOKEN="benchmark", CLICKUP_BASE_URL=base_url,
+               CLICKUP_AGENT_SOCKET=socket_path)
+    daemon = subprocess.Popen([sys.executable, os.path.join(ROOT, "src", "main.py"), "serve"],
+                              env=env, cwd=workdir, stdout=subprocess.PIPE)
+    daemon.stdout.readline()  # the daemon announces itself once listening
+    command = [sys.executable, os.path.join(ROOT, "src", "remote.py"), "--output", "jsonl",
+               "list-spaces", "1"]
+    latencies: List[float] = []
+    try:
+        for _ in range(ops):
+            _timed(lambda: subprocess.run(command, env=env, cwd=workdir, check=True,
+                                          stdout=subprocess.DEVNULL), latencies)
+    finally:
+        daemon.terminate()
+        daemon.wait()
+    return latencies
+
+
+SCENARIOS: Dict[str, Callable[..., List[float]]] = {
+    "sync": scenario_sync,
+    "threads": scenario_threads,
+    "threads-logged": scenario_threads_logged,
+    "threads-adaptive": scenario_threads_adaptive,
+    "async": scenario_async,
+    "stream": scenario_stream,
+    "retain": scenario_retain,
+    "retain-models": scenario_retain_models,
+    "crawl": scenario_crawl,
+    "cli": scenario_cli,
+    "remote": scenario_remote,
+}
+# Scenarios whose ops are expensive run fewer of them.
+OPS_DIVISOR = {"stream": 10, "retain": 10, "retain-models": 10, "crawl": 100, "cli": 20, "remote": 20}
+
+
+def run_child(args: argparse.Namespace):
+    """Runs one scenario in this process and prints its measurements as JSON."""
+    logging.basicConfig(level=logging.ERROR)
+    config = MockConfig(**json.loads(args.config))
+    started = time.perf_counter()
+    latencies = SCENARIOS[args.child](args.base_url, args.ops, args.concurrency, config)
+    seconds = time.perf_counter() - started
+    rss = peak_rss_kib(1 if args.child in ("cli", "remote") else 0)
+    print(json.dumps({
+        "ops": len(latencies),
+        "seconds": seconds,
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "peak_rss_kib": rss,
+    }))
+
+
+def run_scenario(server: MockClickUpServer, name: str, ops: int,
+                 concurrency: int) -> Dict[str, Any]:
+    """Runs a scenario in a child process against ``server``."""
+    before = server.requests
+    throttled = server.throttled
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", name,
+         "--base-url", server.url, "--ops", str(ops), "--concurrency", str(concurrency),
+         "--config", json.dumps(server.config.as_dict())],
+        check=True, stdout=subprocess.PIPE, text=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["requests"] = server.requests - before
+    result["throttled"] = server.throttled - throttled
+    result["requests_per_second"] = result["requests"] / result["seconds"]
+    return result
+
+
+def git_commit() -> str:
+    """Returns the short hash of HEAD, suffixed with ``-dirty`` for local changes."""
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=ROOT, stdout=subprocess.PIPE,
+                              stderr=subprocess.DEVNULL, text=True).stdout.strip()
+    commit = git("rev-parse", "--short", "HEAD") or "unknown"
+    return commit + ("-dirty" if git("status", "--porcelain", "--untracked-files=no") else "")
+
+
+def previous_run(path: str, commit: str) -> Optional[Dict[str, Any]]:
+    """Returns the last recorded run of another commit, if any."""
+    if not os.path.exists(path):
+        return None
+    previous = None
+    with open(path, encoding="utf-8") as results:
+        for line in results:
+            record = json.loads(line)
+            if record.get("commit") != commit:
+                previous = record
+    return previous
+
+
+def _change(current: float, before: Optional[float]) -> str:
+    if not before:
+        return ""
+    return f"{(current - before) / before * 100:+.1f}%"
+
+
+def report(record: Dict[str, Any], previous: Optional[Dict[str, Any]]):
+    print(f"commit {record['commit']}"
+          + (f" (compared with {previous['commit']})" if previous else ""))
+    print(f"{'Scenario':<16} {'Ops':>6} {'Requests':>9} {'429s':>6} {'Req/s':>9} {'Change':>8} "
+          f"{'p50 ms':>8} {'p99 ms':>8} {'Change':>8} {'RSS MiB':>8}")
+    for name, result in record["results"].items():
+        before = (previous or {}).get("results", {}).get(name, {})
+        rss = result["peak_rss_kib"]
+        print(f"{name:<16} {result['ops']:>6} {result['requests']:>9} {result['throttled']:>6} "
+              f"{result['requests_per_second']:>9.1f} "
+              f"{_change(result['requests_per_second'], before.get('requests_per_second')):>8} "
+              f"{result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+              f"{_change(result['p99_ms'], before.get('p99_ms')):>8} "
+              f"{rss / 1024 if rss else float('nan'):>8.1f}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark the ClickUp client offline.")
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help='Run only this scenario (repeatable, default: all).')
+    parser.add_argument('--ops', type=int, default=2000,
+                        help='Operations per scenario, divided for the expensive ones.')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--results', default=DEFAULT_RESULTS,
+                        help='The JSONL file results are appended to (default: %(default)s).')
+    parser.add_argument('--no-record', action='store_true',
+                        help='Print the results without recording them.')
+    defaults = MockConfig()
+    for name, value in defaults.as_dict().items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value,
+                            help=argparse.SUPPRESS)
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--base-url', help=argparse.SUPPRESS)
+    parser.add_argument('--config', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_child(args)
+        return
+
+    config = MockConfig(**{name: getattr(args, name) for name in defaults.as_dict()})
+    record: Dict[str, Any] = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "concurrency": args.concurrency,
+        "config": config.as_dict(),
+        "results": {},
+    }
+    with MockClickUpServer(config) as server:
+        for name in args.scenario or SCENARIOS:
+            ops = max(1, args.ops // OPS_DIVISOR.get(name, 1))
+            record["results"][name] = run_scenario(server, name, ops, args.concurrency)
+
+    report(record, previous_run(args.results, record["commit"]))
+    if not args.no_record:
+        with open(args.results, "a", encoding="utf-8") as results:
+            results.write(json.dumps(record) + "\n")
+    return record
+
+
+if __name__ == '__main__':
+    main()
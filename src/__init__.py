@@ -0,0 +1 @@
+"""The ClickUp API client and the agent CLI built on it."""
@@ -0,0 +1,239 @@
+"""Adaptive concurrency for bulk jobs.
+
+AdaptiveLimiter caps how many requests a client has in flight and tunes the
+cap from what it observes (AIMD):
+
+- While responses come back about as fast as is usual lately for their
+  endpoint, the limit grows by roughly one per round of ``limit`` completed
+  requests.
+- A 429, 5xx gateway error, timeout or connection failure, or an endpoint's
+  smoothed latency above ``tolerance`` times its baseline, cuts the limit by
+  ``backoff``. Requests already in flight when the limit was cut do not cut
+  it again, so one overload event costs one decrease.
+
+Each endpoint's baseline is a low percentile of its recent smoothed
+latencies, so one unusually fast response does not lower it for long, fast
+and slow endpoints mixed in one job are judged apart, and a slower but
+steady endpoint becomes the new normal once it fills the window.
+
+It also proposes per-request timeouts from the observed p99 latency, so a
+stuck request is abandoned (and retried) sooner than the client's fixed
+timeout when the API is fast, and later when it is slow.
+"""
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Callable, Deque, Dict, Optional
+
+import requests
+
+from .metrics import MetricsRecorder
+
+OVERLOAD_STATUSES = frozenset({429, 502, 503, 504})
+# Weight of a new sample in the smoothed latency.
+SMOOTHING = 0.2
+# Latency samples needed before timeouts adapt; p99 and baselines are
+# recomputed this often.
+MIN_SAMPLES = 20
+# The percentile of an endpoint's recent smoothed latencies used as its baseline.
+BASELINE_PERCENTILE = 0.1
+
+
+@dataclass
+class AdaptiveStats:
+    """Counters describing how the limiter moved."""
+
+    increases: int = 0
+    decreases: int = 0
+    overloads: int = 0
+    peak_limit: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class _EndpointLatency:
+    """The smoothed latency of one endpoint and the baseline it is judged by."""
+
+    __slots__ = ('smoothed', 'baseline', 'recent', 'samples')
+
+    def __init__(self, window: int):
+        self.smoothed = 0.0
+        self.baseline = 0.0
+        self.recent: Deque[float] = deque(maxlen=window)
+        self.samples = 0
+
+    def observe(self, latency: float) -> float:
+        """Adds a latency and returns the new smoothed latency."""
+        self.samples += 1
+        if self.samples == 1:
+            self.smoothed = latency
+        else:
+            self.smoothed += (latency - self.smoothed) * SMOOTHING
+        self.recent.append(self.smoothed)
+        # Early baselines move with every sample; later ones every MIN_SAMPLES.
+        if self.samples <= MIN_SAMPLES or self.samples % MIN_SAMPLES == 0:
+            ordered = sorted(self.recent)
+            self.baseline = ordered[int(BASELINE_PERCENTILE * (len(ordered) - 1))]
+        return self.smoothed
+
+
+class AdaptiveLimiter:
+    """Bounds and tunes the number of concurrent requests of a client."""
+
+    def __init__(self, initial: int = 4, min_limit: int = 1, max_limit: int = 64,
+                 backoff: float = 0.5, tolerance: float = 2.0,
+                 timeout_multiplier: float = 3.0, min_timeout: float = 1.0,
+                 max_timeout: Optional[float] = None, window: int = 500,
+                 metrics: Optional[MetricsRecorder] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initializes the AdaptiveLimiter.
+
+        Args:
+            initial: The starting limit.
+            min_limit: The limit never drops below this.
+            max_limit: The limit never grows above this.
+            backoff: The factor applied to the limit on overload.
+            tolerance: How many times the baseline latency counts as a spike.
+            timeout_multiplier: Timeouts are this multiple of the p99 latency.
+            min_timeout: The shortest timeout proposed, in seconds.
+            max_timeout: The longest timeout proposed; the client's own
+                timeout when None.
+            window: How many recent latencies the p99, and each endpoint's
+                baseline, are taken from.
+            metrics: Receives the ``concurrency_limit`` and
+                ``latency_p99_seconds`` gauges as they change.
+            clock: A monotonic clock returning seconds.
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self.timeout_multiplier = timeout_multiplier
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.metrics = metrics
+        self._clock = clock
+        self._limit = float(max(min_limit, min(initial, max_limit)))
+        self.stats = AdaptiveStats(peak_limit=int(self._limit))
+        self._in_flight = 0
+        self._endpoints: Dict[Optional[str], _EndpointLatency] = {}
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._samples = 0
+        self._p99: Optional[float] = None
+        self._last_decrease = float('-inf')
+        self._condition = threading.Condition()
+        self._publish()
+
+    @property
+    def limit(self) -> int:
+        """The number of requests currently allowed in flight."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """The number of requests currently in flight."""
+        return self._in_flight
+
+    def timeout(self, default: float) -> float:
+        """Returns the timeout for the next request.
+
+        Args:
+            default: The client's timeout, used until enough latencies were
+                seen and as the ceiling unless ``max_timeout`` is set.
+        """
+        p99 = self._p99
+        if p99 is None:
+            return default
+        ceiling = self.max_timeout if self.max_timeout is not None else default
+        return min(ceiling, max(self.min_timeout, p99 * self.timeout_multiplier))
+
+    def acquire(self) -> float:
+        """Waits for a free slot and takes it.
+
+        Returns:
+            The start time to pass to release().
+        """
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+        return self._clock()
+
+    def release(self, started: float, overloaded: bool = False,
+                endpoint: Optional[str] = None):
+        """Frees a slot and adjusts the limit from the request's outcome.
+
+        Args:
+            started: The value acquire() returned.
+            overloaded: Whether the server signalled overload, by status,
+                timeout or connection failure.
+            endpoint: What kind of request it was, e.g. ``GET space/{id}``.
+                Latency spikes are judged against the endpoint's own baseline.
+        """
+        latency = self._clock() - started
+        with self._condition:
+            busy = self._in_flight
+            self._in_flight -= 1
+            limit = int(self._limit)
+            self._latencies.append(latency)
+            # Counted apart from the window, whose length stops growing once full.
+            self._samples += 1
+            sampled = self._samples % MIN_SAMPLES == 0
+            if sampled:
+                samples = sorted(self._latencies)
+                self._p99 = samples[int(0.99 * (len(samples) - 1))]
+            spiking = False
+            if overloaded:
+                self.stats.overloads += 1
+            else:
+                observed = self._endpoints.get(endpoint)
+                if observed is None:
+                    observed = self._endpoints[endpoint] = _EndpointLatency(
+                        self._latencies.maxlen)
+                spiking = observed.observe(latency) > observed.baseline * self.tolerance
+            if overloaded or spiking:
+                if started >= self._last_decrease and self._limit > self.min_limit:
+                    self._limit = max(float(self.min_limit), self._limit * self.backoff)
+                    self._last_decrease = self._clock()
+                    self.stats.decreases += 1
+            elif busy >= limit // 2 + 1 and self._limit < self.max_limit:
+                # Only grow while the limit is actually in use.
+                self._limit = min(float(self.max_limit), self._limit + 1.0 / self._limit)
+                if int(self._limit) > limit:
+                    self.stats.increases += 1
+                    self.stats.peak_limit = max(self.stats.peak_limit, int(self._limit))
+            changed = int(self._limit) != limit
+            self._condition.notify_all()
+        if changed or sampled:
+            self._publish()
+
+    def _publish(self):
+        if self.metrics is not None:
+            self.metrics.set_gauge("concurrency_limit", int(self._limit))
+            if self._p99 is not None:
+                self.metrics.set_gauge("latency_p99_seconds", round(self._p99, 4))
+
+    def wrap(self, attempt: Callable[[], requests.Response],
+             endpoint: Optional[str] = None) -> Callable[[], requests.Response]:
+        """Returns ``attempt`` made to wait for a slot and report its outcome.
+
+        ``endpoint`` is passed on to release().
+        """
+        def limited() -> requests.Response:
+            started = self.acquire()
+            try:
+                response = attempt()
+            except requests.RequestException:
+                self.release(started, overloaded=True, endpoint=endpoint)
+                raise
+            except BaseException:
+                self.release(started, endpoint=endpoint)
+                raise
+            self.release(started, overloaded=response.status_code in OVERLOAD_STATUSES,
+                         endpoint=endpoint)
+            return response
+
+        return limited
@@ -0,0 +1,253 @@
+import argparse
+import cmd
+import contextlib
+import io
+import json
+import logging
+import os
+import shlex
+import signal
+import socket
+import socketserver
+import sys
+import threading
+from typing import Any, Callable, Dict, List, Optional, TextIO, Tuple
+
+from .remote import EXIT, FRAME, OUTPUT
+
+logger = logging.getLogger(__name__)
+
+# The options that decide which client a command runs on. Commands that agree
+# on all of them share one warm client. The worker count sizes its connection pool.
+CLIENT_OPTIONS = ('offline', 'mirror', 'base_url', 'cache', 'transport', 'record', 'replay',
+                  'inject_latency', 'inject_errors', 'inject_seed', 'workers')
+
+
+class AgentSession:
+    """Runs CLI commands in-process on clients kept warm between commands.
+
+    A client, with its connection pool and cache, is created on first use for
+    each combination of CLIENT_OPTIONS and reused by every later command.
+    Commands run one at a time because their output is captured by
+    redirecting the standard streams.
+    """
+
+    def __init__(self, parser: argparse.ArgumentParser, api_token: Optional[str],
+                 run: Callable[..., None], create_client: Callable[..., Any]):
+        """
+        Initializes the AgentSession.
+
+        Args:
+            parser: The CLI argument parser.
+            api_token: The ClickUp API token.
+            run: Runs one parsed command as ``run(args, parser, api_token, client)``.
+            create_client: Creates a client as ``create_client(api_token, args)``.
+        """
+        self.parser = parser
+        self.api_token = api_token
+        self._run = run
+        self._create_client = create_client
+        self._clients: Dict[Tuple, Any] = {}
+        self._lock = threading.Lock()
+        self.commands = 0
+
+    def client(self, args: argparse.Namespace):
+        """Returns the warm client for the options of a command."""
+        key = tuple(getattr(args, name, None) for name in CLIENT_OPTIONS)
+        client = self._clients.get(key)
+        if client is None:
+            logger.info("Creating a client for %s.", dict(zip(CLIENT_OPTIONS, key)))
+            client = self._clients[key] = self._create_client(self.api_token, args)
+        return client
+
+    def execute(self, argv: List[str], out: TextIO, cwd: Optional[str] = None,
+                stdin: Optional[str] = None) -> int:
+        """Runs one command line, writing everything it prints to ``out``.
+
+        Args:
+            argv: The command line, without the program name.
+            out: Receives the command's standard output and error.
+            cwd: The directory relative paths are resolved against.
+            stdin: The text the command reads as standard input, if any.
+
+        Returns:
+            The command's exit status.
+        """
+        with self._lock, contextlib.redirect_stdout(out), contextlib.redirect_stderr(out):
+            previous_cwd, previous_stdin = os.getcwd(), sys.stdin
+            if stdin is not None:
+                sys.stdin = io.StringIO(stdin)
+            try:
+                if cwd:
+                    os.chdir(cwd)
+                return self._execute(argv)
+            finally:
+                os.chdir(previous_cwd)
+                sys.stdin = previous_stdin
+                out.flush()
+
+    def _execute(self, argv: List[str]) -> int:
+        try:
+            args = self.parser.parse_args(argv)
+        except SystemExit as e:
+            return e.code or 0  # argparse already printed the usage or help text
+        if args.command in ('shell', 'serve'):
+            print("Already running as an agent.")
+            return 1
+        self.commands += 1
+        client = None
+        if args.command != 'query' and (args.offline or args.replay or self.api_token):
+            client = self.client(args)
+        return self._run(args, self.parser, self.api_token, client) or 0
+
+    def close(self):
+        """Closes every warm client."""
+        for client in self._clients.values():
+            client.close()
+        self._clients.clear()
+
+
+class AgentShell(cmd.Cmd):
+    """An interactive prompt running CLI commands on an AgentSession."""
+
+    intro = "ClickUp agent shell. Type a command such as 'list-teams', 'help' or 'exit'."
+    prompt = 'clickup> '
+
+    def __init__(self, session: AgentSession, stdin: Optional[TextIO] = None,
+                 stdout: Optional[TextIO] = None):
+        super().__init__(stdin=stdin, stdout=stdout)
+        self.session = session
+        if stdin is not None:
+            self.use_rawinput = False
+
+    def default(self, line: str):
+        try:
+            argv = shlex.split(line)
+        except ValueError as e:
+            self.stdout.write(f"Invalid command line: {e}\n")
+            return
+        self.session.execute(argv, self.stdout)
+
+    def emptyline(self):
+        pass
+
+    def do_help(self, arg: str):
+        """Shows the help of the CLI or of one command."""
+        self.session.execute([*shlex.split(arg), '--help'], self.stdout)
+
+    def do_exit(self, arg: str) -> bool:
+        """Leaves the shell."""
+        return True
+
+    do_quit = do_exit
+
+    def do_EOF(self, arg: str) -> bool:
+        self.stdout.write('\n')
+        return True
+
+
+class _OutputFrames(io.RawIOBase):
+    """Writes what a command prints to the socket as OUTPUT frames."""
+
+    def __init__(self, wfile):
+        super().__init__()
+        self._wfile = wfile
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._wfile.write(FRAME.pack(OUTPUT, len(data)) + bytes(data))
+        return len(data)
+
+
+class _CommandHandler(socketserver.StreamRequestHandler):
+    """Reads one JSON request line, streams the command's output back and then its status."""
+
+    server: 'AgentServer'
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return  # e.g. a probe checking whether the daemon is running
+        out = io.TextIOWrapper(io.BufferedWriter(_OutputFrames(self.wfile)), encoding='utf-8')
+        try:
+            try:
+                request = json.loads(line)
+                argv = [str(arg) for arg in request['argv']]
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning("Invalid agent request: %s", e)
+                out.write(f"Invalid request: {e}\n")
+                status = 2
+            else:
+                status = self.server.session.execute(argv, out, cwd=request.get('cwd'),
+                                                     stdin=request.get('stdin'))
+            out.flush()
+            self.wfile.write(FRAME.pack(EXIT, len(str(status))) + str(status).encode())
+        except (BrokenPipeError, ConnectionResetError):
+            logger.info("Client disconnected before the command finished.")
+        finally:
+            out.detach()
+
+
+class AgentServer(socketserver.ThreadingUnixStreamServer):
+    """A Unix-socket daemon executing commands on an AgentSession."""
+
+    daemon_threads = True
+
+    def __init__(self, session: AgentSession, path: str):
+        """
+        Initializes the AgentServer.
+
+        Args:
+            session: The session commands run on.
+            path: The socket path. It is only accessible to the current user,
+                since commands run with the daemon's API token.
+        """
+        if os.path.exists(path):
+            if _is_listening(path):
+                raise RuntimeError(f"An agent is already listening on {path}.")
+            os.unlink(path)  # left over by a daemon that did not exit cleanly
+        self.session = session
+        self.path = path
+        previous_umask = os.umask(0o177)
+        try:
+            super().__init__(path, _CommandHandler)
+        finally:
+            os.umask(previous_umask)
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def _is_listening(path: str) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(path)
+        except OSError:
+            return False
+    return True
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def serve(session: AgentSession, path: str):
+    """Serves commands on a Unix socket until interrupted."""
+    server = AgentServer(session, path)
+    if threading.current_thread() is threading.main_thread():
+        # Stop cleanly, removing the socket, when the daemon is terminated.
+        signal.signal(signal.SIGTERM, _interrupt)
+    logger.info("Agent listening on %s.", path)
+    print(f"Listening on {path}. Send commands with: python src/remote.py <command>",
+          flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        logger.info("Agent stopped after %d commands.", session.commands)
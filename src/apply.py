@@ -0,0 +1,198 @@
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+from .batch import execute
+
+logger = logging.getLogger(__name__)
+
+try:
+    import yaml
+except ImportError:  # pragma: no cover - depends on the environment
+    yaml = None
+
+# Mutations run phase by phase in this order, so a rename or a creation can
+# take a name freed by a deletion. Changes within a phase run concurrently.
+PHASES = ('delete-space', 'update-space', 'create-space')
+
+
+class ManifestError(ValueError):
+    """Raised when a manifest is malformed or does not match the workspace."""
+
+
+@dataclass
+class TeamSpec:
+    """The desired spaces of one team.
+
+    Spaces are matched by ``id`` when one is given, which allows renames, and
+    by name otherwise. With ``prune``, spaces not listed are deleted.
+    """
+
+    team_id: str
+    spaces: List[Dict[str, str]] = field(default_factory=list)
+    prune: bool = False
+
+
+@dataclass
+class Change:
+    """One mutation of a plan, named after its batch operation."""
+
+    op: str
+    team_id: str
+    name: str
+    space_id: Optional[str] = None
+    old_name: Optional[str] = None
+
+    def as_operation(self) -> Dict[str, Any]:
+        """Returns the change as a batch operation."""
+        operation = {'op': self.op, 'team_id': self.team_id, 'name': self.name}
+        if self.space_id is not None:
+            operation['space_id'] = self.space_id
+        return operation
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {key: value for key, value in asdict(self).items() if value is not None}
+
+    def describe(self) -> str:
+        if self.op == 'create-space':
+            return f"+ create space '{self.name}' in team {self.team_id}"
+        if self.op == 'update-space':
+            return (f"~ rename space {self.space_id} from '{self.old_name}' to "
+                    f"'{self.name}' in team {self.team_id}")
+        return f"- delete space {self.space_id} '{self.name}' from team {self.team_id}"
+
+
+def parse_manifest(data: Any) -> List[TeamSpec]:
+    """Validates a decoded manifest and returns its team specs.
+
+    The expected shape is::
+
+        {"teams": {"<team_id>": {"prune": false,
+                                 "spaces": ["Name", {"name": "New", "id": "<space_id>"}]}}}
+
+    A team may also map directly to its list of spaces.
+    """
+    if not isinstance(data, dict) or not isinstance(data.get('teams'), dict):
+        raise ManifestError("The manifest needs a 'teams' mapping of team IDs to spaces.")
+    specs = []
+    for team_id, team in data['teams'].items():
+        if isinstance(team, list):
+            team = {'spaces': team}
+        if not isinstance(team, dict) or not isinstance(team.get('spaces', []), list):
+            raise ManifestError(f"Team {team_id}: 'spaces' must be a list.")
+        spaces = []
+        for entry in team.get('spaces', []):
+            if isinstance(entry, str):
+                entry = {'name': entry}
+            if not isinstance(entry, dict) or not entry.get('name'):
+                raise ManifestError(f"Team {team_id}: every space needs a name, got {entry!r}.")
+            spaces.append({key: str(value) for key, value in entry.items()
+                           if key in ('name', 'id')})
+        names = [space['name'] for space in spaces]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ManifestError(f"Team {team_id}: duplicate space names {duplicates}.")
+        specs.append(TeamSpec(str(team_id), spaces, bool(team.get('prune', False))))
+    return specs
+
+
+def load_manifest(path: str) -> List[TeamSpec]:
+    """Reads a manifest file, as YAML for ``.yaml``/``.yml`` and JSON otherwise."""
+    with open(path, encoding='utf-8') as stream:
+        if path.lower().endswith(('.yaml', '.yml')):
+            if yaml is None:
+                raise ManifestError("Reading YAML manifests requires PyYAML (pip install pyyaml).")
+            try:
+                data = yaml.safe_load(stream)
+            except yaml.YAMLError as e:
+                raise ManifestError(f"Invalid YAML: {e}") from e
+        else:
+            try:
+                data = json.load(stream)
+            except json.JSONDecodeError as e:
+                raise ManifestError(f"Invalid JSON: {e}") from e
+    return parse_manifest(data)
+
+
+def diff_spaces(spec: TeamSpec, current: List[Dict[str, Any]],
+                prune: bool = False) -> List[Change]:
+    """Computes the minimal changes turning ``current`` into ``spec``.
+
+    Args:
+        spec: The desired spaces of the team.
+        current: The team's spaces as returned by get_spaces.
+        prune: Delete unlisted spaces even if the spec does not ask for it.
+    """
+    by_id = {str(space['id']): space for space in current}
+    claimed = set()
+    changes = []
+    for entry in spec.spaces:
+        if 'id' not in entry:
+            continue
+        space = by_id.get(entry['id'])
+        if space is None:
+            raise ManifestError(f"Team {spec.team_id}: space {entry['id']} does not exist.")
+        claimed.add(entry['id'])
+        if space.get('name') != entry['name']:
+            changes.append(Change('update-space', spec.team_id, entry['name'],
+                                  space_id=entry['id'], old_name=space.get('name')))
+
+    unclaimed: Dict[str, List[str]] = {}
+    for space in current:
+        if str(space['id']) not in claimed:
+            unclaimed.setdefault(space.get('name'), []).append(str(space['id']))
+    for entry in spec.spaces:
+        if 'id' in entry:
+            continue
+        if unclaimed.get(entry['name']):
+            claimed.add(unclaimed[entry['name']].pop(0))
+        else:
+            changes.append(Change('create-space', spec.team_id, entry['name']))
+
+    if spec.prune or prune:
+        changes += [Change('delete-space', spec.team_id, space.get('name'),
+                           space_id=str(space['id']))
+                    for space in current if str(space['id']) not in claimed]
+    return changes
+
+
+def fetch_spaces(client, team_ids: Iterable[str],
+                 workers: int = 8) -> Dict[str, List[Dict[str, Any]]]:
+    """Lists the spaces of several teams in parallel, one request per team."""
+    team_ids = list(team_ids)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='apply') as executor:
+        listings = executor.map(lambda team_id: client.get_spaces(team_id), team_ids)
+        return {team_id: listing.get('spaces', [])
+                for team_id, listing in zip(team_ids, listings)}
+
+
+def plan(client, specs: List[TeamSpec], workers: int = 8, prune: bool = False) -> List[Change]:
+    """Fetches the current spaces of every team and returns the changes to make."""
+    current = fetch_spaces(client, (spec.team_id for spec in specs), workers)
+    changes = []
+    for spec in specs:
+        changes += diff_spaces(spec, current[spec.team_id], prune)
+    logger.info("Planned %d changes for %d teams.", len(changes), len(specs))
+    return changes
+
+
+def apply_changes(client, changes: List[Change], workers: int = 8) -> List[Dict[str, Any]]:
+    """Runs a plan concurrently, phase by phase, and returns one record per change.
+
+    Records are batch result records, numbered by the change's position in
+    the plan, with the change itself under ``change``.
+    """
+    records = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='apply') as executor:
+        for phase in PHASES:
+            numbered = [(number, change) for number, change in enumerate(changes, start=1)
+                        if change.op == phase]
+            results = executor.map(
+                lambda item: execute(client, item[0], item[1].as_operation()), numbered)
+            records += [{**record, 'change': change.as_dict()}
+                        for (number, change), record in zip(numbered, results)]
+    failed = sum(1 for record in records if not record['ok'])
+    logger.info("Applied %d changes, %d failed.", len(records), failed)
+    return sorted(records, key=lambda record: record['line'])
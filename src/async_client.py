@@ -0,0 +1,146 @@
+import asyncio
+import functools
+import itertools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+from .clickup_client import DEFAULT_BASE_URL, ClickUpClient
+
+logger = logging.getLogger(__name__)
+
+# Streamed tasks are handed from the worker pool to the event loop in batches
+# of this many, one page's worth, so each batch costs a single hop.
+TASKS_PER_BATCH = 100
+
+
+class AsyncClickUpClient:
+    """An asyncio client for the ClickUp API with bounded concurrency.
+
+    Every call is dispatched to a fixed-size worker pool that shares one
+    pooled ``ClickUpClient`` session, so at most ``max_concurrency`` requests
+    are in flight at once and connections are reused between them.
+    """
+
+    def __init__(self, api_token: str, base_url: str = DEFAULT_BASE_URL,
+                 max_concurrency: int = 10, client: Optional[ClickUpClient] = None):
+        """
+        Initializes the AsyncClickUpClient.
+
+        Args:
+            api_token: Your ClickUp API token.
+            base_url: The base URL for the ClickUp API.
+            max_concurrency: The maximum number of requests in flight at once.
+            client: An existing ClickUpClient to share. One sized to
+                ``max_concurrency`` is created when omitted. A shared client
+                is left open by close().
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self._owns_client = client is None
+        self.client = client or ClickUpClient(
+            api_token, base_url, pool_maxsize=max_concurrency)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="clickup")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """Shuts down the worker pool and closes the HTTP session it created."""
+        self._executor.shutdown(wait=True)
+        if self._owns_client:
+            self.client.close()
+
+    async def _call(self, method: str, *args, **kwargs):
+        """Runs a ClickUpClient method on the worker pool."""
+        loop = asyncio.get_running_loop()
+        func = functools.partial(getattr(self.client, method), *args, **kwargs)
+        return await loop.run_in_executor(self._executor, func)
+
+    async def get_teams(self):
+        """Fetches the user's teams (workspaces)."""
+        return await self._call("get_teams")
+
+    async def create_space(self, team_id: str, name: str):
+        """Creates a new space within a specified team."""
+        return await self._call("create_space", team_id, name)
+
+    async def delete_space(self, space_id: str):
+        """Deletes a specified space."""
+        return await self._call("delete_space", space_id)
+
+    async def get_spaces(self, team_id: str):
+        """Retrieves all spaces for a specified team."""
+        return await self._call("get_spaces", team_id)
+
+    async def get_space(self, space_id: str):
+        """Retrieves details for a specified space."""
+        return await self._call("get_space", space_id)
+
+    async def update_space(self, space_id: str, name: str):
+        """Updates the name of a specified space."""
+        return await self._call("update_space", space_id, name)
+
+    async def get_folders(self, space_id: str):
+        """Retrieves all folders in a specified space."""
+        return await self._call("get_folders", space_id)
+
+    async def get_folderless_lists(self, space_id: str):
+        """Retrieves the lists of a space that are not inside a folder."""
+        return await self._call("get_folderless_lists", space_id)
+
+    async def get_lists(self, folder_id: str):
+        """Retrieves all lists in a specified folder."""
+        return await self._call("get_lists", folder_id)
+
+    async def get_tasks(self, list_id: str, page: int = 0, **params):
+        """Retrieves one page of tasks of a specified list."""
+        return await self._call("get_tasks", list_id, page=page, **params)
+
+    async def iter_tasks(self, list_id: str, **params) -> AsyncIterator[Dict[str, Any]]:
+        """Yields every task of a list, following pagination.
+
+        Pages are streamed and decoded by ``ClickUpClient.iter_tasks`` on the
+        worker pool, so at most one batch of tasks is held at a time.
+        """
+        loop = asyncio.get_running_loop()
+        tasks = self.client.iter_tasks(list_id, **params)
+        try:
+            while True:
+                batch = await loop.run_in_executor(
+                    self._executor, lambda: list(itertools.islice(tasks, TASKS_PER_BATCH)))
+                for task in batch:
+                    yield task
+                if len(batch) < TASKS_PER_BATCH:
+                    return
+        finally:
+            try:
+                tasks.close()  # releases a response that was not read to the end
+            except ValueError:
+                pass  # still being read after a cancellation; closed once collected
+
+    async def get_spaces_for_teams(self, team_ids: Iterable[str]) -> Dict[str, Any]:
+        """Retrieves the spaces of several teams concurrently, keyed by team ID."""
+        team_ids = list(team_ids)
+        results = await asyncio.gather(
+            *(self.get_spaces(team_id) for team_id in team_ids))
+        return dict(zip(team_ids, results))
+
+    async def get_inventory(self) -> List[Dict[str, Any]]:
+        """Fetches every team together with its spaces.
+
+        Costs one round trip for the teams and one concurrent wave of
+        round trips for their spaces.
+        """
+        teams = (await self.get_teams()).get('teams', [])
+        logger.info("Fetching spaces for %d teams.", len(teams))
+        spaces = await self.get_spaces_for_teams(team['id'] for team in teams)
+        return [
+            {**team, 'spaces': spaces[team['id']].get('spaces', [])}
+            for team in teams
+        ]
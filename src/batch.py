@@ -0,0 +1,130 @@
+import csv
+import json
+import logging
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Set, TextIO, Tuple
+
+from requests.exceptions import HTTPError
+
+logger = logging.getLogger(__name__)
+
+# Maps an operation name to the client call it performs.
+OPERATIONS: Dict[str, Callable[[Any, Dict[str, Any]], Any]] = {
+    'list-teams': lambda client, op: client.get_teams(),
+    'list-spaces': lambda client, op: client.get_spaces(op['team_id']),
+    'get-space': lambda client, op: client.get_space(op['space_id']),
+    'create-space': lambda client, op: client.create_space(op['team_id'], op['name']),
+    'update-space': lambda client, op: client.update_space(op['space_id'], op['name']),
+    'delete-space': lambda client, op: client.delete_space(op['space_id']),
+}
+
+
+def detect_format(path: str) -> str:
+    """Guesses the input format from a file name, defaulting to JSONL."""
+    return 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+
+def read_operations(stream: TextIO, fmt: str = 'jsonl') -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Yields ``(line_number, operation)`` pairs from a JSONL or CSV stream.
+
+    Line numbers count data lines from 1, skipping blank JSONL lines and the
+    CSV header, so they stay stable between runs of the same file.
+    """
+    if fmt == 'csv':
+        for line_number, row in enumerate(csv.DictReader(stream), start=1):
+            yield line_number, {key: value for key, value in row.items() if value}
+        return
+    line_number = 0
+    for raw in stream:
+        if not raw.strip():
+            continue
+        line_number += 1
+        try:
+            yield line_number, json.loads(raw)
+        except json.JSONDecodeError as e:
+            yield line_number, {'op': None, 'error': f"Invalid JSON: {e}"}
+
+
+def load_completed(path: str) -> Set[int]:
+    """Returns the line numbers recorded as successful in a results file."""
+    completed = set()
+    if not os.path.exists(path):
+        return completed
+    with open(path, encoding='utf-8') as results:
+        for raw in results:
+            try:
+                record = json.loads(raw)
+            except json.JSONDecodeError:
+                # A crash can leave a truncated last line; that line is re-run.
+                continue
+            if record.get('ok'):
+                completed.add(record['line'])
+    return completed
+
+
+def execute(client, line_number: int, operation: Dict[str, Any]) -> Dict[str, Any]:
+    """Runs one operation and returns its result record."""
+    record = {'line': line_number, 'op': operation.get('op')}
+    if 'error' in operation:
+        return {**record, 'ok': False, 'error': operation['error']}
+    handler = OPERATIONS.get(operation.get('op'))
+    if handler is None:
+        return {**record, 'ok': False, 'error': f"Unknown operation: {operation.get('op')!r}"}
+    try:
+        return {**record, 'ok': True, 'result': handler(client, operation)}
+    except KeyError as e:
+        return {**record, 'ok': False, 'error': f"Missing field: {e.args[0]}"}
+    except HTTPError as e:
+        return {**record, 'ok': False, 'status': e.response.status_code,
+                'error': e.response.text}
+    except Exception as e:
+        logger.exception("Operation on line %d failed.", line_number)
+        return {**record, 'ok': False, 'error': str(e)}
+
+
+def run_batch(client, operations: Iterable[Tuple[int, Dict[str, Any]]], output: TextIO,
+              workers: int = 8, skip: Optional[Set[int]] = None) -> Dict[str, int]:
+    """Executes operations concurrently, streaming one JSON result per line.
+
+    At most ``2 * workers`` operations are read ahead, so arbitrarily large
+    inputs run in constant memory. Results are written in completion order.
+
+    Args:
+        client: The shared ClickUpClient.
+        operations: ``(line_number, operation)`` pairs, e.g. from read_operations.
+        output: Where result records are written.
+        workers: The number of concurrent requests.
+        skip: Line numbers already completed by a previous run.
+
+    Returns:
+        Counts of succeeded, failed and skipped operations.
+    """
+    skip = skip or set()
+    summary = {'succeeded': 0, 'failed': 0, 'skipped': 0}
+    write_lock = threading.Lock()
+
+    def record(future):
+        result = future.result()
+        with write_lock:
+            output.write(json.dumps(result) + '\n')
+            output.flush()
+            summary['succeeded' if result['ok'] else 'failed'] += 1
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='batch') as executor:
+        pending = set()
+        for line_number, operation in operations:
+            if line_number in skip:
+                summary['skipped'] += 1
+                continue
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    record(future)
+            pending.add(executor.submit(execute, client, line_number, operation))
+        for future in wait(pending).done:
+            record(future)
+
+    logger.info("Batch finished: %s", summary)
+    return summary
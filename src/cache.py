@@ -0,0 +1,161 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Teams change far less often than spaces.
+DEFAULT_TTLS = {
+    "team": 3600.0,
+    "team/{id}/space": 300.0,
+    "space/{id}": 300.0,
+}
+
+
+@dataclass
+class CacheEntry:
+    """A cached response body with its validator and freshness."""
+
+    body: bytes
+    etag: Optional[str]
+    fresh: bool
+
+
+class ResponseCache:
+    """A persistent, size-bounded cache of API responses stored in SQLite.
+
+    Entries expire after a per-endpoint TTL. Expired entries that carry an
+    ETag are kept so they can be revalidated with a conditional request, and
+    the least recently used entries are evicted once the cache grows past
+    ``max_entries`` or ``max_bytes``.
+    """
+
+    def __init__(self, path: str, ttls: Optional[Dict[str, float]] = None,
+                 default_ttl: float = 300.0, max_entries: int = 10_000,
+                 max_bytes: int = 64 * 1024 * 1024,
+                 clock: Callable[[], float] = time.time):
+        """
+        Initializes the ResponseCache.
+
+        Args:
+            path: The SQLite database file. Parent directories are created.
+            ttls: Seconds to live per endpoint template (e.g. ``"space/{id}"``),
+                merged over DEFAULT_TTLS.
+            default_ttl: Seconds to live for endpoints without a specific TTL.
+            max_entries: The maximum number of cached responses.
+            max_bytes: The maximum total size of cached bodies.
+            clock: Returns the current time in seconds.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " endpoint TEXT NOT NULL,"
+            " body BLOB NOT NULL,"
+            " etag TEXT,"
+            " expires_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL,"
+            " size INTEGER NOT NULL)")
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS responses_endpoint ON responses (endpoint)")
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self._db.commit()
+
+    def close(self):
+        """Closes the database connection."""
+        with self._lock:
+            self._db.close()
+
+    def ttl_for(self, endpoint: str) -> float:
+        """Returns the time to live for responses of an endpoint template."""
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Returns the entry stored under ``key``, fresh or not, and marks it used."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body, etag, expires_at FROM responses WHERE key = ?",
+                (key,)).fetchone()
+            if row is None:
+                return None
+            now = self._clock()
+            self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?",
+                             (now, key))
+            self._db.commit()
+        return CacheEntry(body=row[0], etag=row[1], fresh=now < row[2])
+
+    def set(self, key: str, endpoint: str, body: bytes, etag: Optional[str] = None):
+        """Stores a response body and evicts old entries if the cache is full."""
+        now = self._clock()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses"
+                " (key, endpoint, body, etag, expires_at, accessed_at, size)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, endpoint, body, etag, now + self.ttl_for(endpoint), now, len(body)))
+            self._evict()
+            self._db.commit()
+
+    def refresh(self, key: str, endpoint: str):
+        """Extends the lifetime of an entry that the server revalidated."""
+        now = self._clock()
+        with self._lock:
+            self._db.execute(
+                "UPDATE responses SET expires_at = ?, accessed_at = ? WHERE key = ?",
+                (now + self.ttl_for(endpoint), now, key))
+            self._db.commit()
+
+    def invalidate(self, key: str):
+        """Removes the entry stored under ``key``."""
+        with self._lock:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._db.commit()
+
+    def invalidate_endpoint(self, endpoint: str):
+        """Removes every entry of an endpoint template."""
+        with self._lock:
+            self._db.execute("DELETE FROM responses WHERE endpoint = ?", (endpoint,))
+            self._db.commit()
+
+    def clear(self):
+        """Removes every entry."""
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def _evict(self):
+        """Drops least recently used entries until both bounds are met."""
+        count, total = self._db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        evicted = 0
+        rows = self._db.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at").fetchall()
+        for key, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            count -= 1
+            total -= size
+            evicted += 1
+        logger.info("Evicted %d cached responses.", evicted)
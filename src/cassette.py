@@ -0,0 +1,112 @@
+"""Cassettes: recorded API sessions replayed for tests and profiling.
+
+A cassette is a recording made by RecordingTransport, usually gzipped
+(``.jsonl.gz``). ``cassette()`` records it on first use against the real
+API (or the mock server) and replays it from memory afterwards, so the
+whole client stack — rate limiting, retries, JSON decoding, models and
+output — runs at full speed without a network.
+
+FaultInjectingTransport adds latency and failures to any transport, to
+exercise retries and timeouts against a replayed or live API.
+"""
+import logging
+import os
+import random
+import threading
+import time
+from typing import Callable, Optional, Sequence
+
+import requests
+
+from .transport import (RecordingTransport, ReplayTransport, Transport, build_response,
+                       create_transport)
+
+logger = logging.getLogger(__name__)
+
+# The failures FaultInjectingTransport can inject: HTTP statuses, or
+# ``timeout`` and ``reset`` for transport errors.
+FAULTS = ('429', '500', '502', '503', '504', 'timeout', 'reset')
+
+
+class FaultInjectingTransport(Transport):
+    """Delays requests and replaces some of them with failures."""
+
+    def __init__(self, inner: Transport, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, faults: Sequence[str] = ('503', 'timeout'),
+                 seed: Optional[int] = None, sleep: Callable[[float], None] = time.sleep):
+        """
+        Initializes the FaultInjectingTransport.
+
+        Args:
+            inner: The transport whose requests are delayed or failed.
+            latency: Seconds added to every request. Requests delayed past
+                their timeout time out.
+            jitter: Up to this many more seconds, at random.
+            error_rate: The fraction of requests that fail, from 0 to 1.
+            faults: The failures to choose from; see FAULTS. Injected
+                timeouts and resets are raised without waiting.
+            seed: Seeds the random choices so runs are repeatable.
+            sleep: The function used to wait.
+        """
+        unknown = set(faults) - set(FAULTS)
+        if unknown:
+            raise ValueError(f"Unknown faults: {', '.join(sorted(unknown))}")
+        super().__init__()
+        self.inner = inner
+        self.headers = inner.headers
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.faults = tuple(faults)
+        self.injected = 0
+        self._rng = random.Random(seed)
+        self._sleep = sleep
+        self._lock = threading.Lock()
+
+    def send(self, method: str, url: str, timeout: float, **kwargs) -> requests.Response:
+        with self._lock:
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            fault = (self._rng.choice(self.faults)
+                     if self.error_rate and self._rng.random() < self.error_rate else None)
+            if fault is not None:
+                self.injected += 1
+        if delay >= timeout:
+            self._sleep(timeout)
+            fault = 'timeout'
+        elif delay:
+            self._sleep(delay)
+        if fault == 'timeout':
+            raise requests.Timeout(f"Injected timeout for {method} {url}.")
+        if fault == 'reset':
+            raise requests.ConnectionError(f"Injected connection reset for {method} {url}.")
+        if fault is not None:
+            return build_response(method, url, int(fault), {'Retry-After': '0'},
+                                  b'{"err": "Injected fault"}', reason='Injected')
+        return self.inner.send(method, url, timeout, **kwargs)
+
+    def close(self):
+        self.inner.close()
+
+
+def cassette(path: str, record: str = 'once', network: Optional[Transport] = None,
+             strict: bool = False) -> Transport:
+    """Returns a transport that records to or replays from a cassette.
+
+    Args:
+        path: The cassette file; ``.gz`` names are compressed.
+        record: ``once`` records when the file does not exist yet and
+            replays otherwise, ``none`` always replays and ``all`` records
+            again from scratch.
+        network: The transport used while recording; a pooled requests
+            transport when omitted.
+        strict: Raise on requests missing from the cassette instead of
+            answering 404.
+    """
+    if record not in ('once', 'none', 'all'):
+        raise ValueError(f"Unknown record mode: {record!r}")
+    if record == 'none' or (record == 'once' and os.path.exists(path)):
+        return ReplayTransport(path, strict=strict)
+    if os.path.exists(path):
+        os.remove(path)
+    logger.info("Recording cassette %s.", path)
+    return RecordingTransport(network or create_transport(), path)
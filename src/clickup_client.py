@@ -1,70 +1,470 @@
 import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Type
+from urllib.parse import urlencode
 
 import requests
 
+from . import jsonio
+from .adaptive import AdaptiveLimiter
+from .cache import ResponseCache
+from .jsonio import ArrayStream
+from .logs import current_request_id, next_request_id
+from .metrics import MetricsRecorder
+from .models import Folder, Model, Space, Task, TaskList, Team, convert_listing
+from .rate_limit import RateLimitScheduler
+from .singleflight import SingleFlight
+from .transport import RequestsTransport, Transport
+
 logger = logging.getLogger(__name__)
 
+DEFAULT_BASE_URL = "https://api.clickup.com/api/v2/"
+# The task endpoints return at most this many tasks per page.
+TASK_PAGE_SIZE = 100
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def endpoint_template(path: str) -> str:
+    """Returns the endpoint template of an API path, e.g. ``space/{id}``.
+
+    ClickUp paths alternate between resource names and identifiers.
+    """
+    segments = path.split("?", 1)[0].split("/")
+    return "/".join(
+        "{id}" if index % 2 else segment for index, segment in enumerate(segments))
+
+
+def _log_attempt(method: str, endpoint: str, status, elapsed: float, attempt: int):
+    """Logs one HTTP attempt at debug level, with its timings as record fields."""
+    if logger.isEnabledFor(logging.DEBUG):
+        duration_ms = round(elapsed * 1000, 3)
+        logger.debug("%s %s -> %s in %.1f ms", method, endpoint, status, duration_ms,
+                     extra={"method": method, "endpoint": endpoint, "status": status,
+                            "duration_ms": duration_ms, "attempt": attempt})
+
+
+def is_last_page(result: Dict[str, Any], count: Optional[int] = None) -> bool:
+    """Tells whether a page of tasks is the last one.
+
+    Uses the ``last_page`` flag when the API sends it, otherwise a short page.
+    ``count`` overrides the number of tasks when they were streamed.
+    """
+    if count is None:
+        count = len(result.get('tasks', []))
+    last_page = result.get('last_page')
+    if last_page is None:
+        return count < TASK_PAGE_SIZE
+    return last_page or not count
+
+
+def _query(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Converts query parameters to the string form the API expects."""
+    return {key: str(value).lower() if isinstance(value, bool) else value
+            for key, value in params.items()}
+
+
+def _iter_body(response, on_chunk: Optional[Callable[[int], None]] = None,
+               chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yields a streamed response body and releases the connection afterwards."""
+    try:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            if on_chunk is not None:
+                on_chunk(len(chunk))
+            yield chunk
+    finally:
+        response.close()
+
+
+class _SharedBody:
+    """A streamed response body read by every caller of a coalesced request.
+
+    Whichever reader is furthest ahead downloads the next chunk. The chunks
+    are kept for the other readers until all of them are done, so a shared
+    body is held in memory once; a body with a single reader is not kept.
+    """
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._lock = threading.Lock()
+        self._buffer: List[bytes] = []
+        self._ended = False
+        self._error: Optional[BaseException] = None
+        self._readers: Optional[int] = None
+        self._finished = 0
+
+    def expect(self, readers: int):
+        """Sets how many callers read the body, once no one else can join."""
+        with self._lock:
+            self._readers = readers
+            self._release()
+
+    def _release(self):
+        if self._readers is not None and self._finished >= self._readers:
+            self._buffer.clear()
+
+    def __iter__(self) -> Iterator[bytes]:
+        if self._readers == 1:
+            # Only set before reading starts, when no caller joined.
+            yield from self._chunks
+            return
+        index = 0
+        try:
+            while True:
+                with self._lock:
+                    if index < len(self._buffer):
+                        chunk = self._buffer[index]
+                    elif self._error is not None:
+                        raise self._error
+                    elif self._ended:
+                        return
+                    else:
+                        try:
+                            chunk = next(self._chunks)
+                        except StopIteration:
+                            self._ended = True
+                            return
+                        except BaseException as e:
+                            self._error = e
+                            raise
+                        self._buffer.append(chunk)
+                index += 1
+                yield chunk
+        finally:
+            with self._lock:
+                self._finished += 1
+                self._release()
+
+
+def _body_size(message) -> int:
+    """Returns the size of a request or response body, or 0 when unknown."""
+    body = getattr(message, "body", None) if isinstance(message, requests.PreparedRequest) \
+        else getattr(message, "content", None)
+    return len(body) if isinstance(body, (bytes, str)) else 0
+
 
 class ClickUpClient:
     """A client for interacting with the ClickUp API."""
 
-    def __init__(self, api_token: str, base_url: str = "https://api.clickup.com/api/v2/"):
+    def __init__(self, api_token: str, base_url: str = DEFAULT_BASE_URL,
+                 pool_maxsize: int = 10,
+                 scheduler: Optional[RateLimitScheduler] = None,
+                 cache: Optional[ResponseCache] = None,
+                 metrics: Optional[MetricsRecorder] = None,
+                 coalesce: bool = True, models: bool = False,
+                 transport: Optional[Transport] = None,
+                 limiter: Optional[AdaptiveLimiter] = None):
         """
         Initializes the ClickUpClient.
 
         Args:
             api_token: Your ClickUp API token.
             base_url: The base URL for the ClickUp API.
+            pool_maxsize: The number of keep-alive connections kept per host.
+                Raise it when the client is shared between many threads.
+            scheduler: Paces requests to the rate limit and retries rejected
+                ones. A default RateLimitScheduler is used when omitted.
+            cache: An optional ResponseCache for read endpoints. Mutations
+                invalidate the entries they affect.
+            metrics: An optional MetricsRecorder notified of every attempt.
+            coalesce: Let concurrent identical GET requests share one request
+                and its response instead of each sending their own.
+            models: Return teams, spaces, folders, lists and tasks as the
+                compact objects of models.py instead of dicts.
+            transport: Sends the HTTP requests. A pooled RequestsTransport
+                sized to ``pool_maxsize`` is used when omitted.
+            limiter: An optional AdaptiveLimiter that bounds and tunes the
+                number of requests in flight and their timeouts.
         """
         self.api_token = api_token
         self.base_url = base_url
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.transport = transport or RequestsTransport(pool_maxsize=pool_maxsize)
+        self.transport.headers.update({
             "Authorization": self.api_token,
             "Content-Type": "application/json"
         })
         self.timeout = 10  # seconds
+        self.scheduler = scheduler or RateLimitScheduler()
+        self.cache = cache
+        self.metrics = metrics
+        self.singleflight = SingleFlight() if coalesce else None
+        self.models = models
+        self.limiter = limiter
+
+    @property
+    def session(self) -> Optional[requests.Session]:
+        """The ``requests`` session of the default transport, if that is in use."""
+        return getattr(self.transport, "session", None)
+
+    def close(self):
+        """Closes the transport and its pooled connections."""
+        self.transport.close()
+
+    def _send(self, method: str, path: str, **kwargs) -> requests.Response:
+        """Sends a request through the rate-limit scheduler.
+
+        The request gets an ID that is attached to everything logged while it
+        is made. Every attempt, including retries, is reported to the metrics
+        recorder and, at debug level, logged with its status and duration.
+        With a limiter, each attempt waits for a slot, without holding one
+        during retry backoff, and uses the limiter's timeout.
+        """
+        url = f"{self.base_url}{path}"
+        send = self.transport.send
+        limiter = self.limiter
+        timeout = self.timeout if limiter is None else limiter.timeout(self.timeout)
+        metrics = self.metrics
+        token = current_request_id.set(next_request_id())
+        try:
+            if metrics is None and not logger.isEnabledFor(logging.DEBUG):
+                attempt = lambda: send(method, url, timeout, **kwargs)
+            else:
+                attempt = self._observed(send, method, path, url, timeout, kwargs)
+            if limiter is not None:
+                attempt = limiter.wrap(attempt, f"{method} {endpoint_template(path)}")
+            return self.scheduler.send(attempt, idempotent=method != "POST")
+        finally:
+            current_request_id.reset(token)
+
+    def _observed(self, send: Callable, method: str, path: str, url: str, timeout: float,
+                  kwargs: Dict[str, Any]) -> Callable[[], requests.Response]:
+        """Returns a send attempt that reports to the metrics recorder and the log."""
+        metrics = self.metrics
+        endpoint = endpoint_template(path)
+        attempts = 0
+
+        def attempt():
+            nonlocal attempts
+            attempts += 1
+            if attempts > 1 and metrics is not None:
+                metrics.record_retry(method, endpoint)
+            started = time.perf_counter()
+            try:
+                response = send(method, url, timeout, **kwargs)
+            except requests.RequestException:
+                elapsed = time.perf_counter() - started
+                if metrics is not None:
+                    metrics.record(method, endpoint, "error", elapsed)
+                _log_attempt(method, endpoint, "error", elapsed, attempts)
+                raise
+            elapsed = time.perf_counter() - started
+            if metrics is not None:
+                metrics.record(method, endpoint, response.status_code, elapsed,
+                               bytes_sent=_body_size(getattr(response, "request", None)),
+                               bytes_received=0 if kwargs.get("stream") else _body_size(response))
+            _log_attempt(method, endpoint, response.status_code, elapsed, attempts)
+            return response
+
+        return attempt
+
+    def _request(self, method: str, path: str, **kwargs):
+        """Sends a request and decodes the JSON body.
+
+        GET requests are answered from the cache while fresh and revalidated
+        with their ETag once stale. Identical GET requests in flight at the
+        same time share one response; each caller decodes its own copy.
+        """
+        key = path
+        if kwargs.get("params"):
+            key = f"{path}?{urlencode(sorted(kwargs['params'].items()))}"
+        cached = None
+        if self.cache is not None and method == "GET":
+            cached = self.cache.get(key)
+            if cached is not None and cached.fresh:
+                logger.debug("Cache hit for %s.", path)
+                if self.metrics is not None:
+                    self.metrics.record_cache_hit(method, endpoint_template(path))
+                return jsonio.loads(cached.body)
+            if cached is not None and cached.etag:
+                kwargs["headers"] = {"If-None-Match": cached.etag}
+        if method == "GET" and self.singleflight is not None:
+            flight = (key, cached.etag if cached is not None else None)
+            response, shared = self.singleflight.do(
+                flight, lambda: self._send(method, path, **kwargs))
+            if shared and self.metrics is not None:
+                self.metrics.record_coalesced(method, endpoint_template(path))
+        else:
+            response = self._send(method, path, **kwargs)
+            if self.singleflight is not None and method != "GET":
+                # Reads started before this mutation must not be joined by later ones.
+                self.singleflight.forget()
+        if cached is not None and response.status_code == 304:
+            self.cache.refresh(key, endpoint_template(path))
+            return jsonio.loads(cached.body)
+        response.raise_for_status()
+        if self.cache is not None and method == "GET":
+            etag = response.headers.get("ETag")
+            self.cache.set(key, endpoint_template(path), response.content,
+                           etag=etag if isinstance(etag, str) else None)
+        return jsonio.loads(response.content)
+
+    def _stream(self, path: str, key: str, **kwargs) -> ArrayStream:
+        """Sends a GET request and streams the items of one array in the response.
+
+        Items are decoded one at a time while the body downloads. With a
+        cache, the cached document is used instead. Identical streams started
+        while one waits for its response share its body; each caller decodes
+        the items itself.
+        """
+        if self.cache is not None:
+            return ArrayStream.from_document(self._request("GET", path, **kwargs), key)
+        if self.singleflight is None:
+            return ArrayStream(self._stream_body(path, **kwargs), key)
+        flight = ("stream", path, urlencode(sorted(kwargs.get("params", {}).items())))
+        body, shared, followers = self.singleflight.share(
+            flight, lambda: _SharedBody(self._stream_body(path, **kwargs)))
+        if shared:
+            if self.metrics is not None:
+                self.metrics.record_coalesced("GET", endpoint_template(path))
+        else:
+            body.expect(1 + followers)
+        return ArrayStream(body, key)
+
+    def _stream_body(self, path: str, **kwargs) -> Iterator[bytes]:
+        """Sends a streamed GET request and returns the chunks of its body."""
+        response = self._send("GET", path, stream=True, **kwargs)
+        response.raise_for_status()
+        on_chunk = None
+        if self.metrics is not None:
+            endpoint = endpoint_template(path)
+            on_chunk = lambda size: self.metrics.add_bytes_received("GET", endpoint, size)
+        return _iter_body(response, on_chunk)
+
+    def _model(self, model: Type[Model], data):
+        """Converts one object when the client returns models."""
+        return model.from_dict(data) if self.models else data
+
+    def _listing(self, model: Type[Model], result: Dict[str, Any], key: str):
+        """Converts the items of a listing when the client returns models."""
+        return convert_listing(model, result, key) if self.models else result
+
+    def _items(self, model: Type[Model], items: Iterable[Dict[str, Any]]):
+        """Converts streamed items when the client returns models."""
+        return map(model.from_dict, items) if self.models else iter(items)
+
+    def _invalidate(self, *paths: str, endpoints=()):
+        """Drops cached responses made stale by a mutation."""
+        if self.cache is None:
+            return
+        for path in paths:
+            self.cache.invalidate(path)
+        for endpoint in endpoints:
+            self.cache.invalidate_endpoint(endpoint)
 
     def get_teams(self):
         """Fetches the user's teams (workspaces)."""
-        response = self.session.get(
-            f"{self.base_url}team", timeout=self.timeout)
-        response.raise_for_status()
-        return response.json()
+        return self._listing(Team, self._request("GET", "team"), "teams")
 
     def create_space(self, team_id: str, name: str):
         """Creates a new space within a specified team."""
-        url = f"{self.base_url}team/{team_id}/space"
-        payload = {"name": name}
-        response = self.session.post(url, json=payload, timeout=self.timeout)
-        response.raise_for_status()
-        return response.json()
+        space = self._request("POST", f"team/{team_id}/space", json={"name": name})
+        self._invalidate(f"team/{team_id}/space")
+        return self._model(Space, space)
 
     def delete_space(self, space_id: str):
         """Deletes a specified space."""
-        url = f"{self.base_url}space/{space_id}"
-        response = self.session.delete(url, timeout=self.timeout)
-        response.raise_for_status()
-        return response.json()
+        result = self._request("DELETE", f"space/{space_id}")
+        # The owning team is unknown here, so every space listing is dropped.
+        self._invalidate(f"space/{space_id}", endpoints=("team/{id}/space",))
+        return result
 
     def get_spaces(self, team_id: str):
         """Retrieves all spaces for a specified team."""
-        url = f"{self.base_url}team/{team_id}/space"
-        response = self.session.get(url, timeout=self.timeout)
-        response.raise_for_status()
-        return response.json()
+        return self._listing(Space, self._request("GET", f"team/{team_id}/space"), "spaces")
 
     def get_space(self, space_id: str):
         """Retrieves details for a specified space."""
-        url = f"{self.base_url}space/{space_id}"
-        response = self.session.get(url, timeout=self.timeout)
-        response.raise_for_status()
-        return response.json()
+        return self._model(Space, self._request("GET", f"space/{space_id}"))
 
     def update_space(self, space_id: str, name: str):
         """Updates the name of a specified space."""
-        url = f"{self.base_url}space/{space_id}"
-        payload = {"name": name}
-        response = self.session.put(url, json=payload, timeout=self.timeout)
-        response.raise_for_status()
-        return response.json()
+        space = self._request("PUT", f"space/{space_id}", json={"name": name})
+        self._invalidate(f"space/{space_id}", endpoints=("team/{id}/space",))
+        return self._model(Space, space)
+
+    def get_folders(self, space_id: str):
+        """Retrieves all folders in a specified space."""
+        return self._listing(Folder, self._request("GET", f"space/{space_id}/folder"), "folders")
+
+    def get_folderless_lists(self, space_id: str):
+        """Retrieves the lists of a space that are not inside a folder."""
+        return self._listing(TaskList, self._request("GET", f"space/{space_id}/list"), "lists")
+
+    def get_lists(self, folder_id: str):
+        """Retrieves all lists in a specified folder."""
+        return self._listing(TaskList, self._request("GET", f"folder/{folder_id}/list"), "lists")
+
+    def get_tasks(self, list_id: str, page: int = 0, **params):
+        """Retrieves one page (up to 100 tasks) of a specified list.
+
+        Extra keyword arguments are passed as query filters, e.g.
+        ``include_closed=True``.
+        """
+        return self._listing(Task, self._request("GET", f"list/{list_id}/task",
+                                                 params=_query({**params, "page": page})),
+                             "tasks")
+
+    def iter_tasks(self, list_id: str, **params) -> Iterator[Dict[str, Any]]:
+        """Yields every task of a list, following pagination.
+
+        Each page is parsed incrementally, one task at a time.
+        """
+        yield from self._iter_pages(f"list/{list_id}/task", params)
+
+    def _iter_pages(self, path: str, params: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        page = 0
+        while True:
+            stream = self._stream(path, 'tasks', params=_query({**params, "page": page}))
+            yield from self._items(Task, stream)
+            if is_last_page(stream.envelope, count=stream.count):
+                return
+            page += 1
+
+    def iter_teams(self) -> Iterator[Dict[str, Any]]:
+        """Yields the user's teams one at a time as the response is parsed."""
+        return self._items(Team, self._stream("team", 'teams'))
+
+    def iter_spaces(self, team_id: str) -> Iterator[Dict[str, Any]]:
+        """Yields a team's spaces one at a time as the response is parsed."""
+        return self._items(Space, self._stream(f"team/{team_id}/space", 'spaces'))
+
+    def get_team_tasks(self, team_id: str, page: int = 0, **params):
+        """Retrieves one page of tasks across a whole team, with optional filters.
+
+        Useful filters include ``date_updated_gt`` (Unix time in milliseconds),
+        ``include_closed`` and ``subtasks``.
+        """
+        return self._listing(Task, self._request("GET", f"team/{team_id}/task",
+                                                 params=_query({**params, "page": page})),
+                             "tasks")
+
+    def iter_team_tasks(self, team_id: str, **params) -> Iterator[Dict[str, Any]]:
+        """Yields every task of a team matching the filters, following pagination."""
+        yield from self._iter_pages(f"team/{team_id}/task", params)
+
+    def get_task(self, task_id: str):
+        """Retrieves a single task."""
+        return self._model(Task, self._request("GET", f"task/{task_id}"))
+
+    def create_webhook(self, team_id: str, endpoint: str, events: Iterable[str] = ("*",),
+                       space_id: Optional[str] = None):
+        """Registers a webhook delivering a team's events to ``endpoint``.
+
+        The response's ``webhook.secret`` signs every delivery.
+        """
+        payload: Dict[str, Any] = {"endpoint": endpoint, "events": list(events)}
+        if space_id is not None:
+            payload["space_id"] = space_id
+        webhook = self._request("POST", f"team/{team_id}/webhook", json=payload)
+        self._invalidate(f"team/{team_id}/webhook")
+        return webhook
+
+    def get_webhooks(self, team_id: str):
+        """Retrieves the webhooks registered for a team by this token."""
+        return self._request("GET", f"team/{team_id}/webhook")
+
+    def delete_webhook(self, webhook_id: str):
+        """Deletes a webhook."""
+        result = self._request("DELETE", f"webhook/{webhook_id}")
+        self._invalidate(endpoints=("team/{id}/webhook",))
+        return result
@@ -0,0 +1,149 @@
+import asyncio
+import json
+import logging
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, TextIO, Tuple
+
+from . import jsonio
+from .async_client import AsyncClickUpClient
+
+logger = logging.getLogger(__name__)
+
+LEVELS = ('team', 'space', 'folder', 'list', 'task')
+
+
+class JsonlSink:
+    """Writes crawled objects to a stream, one JSON record per line."""
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self.counts = Counter()
+
+    def write(self, kind: str, parent_id: Optional[str], data: Dict[str, Any]):
+        record = {'type': kind, 'parent_id': parent_id, 'data': data}
+        self.stream.write(json.dumps(record, default=jsonio.default) + '\n')
+        self.counts[kind] += 1
+
+    def flush(self):
+        self.stream.flush()
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+
+class Crawler:
+    """Snapshots a workspace hierarchy level by level.
+
+    Each level (teams, spaces, folders, lists, tasks) is fetched with one
+    concurrent wave of requests, bounded by the async client's concurrency.
+    Objects are handed to the sink as soon as their response arrives; only
+    the IDs needed for the next level are kept in memory.
+    """
+
+    def __init__(self, client: AsyncClickUpClient, sink, include_tasks: bool = True,
+                 task_filters: Optional[Dict[str, Any]] = None):
+        """
+        Initializes the Crawler.
+
+        Args:
+            client: The async client used for every request.
+            sink: Receives ``write(kind, parent_id, data)`` for every object.
+            include_tasks: Whether to descend into the tasks of each list.
+            task_filters: Extra query filters for the task endpoint, e.g.
+                ``{"include_closed": True, "subtasks": True}``.
+        """
+        self.client = client
+        self.sink = sink
+        self.include_tasks = include_tasks
+        self.task_filters = task_filters or {}
+
+    def _emit(self, kind: str, parent_id: Optional[str], items: Iterable[Dict[str, Any]]) -> List[str]:
+        """Writes objects to the sink and returns their IDs."""
+        ids = []
+        for item in items:
+            self.sink.write(kind, parent_id, item)
+            ids.append(item['id'])
+        return ids
+
+    async def _spaces(self, team_id: str) -> List[str]:
+        result = await self.client.get_spaces(team_id)
+        return self._emit('space', team_id, result.get('spaces', []))
+
+    async def _space_children(self, space_id: str) -> Tuple[List[str], List[str]]:
+        """Writes a space's folders and lists, returning folders still to expand.
+
+        Folder responses normally embed their lists, which saves a request
+        per folder; folders without them are returned for the next level.
+        """
+        folders, lists = await asyncio.gather(
+            self.client.get_folders(space_id), self.client.get_folderless_lists(space_id))
+        unexpanded, list_ids = [], self._emit('list', space_id, lists.get('lists', []))
+        for folder in folders.get('folders', []):
+            embedded = folder.get('lists')
+            self.sink.write('folder', space_id,
+                            {key: value for key, value in folder.items() if key != 'lists'})
+            if embedded is None:
+                unexpanded.append(folder['id'])
+            else:
+                list_ids += self._emit('list', folder['id'], embedded)
+        return unexpanded, list_ids
+
+    async def _folder_lists(self, folder_id: str) -> List[str]:
+        result = await self.client.get_lists(folder_id)
+        return self._emit('list', folder_id, result.get('lists', []))
+
+    async def _tasks(self, list_id: str):
+        async for task in self.client.iter_tasks(list_id, **self.task_filters):
+            self.sink.write('task', list_id, task)
+
+    async def crawl(self, team_ids: Optional[Iterable[str]] = None) -> Counter:
+        """Crawls the given teams (all teams by default) and returns object counts."""
+        teams = (await self.client.get_teams()).get('teams', [])
+        if team_ids is not None:
+            wanted = set(team_ids)
+            teams = [team for team in teams if team['id'] in wanted]
+        team_ids = self._emit('team', None, teams)
+
+        space_ids = [space_id for ids in await asyncio.gather(
+            *(self._spaces(team_id) for team_id in team_ids)) for space_id in ids]
+        logger.info("Crawled %d spaces.", len(space_ids))
+
+        folder_ids, list_ids = [], []
+        for unexpanded, found in await asyncio.gather(
+                *(self._space_children(space_id) for space_id in space_ids)):
+            folder_ids += unexpanded
+            list_ids += found
+
+        list_ids += [list_id for ids in await asyncio.gather(
+            *(self._folder_lists(folder_id) for folder_id in folder_ids)) for list_id in ids]
+        logger.info("Crawled %d lists.", len(list_ids))
+
+        if self.include_tasks:
+            await asyncio.gather(*(self._tasks(list_id) for list_id in list_ids))
+        return self.sink.counts
+
+
+def crawl_to_sink(client: AsyncClickUpClient, sink, team_ids: Optional[Iterable[str]] = None,
+                  include_tasks: bool = True) -> Dict[str, Any]:
+    """Crawls a workspace into a sink and returns throughput statistics."""
+    started = time.perf_counter()
+    crawler = Crawler(client, sink, include_tasks=include_tasks,
+                      task_filters={'include_closed': True, 'subtasks': True})
+    asyncio.run(crawler.crawl(team_ids))
+    sink.flush()
+    elapsed = time.perf_counter() - started
+    return {
+        'counts': {level: sink.counts[level] for level in LEVELS},
+        'total': sink.total,
+        'seconds': elapsed,
+        'objects_per_second': sink.total / elapsed if elapsed else 0.0,
+    }
+
+
+def crawl_to_file(client: AsyncClickUpClient, path: str, team_ids: Optional[Iterable[str]] = None,
+                  include_tasks: bool = True) -> Dict[str, Any]:
+    """Crawls a workspace into a JSONL file and returns throughput statistics."""
+    with open(path, 'w', encoding='utf-8') as stream:
+        return crawl_to_sink(client, JsonlSink(stream), team_ids, include_tasks)
@@ -0,0 +1,364 @@
+"""A durable SQLite queue for mutating operations.
+
+Operations are written to the queue before any of them runs, each under an
+idempotency key, and drained by a pool of workers. A job's state is
+committed as it moves from ``pending`` to ``running`` to ``done`` or
+``failed``, so a run that dies can be resumed without redoing completed
+work.
+
+Delivery is at least once: a job that was running when the process died,
+or whose last attempt failed in transit, is sent again. Before that, its
+check against the current workspace state runs, e.g. whether the space to
+create already exists. A job whose effect is already in place is marked
+done instead of being repeated.
+
+One process drains a queue at a time; enqueueing and status reads are safe
+alongside it.
+"""
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import requests
+from requests.exceptions import HTTPError
+
+from .batch import OPERATIONS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = 'clickup_queue.sqlite'
+STATES = ('pending', 'running', 'done', 'failed')
+MUTATIONS = ('create-space', 'update-space', 'delete-space')
+# The fields each mutation needs, checked when it is queued.
+REQUIRED_FIELDS = {
+    'create-space': ('team_id', 'name'),
+    'update-space': ('space_id', 'name'),
+    'delete-space': ('space_id',),
+}
+# Transient failures are retried this many times before a job fails for good.
+MAX_ATTEMPTS = 5
+RETRY_DELAY = 2.0
+
+SCHEMA = """
+PRAGMA journal_mode=WAL;
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    op TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    updated_at REAL);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, id);
+"""
+
+
+def idempotency_key(operation: Dict[str, Any]) -> str:
+    """Returns the operation's ``key`` field, or a hash of its content.
+
+    Identical operations share a key and are queued once; give them explicit
+    keys to queue one twice on purpose.
+    """
+    if operation.get('key'):
+        return str(operation['key'])
+    content = json.dumps(operation, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def _space_named(client, team_id: str, name: str) -> Optional[Dict[str, Any]]:
+    return next((space for space in client.iter_spaces(team_id) if space.get('name') == name),
+                None)
+
+
+def _current_space(client, space_id: str) -> Optional[Dict[str, Any]]:
+    try:
+        return client.get_space(space_id)
+    except HTTPError as e:
+        if e.response is not None and e.response.status_code == 404:
+            return None
+        raise
+
+
+def _check_update(client, op: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    space = _current_space(client, op['space_id'])
+    return space if space is not None and space.get('name') == op['name'] else None
+
+
+def _check_delete(client, op: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    return {} if _current_space(client, op['space_id']) is None else None
+
+
+# Maps an operation to a check of whether its effect is already in place.
+# A check returns the result to record instead of running the operation, or
+# None when the operation still has to run.
+CHECKS: Dict[str, Callable[[Any, Dict[str, Any]], Optional[Dict[str, Any]]]] = {
+    'create-space': lambda client, op: _space_named(client, op['team_id'], op['name']),
+    'update-space': _check_update,
+    'delete-space': _check_delete,
+}
+
+
+@dataclass
+class Job:
+    """A claimed job."""
+
+    id: int
+    key: str
+    op: str
+    payload: Dict[str, Any]
+    attempts: int
+
+
+def run_job(client, job: Job) -> Tuple[Job, str, Any]:
+    """Runs a claimed job and returns it with its outcome.
+
+    Returns:
+        ``(job, outcome, value)``: ``done`` with the result, ``retry`` with
+        the error of a transient failure, or ``failed`` with the error.
+    """
+    try:
+        # A job sent before may have landed without its result being saved.
+        existing = CHECKS[job.op](client, job.payload) if job.attempts > 1 else None
+        if existing is not None:
+            logger.info("Job %s was already applied.", job.key)
+            return job, 'done', existing
+        return job, 'done', OPERATIONS[job.op](client, job.payload)
+    except HTTPError as e:
+        status = e.response.status_code if e.response is not None else None
+        message = f"HTTP {status}: {e.response.text if e.response is not None else e}"
+        if status == 429 or (status is not None and status >= 500):
+            return job, 'retry', message
+        return job, 'failed', message
+    except requests.RequestException as e:
+        return job, 'retry', str(e)
+    except Exception as e:
+        logger.exception("Job %s failed.", job.key)
+        return job, 'failed', str(e)
+
+
+class JobQueue:
+    """The jobs of a migration, kept in a SQLite file."""
+
+    def __init__(self, path: str = DEFAULT_PATH,
+                 clock: Callable[[], float] = time.time):
+        """
+        Initializes the JobQueue.
+
+        Args:
+            path: The SQLite database file.
+            clock: Returns the current time in seconds.
+        """
+        self.path = path
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.executescript(SCHEMA)
+        # Each commit survives a crash of this process; WAL makes them cheap.
+        self._db.execute("PRAGMA synchronous=NORMAL")
+
+    def close(self):
+        """Closes the database."""
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self) -> "JobQueue":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _write(self, statement: str, rows: Iterable[tuple]) -> int:
+        """Runs a statement for each row in one transaction."""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._db.executemany(statement, rows)
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+            return cursor.rowcount
+
+    def enqueue(self, operations: Iterable[Tuple[int, Dict[str, Any]]],
+                chunk_size: int = 1000) -> Dict[str, int]:
+        """Adds operations, skipping those whose key is already queued.
+
+        Operations that cannot run (reads, unknown ones or ones missing a
+        required field) are recorded as failed so ``status`` reports them.
+
+        Args:
+            operations: ``(line_number, operation)`` pairs, e.g. from
+                batch.read_operations.
+            chunk_size: How many operations are committed together.
+
+        Returns:
+            Counts of added, duplicate and invalid operations.
+        """
+        summary = {'added': 0, 'duplicates': 0, 'invalid': 0}
+        statement = ("INSERT OR IGNORE INTO jobs (key, op, payload, state, error, updated_at) "
+                     "VALUES (?, ?, ?, ?, ?, ?)")
+        rows: List[tuple] = []
+        invalid: List[tuple] = []
+
+        def flush():
+            added = self._write(statement, rows)
+            summary['added'] += added
+            summary['duplicates'] += len(rows) - added
+            self._write(statement, invalid)
+            rows.clear()
+            invalid.clear()
+
+        now = self._clock()
+        for line_number, operation in operations:
+            op = operation.get('op')
+            error = operation.get('error')
+            if error is None and op not in MUTATIONS:
+                error = f"Not a queueable operation: {op!r}"
+            if error is None:
+                missing = [field for field in REQUIRED_FIELDS[op] if field not in operation]
+                if missing:
+                    error = f"Missing field: {', '.join(missing)}"
+            if error is not None:
+                summary['invalid'] += 1
+                logger.warning("Line %d is not queued: %s", line_number, error)
+                invalid.append((idempotency_key(operation), str(op), json.dumps(operation),
+                                'failed', error, now))
+            else:
+                rows.append((idempotency_key(operation), op, json.dumps(operation),
+                             'pending', None, now))
+            if len(rows) + len(invalid) >= chunk_size:
+                flush()
+        flush()
+        logger.info("Enqueued: %s", summary)
+        return summary
+
+    def recover(self) -> int:
+        """Returns jobs left running by a process that died to the pending state."""
+        recovered = self._write(
+            "UPDATE jobs SET state = 'pending', updated_at = ? WHERE state = 'running'",
+            [(self._clock(),)])
+        if recovered:
+            logger.info("Recovered %d interrupted jobs.", recovered)
+        return recovered
+
+    def retry_failed(self) -> int:
+        """Moves failed jobs back to pending, with fresh attempts."""
+        return self._write(
+            "UPDATE jobs SET state = 'pending', attempts = 0, available_at = 0, error = NULL, "
+            "updated_at = ? WHERE state = 'failed' AND op IN (?, ?, ?)",
+            [(self._clock(),) + MUTATIONS])
+
+    def claim(self, limit: int) -> List[Job]:
+        """Marks up to ``limit`` available pending jobs as running and returns them."""
+        now = self._clock()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._db.execute(
+                    "SELECT id, key, op, payload, attempts FROM jobs "
+                    "WHERE state = 'pending' AND available_at <= ? ORDER BY id LIMIT ?",
+                    (now, limit)).fetchall()
+                self._db.executemany(
+                    "UPDATE jobs SET state = 'running', attempts = attempts + 1, "
+                    "updated_at = ? WHERE id = ?", [(now, row[0]) for row in rows])
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+        return [Job(job_id, key, op, json.loads(payload), attempts + 1)
+                for job_id, key, op, payload, attempts in rows]
+
+    def finish(self, outcomes: Iterable[Tuple[Job, str, Any]],
+               max_attempts: int = MAX_ATTEMPTS, retry_delay: float = RETRY_DELAY):
+        """Records the outcomes of run_job in one transaction."""
+        now = self._clock()
+        rows = []
+        for job, outcome, value in outcomes:
+            if outcome == 'retry' and job.attempts >= max_attempts:
+                outcome = 'failed'
+            if outcome == 'done':
+                rows.append(('done', json.dumps(value, default=str), None, 0, now, job.id))
+            elif outcome == 'retry':
+                delay = retry_delay * 2 ** (job.attempts - 1)
+                rows.append(('pending', None, value, now + delay, now, job.id))
+            else:
+                rows.append(('failed', None, value, 0, now, job.id))
+        self._write("UPDATE jobs SET state = ?, result = ?, error = ?, available_at = ?, "
+                    "updated_at = ? WHERE id = ?", rows)
+
+    def next_available(self) -> Optional[float]:
+        """Returns when the next pending job becomes available, if there is one."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT MIN(available_at) FROM jobs WHERE state = 'pending'").fetchone()[0]
+
+    def counts(self) -> Dict[str, int]:
+        """Returns the number of jobs in each state."""
+        with self._lock:
+            rows = self._db.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        counts = dict.fromkeys(STATES, 0)
+        counts.update(rows)
+        return counts
+
+    def failures(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Returns the most recent failed jobs with their errors."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT key, payload, attempts, error FROM jobs WHERE state = 'failed' "
+                "ORDER BY updated_at DESC, id DESC LIMIT ?", (limit,)).fetchall()
+        return [{'key': key, 'operation': json.loads(payload), 'attempts': attempts,
+                 'error': error} for key, payload, attempts, error in rows]
+
+    def drain(self, client, workers: int = 8, max_attempts: int = MAX_ATTEMPTS,
+              retry_delay: float = RETRY_DELAY,
+              sleep: Callable[[float], None] = time.sleep) -> Dict[str, int]:
+        """Runs pending jobs on ``workers`` threads until none are left.
+
+        Jobs interrupted by an earlier run are recovered first. Outcomes are
+        committed as jobs complete, in batches, so at most the outcomes of
+        the jobs finishing together are lost in a crash; those jobs are
+        checked against the workspace and not repeated when resumed.
+
+        Args:
+            client: The ClickUpClient the operations run on.
+            workers: The number of concurrent requests.
+            max_attempts: How many times a transient failure is retried.
+            retry_delay: The first retry delay in seconds; it doubles.
+            sleep: The function used to wait for delayed retries.
+
+        Returns:
+            Counts of jobs done, retried and failed by this run.
+        """
+        self.recover()
+        summary = {'done': 0, 'retried': 0, 'failed': 0}
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='queue') as executor:
+            pending = set()
+            while True:
+                if len(pending) < workers:
+                    pending |= {executor.submit(run_job, client, job)
+                                for job in self.claim(2 * workers - len(pending))}
+                if not pending:
+                    available_at = self.next_available()
+                    if available_at is None:
+                        break
+                    sleep(max(0.0, available_at - self._clock()))
+                    continue
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                outcomes = [future.result() for future in done]
+                self.finish(outcomes, max_attempts=max_attempts, retry_delay=retry_delay)
+                for job, outcome, _ in outcomes:
+                    if outcome == 'retry' and job.attempts < max_attempts:
+                        summary['retried'] += 1
+                    else:
+                        summary['done' if outcome == 'done' else 'failed'] += 1
+        logger.info("Queue drained: %s", summary)
+        return summary
@@ -0,0 +1,204 @@
+import json
+import logging
+import re
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+def default(obj: Any) -> Any:
+    """Encodes objects that know their plain form, such as models."""
+    to_dict = getattr(obj, 'to_dict', None)
+    if to_dict is None:
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    return to_dict()
+
+
+def _json_dumps(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=default)
+
+
+BACKENDS: Dict[str, Dict[str, Callable]] = {
+    'json': {'loads': json.loads, 'dumps': _json_dumps},
+}
+if orjson is not None:
+    BACKENDS['orjson'] = {'loads': orjson.loads,
+                          'dumps': lambda obj: orjson.dumps(obj, default=default).decode('utf-8')}
+
+_backend = 'orjson' if orjson is not None else 'json'
+
+
+def get_backend() -> str:
+    """Returns the name of the JSON backend in use."""
+    return _backend
+
+
+def set_backend(name: str):
+    """Selects the JSON backend, e.g. ``json`` or ``orjson`` when installed."""
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown or unavailable JSON backend: {name!r}")
+    _backend = name
+
+
+def loads(data) -> Any:
+    """Decodes JSON from ``str`` or ``bytes`` with the selected backend."""
+    return BACKENDS[_backend]['loads'](data)
+
+
+def dumps(obj: Any) -> str:
+    """Encodes an object to compact JSON text with the selected backend."""
+    return BACKENDS[_backend]['dumps'](obj)
+
+
+# The bytes that change the parser state outside and inside strings.
+_STRUCTURAL = re.compile(rb'["\[\]{},:]')
+_STRING_END = re.compile(rb'["\\]')
+_QUOTE, _BACKSLASH, _COMMA, _COLON = b'"'[0], b'\\'[0], b','[0], b':'[0]
+_LBRACKET, _RBRACKET = b'['[0], b']'[0]
+_OPEN, _CLOSE = b'{[', b'}]'
+
+
+class ArrayStream:
+    """Iterates over the items of one array in a JSON object as bytes arrive.
+
+    Only the array under ``key`` at the top level of the document is
+    decoded, one item at a time, so memory is bounded by the largest item
+    rather than the whole body. Everything around the array is kept and
+    exposed as ``envelope`` (with the array emptied) once iteration ends,
+    e.g. ``{"tasks": [], "last_page": true}``.
+    """
+
+    def __init__(self, chunks: Iterable[bytes], key: str):
+        self._chunks = chunks
+        self._key = key.encode('utf-8')
+        self._items: Optional[list] = None
+        self._envelope = bytearray()
+        self._envelope_data: Optional[Dict[str, Any]] = None
+        self.count = 0
+
+    @classmethod
+    def from_document(cls, document: Dict[str, Any], key: str) -> 'ArrayStream':
+        """Wraps an already decoded document, e.g. one served from a cache."""
+        stream = cls((), key)
+        stream._items = list(document.get(key, []))
+        stream._envelope_data = {**document, key: []}
+        return stream
+
+    @property
+    def envelope(self) -> Dict[str, Any]:
+        """The document without the array's items. Complete after iteration."""
+        if self._envelope_data is None:
+            self._envelope_data = loads(bytes(self._envelope)) if self._envelope else {}
+        return self._envelope_data
+
+    def __iter__(self) -> Iterator[Any]:
+        items = self._items if self._items is not None else self._parse()
+        for item in items:
+            self.count += 1
+            yield item
+
+    def _parse(self) -> Iterator[Any]:
+        buf = bytearray()
+        envelope = self._envelope
+        i = depth = string_start = last_delim = 0
+        in_string = key_matched = False
+        last_string = item_start = None
+        phase = 'seek'  # then 'items', then 'done'
+
+        for chunk in self._chunks:
+            if phase == 'done':
+                envelope += chunk
+                continue
+            buf += chunk
+            while phase != 'done':
+                if in_string:
+                    match = _STRING_END.search(buf, i)
+                    if match is None:
+                        i = len(buf)
+                        break
+                    j = match.start()
+                    if buf[j] == _BACKSLASH:
+                        if j + 1 >= len(buf):
+                            i = j  # the escaped byte is in the next chunk
+                            break
+                        i = j + 2
+                        continue
+                    in_string = False
+                    i = j + 1
+                    if phase == 'seek' and depth == 1:
+                        last_string = bytes(buf[string_start + 1:j])
+                    continue
+
+                match = _STRUCTURAL.search(buf, i)
+                if match is None:
+                    i = len(buf)
+                    break
+                j = match.start()
+                c = buf[j]
+                i = j + 1
+                if c == _QUOTE:
+                    in_string = True
+                    string_start = j
+                    if phase == 'items' and depth == 2:
+                        item_start = j
+                elif phase == 'seek':
+                    if c == _LBRACKET and depth == 1 and key_matched:
+                        phase = 'items'
+                        depth = 2
+                        envelope += buf[:i]
+                        del buf[:i]
+                        i = last_delim = 0
+                    elif c in _OPEN:
+                        depth += 1
+                        key_matched = False
+                    elif c in _CLOSE:
+                        depth -= 1
+                    elif c == _COLON and depth == 1:
+                        key_matched = last_string == self._key
+                    elif c == _COMMA:
+                        key_matched = False
+                elif depth == 2:
+                    if c == _COMMA or c == _RBRACKET:
+                        if item_start is not None:
+                            yield loads(bytes(buf[item_start:j]))
+                            item_start = None
+                        else:
+                            scalar = bytes(buf[last_delim:j]).strip()
+                            if scalar:
+                                yield loads(scalar)
+                        last_delim = i
+                        if c == _RBRACKET:
+                            phase = 'done'
+                            envelope += buf[j:]
+                    elif c in _OPEN:
+                        item_start = j
+                        depth += 1
+                elif c in _OPEN:
+                    depth += 1
+                elif c in _CLOSE:
+                    depth -= 1
+                    if depth == 2:
+                        yield loads(bytes(buf[item_start:i]))
+                        item_start = None
+                        last_delim = i
+
+            # Move consumed bytes out of the buffer.
+            if phase == 'seek':
+                keep = string_start if in_string else i
+                envelope += buf[:keep]
+            elif phase == 'items':
+                keep = item_start if item_start is not None else last_delim
+            else:
+                keep = len(buf)
+            del buf[:keep]
+            i -= keep
+            string_start -= keep
+            last_delim -= keep
+            if item_start is not None:
+                item_start -= keep
@@ -0,0 +1,170 @@
+"""The CLI's logging pipeline.
+
+Callers only put records on a queue. A QueueListener thread formats them and
+does the file and console I/O, so a slow disk never delays a request.
+Messages use lazy ``%`` formatting: a record filtered out by level costs
+one level check. An enabled one has its message interpolated once, in the
+calling thread, because its arguments may change after the call returns.
+The rest of the formatting, timestamps and JSON included, is left to the
+listener.
+
+Records can be written as text or as one JSON object per line. The JSON
+form carries the ID of the request being made and, for HTTP attempts, its
+method, endpoint, status and duration.
+"""
+import atexit
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# Record attributes copied into JSON records when they are set.
+STRUCTURED_FIELDS = ('request_id', 'method', 'endpoint', 'status', 'duration_ms', 'attempt')
+
+# The ID of the client request being made in this thread or task, if any.
+current_request_id: ContextVar[Optional[str]] = ContextVar('current_request_id', default=None)
+_request_numbers = itertools.count(1)
+_REQUEST_PREFIX = f"{os.getpid():x}"
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.Handler] = None
+_root_level: Optional[int] = None
+
+
+def next_request_id() -> str:
+    """Returns a process-unique request ID such as ``1f2e-42``."""
+    return f"{_REQUEST_PREFIX}-{next(_request_numbers)}"
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamps records with the current request ID, in the logging thread."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, 'request_id', None) is None:
+            record.request_id = current_request_id.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as one JSON object."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName,
+        }
+        for field in STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                data[field] = value
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data['exception'] = record.exc_text
+        return json.dumps(data, default=str)
+
+
+class _ConsoleHandler(logging.StreamHandler):
+    """Writes to whatever ``sys.stderr`` is when a record is emitted."""
+
+    def __init__(self):
+        logging.Handler.__init__(self)
+
+    @property
+    def stream(self):
+        return sys.stderr
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Queues records without formatting them in the caller's thread.
+
+    The message is rendered from its arguments here, since the arguments may
+    change once the call returns, but all other formatting is left to the
+    listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # Tracebacks hold frames that cannot cross to another thread safely.
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging(path: Optional[str] = 'clickup_agent.log', level: int = logging.INFO,
+                  fmt: str = 'text', max_bytes: int = 10 * 1024 * 1024, backups: int = 5,
+                  when: Optional[str] = None, console_level: int = logging.WARNING):
+    """Routes all log records through a background queue to a file and stderr.
+
+    Calling it again replaces the previous configuration.
+
+    Args:
+        path: The log file, or None for the console only.
+        level: The lowest level recorded.
+        fmt: ``text`` or ``json``.
+        max_bytes: Rotate the file once it reaches this size (0 to disable).
+        backups: How many rotated files are kept.
+        when: Rotate by time instead, e.g. ``midnight`` or ``H`` (see
+            TimedRotatingFileHandler).
+        console_level: The lowest level also printed to stderr.
+    """
+    global _listener, _queue_handler, _root_level
+    shutdown_logging()
+    formatter = JsonFormatter() if fmt == 'json' else logging.Formatter(TEXT_FORMAT)
+
+    console = _ConsoleHandler()
+    console.setLevel(console_level)
+    console.setFormatter(logging.Formatter(TEXT_FORMAT))
+    handlers = [console]
+    if path:
+        if when:
+            file_handler = logging.handlers.TimedRotatingFileHandler(
+                path, when=when, backupCount=backups, encoding='utf-8', delay=True)
+        else:
+            file_handler = logging.handlers.RotatingFileHandler(
+                path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8', delay=True)
+        file_handler.setLevel(level)
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    _queue_handler = _QueueHandler(records)
+    _queue_handler.addFilter(RequestContextFilter())
+    root = logging.getLogger()
+    root.addHandler(_queue_handler)
+    _root_level = root.level
+    root.setLevel(min(level, console_level))
+    _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging():
+    """Writes out queued records and stops the pipeline, if it is running."""
+    global _listener, _queue_handler, _root_level
+    if _queue_handler is not None:
+        root = logging.getLogger()
+        root.removeHandler(_queue_handler)
+        root.setLevel(_root_level)
+        _queue_handler = _root_level = None
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
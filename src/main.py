@@ -1,52 +1,396 @@
 import argparse
 import logging
 import os
+import sys
+from typing import TYPE_CHECKING, List, Optional
 
-from dotenv import load_dotenv
-from requests.exceptions import HTTPError
+if not __package__:
+    # Run as a script (python src/main.py): import the rest of the CLI as
+    # the src package, from the repository root rather than from src/.
+    _ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path[:] = [_ROOT] + [entry for entry in sys.path
+                             if os.path.abspath(entry or os.curdir) != os.path.join(_ROOT, 'src')]
+    __package__ = 'src'
 
-from clickup_client import ClickUpClient
+from .output import FORMATS  # noqa: E402
+
+# Only what building the parser needs is imported up front, so --help and
+# argument errors return quickly. Everything else, including requests and
+# the log file, is loaded once a command runs.
+if TYPE_CHECKING:
+    from .clickup_client import ClickUpClient
+    from .metrics import MetricsRecorder
+    from .token_pool import TokenPool
 
-# --- Logging Setup ---
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
 
-# Create handlers
-c_handler = logging.StreamHandler()
-f_handler = logging.FileHandler('clickup_agent.log')
-c_handler.setLevel(logging.WARNING)
-f_handler.setLevel(logging.INFO)
 
-# Create formatters and add them to handlers
-log_format = logging.Formatter(
-    '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-c_handler.setFormatter(log_format)
-f_handler.setFormatter(log_format)
+def setup_logging(args: argparse.Namespace):
+    """Starts the background logging pipeline configured by the --log-* options."""
+    from . import logs
 
-# Add handlers to the logger
-logger.addHandler(c_handler)
-logger.addHandler(f_handler)
-# --- End Logging Setup ---
+    logs.setup_logging(
+        args.log_file or None, level=getattr(logging, args.log_level), fmt=args.log_format,
+        max_bytes=args.log_max_bytes, when=args.log_rotate_when)
 
-# Load environment variables from .env file
-load_dotenv()
 
+def __getattr__(name: str):
+    # ClickUpClient is resolved on first use so importing this module does not
+    # import requests. Going through the module attribute keeps it patchable.
+    if name == 'ClickUpClient':
+        from .clickup_client import ClickUpClient
+        return ClickUpClient
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-def main():
-    """Main function to run the ClickUp client CLI."""
-    logger.info("Starting ClickUp Agent CLI")
-    api_token = os.getenv("CLICKUP_API_TOKEN")
 
-    if not api_token or api_token == "YOUR_API_TOKEN":
-        logger.error(
-            "CLICKUP_API_TOKEN is not configured. Please set it in the .env file.")
-        print("Please configure your CLICKUP_API_TOKEN in the .env file.")
+def _client_class():
+    return getattr(sys.modules[__name__], 'ClickUpClient')
+
+
+# Options the token pool's workers do not apply: each builds a plain client
+# from its own token, so these are refused rather than silently ignored.
+POOL_UNSUPPORTED = (('cache', '--cache'), ('record', '--record'), ('replay', '--replay'),
+                    ('inject_latency', '--inject-latency'), ('inject_errors', '--inject-errors'),
+                    ('adaptive', '--adaptive'))
+
+
+def unsupported_pool_options(args: argparse.Namespace) -> List[str]:
+    """Returns the options given with --token-pool that its workers would not apply."""
+    options = [flag for name, flag in POOL_UNSUPPORTED if getattr(args, name, None)]
+    if args.transport != 'requests':
+        options.append('--transport')
+    return options
+
+
+def open_token_pool(api_token: str, args: argparse.Namespace) -> 'TokenPool':
+    """Starts one worker per token of CLICKUP_API_TOKENS (or the single token)."""
+    from .token_pool import TokenPool, parse_tokens
+
+    tokens = parse_tokens(os.getenv('CLICKUP_API_TOKENS') or api_token)
+    logger.info("Starting a token pool with %d tokens.", len(tokens))
+    return TokenPool(tokens, base_url=resolve_base_url(args), concurrency=args.workers)
+
+
+def run_batch_command(client: 'ClickUpClient', args: argparse.Namespace,
+                      pool: Optional['TokenPool'] = None):
+    """Runs the operations of a batch file and reports a summary.
+
+    With a token pool, operations are spread over its tokens' workers.
+    """
+    from .batch import detect_format, load_completed, read_operations, run_batch
+
+    if args.resume and not args.output:
+        print("--resume requires --output.")
+        return
+    fmt = args.format or detect_format(args.file)
+    skip = load_completed(args.output) if args.resume else set()
+    if skip:
+        logger.info("Resuming batch, skipping %d completed lines.", len(skip))
+    source = sys.stdin if args.file == '-' else open(args.file, newline='', encoding='utf-8')
+    output = (open(args.output, 'a' if args.resume else 'w', encoding='utf-8')
+              if args.output else sys.stdout)
+    try:
+        if pool is not None:
+            from .token_pool import run_batch as run_pooled_batch
+            summary = run_pooled_batch(pool, read_operations(source, fmt), output, skip=skip)
+        else:
+            summary = run_batch(client, read_operations(source, fmt), output,
+                                workers=args.workers, skip=skip)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+    print(f"Batch complete: {summary['succeeded']} succeeded, "
+          f"{summary['failed']} failed, {summary['skipped']} skipped.",
+          file=sys.stderr if output is sys.stdout else sys.stdout)
+
+
+def run_pooled_crawl(client: 'ClickUpClient', api_token: str, args: argparse.Namespace):
+    """Crawls each team on a worker of the token pool into one file or mirror."""
+    import time
+
+    from .crawler import LEVELS, JsonlSink
+    from .mirror import Mirror, MirrorSink
+
+    team_ids = args.team_ids or [team['id'] for team in client.iter_teams()]
+    mirror = Mirror(args.mirror) if args.to_mirror else None
+    stream = None if mirror else open(args.output, 'w', encoding='utf-8')
+    sink = MirrorSink(mirror) if mirror else JsonlSink(stream)
+    started = time.perf_counter()
+    try:
+        with open_token_pool(api_token, args) as pool:
+            from .token_pool import crawl_teams
+            for record in crawl_teams(pool, team_ids, include_tasks=not args.no_tasks):
+                sink.write(record['type'], record['parent_id'], record['data'])
+        sink.flush()
+    finally:
+        if mirror is not None:
+            mirror.close()
+        else:
+            stream.close()
+    elapsed = time.perf_counter() - started
+    counts = ', '.join(f"{sink.counts[level]} {level}s" for level in LEVELS)
+    print(f"Crawled {sink.total} objects ({counts}) in {elapsed:.1f}s "
+          f"({sink.total / elapsed if elapsed else 0.0:.1f} objects/sec).")
+    print(pool.summary(), file=sys.stderr)
+
+
+def run_apply_command(client: 'ClickUpClient', args: argparse.Namespace):
+    """Reconciles the spaces of each team with a manifest, or prints the plan."""
+    from .apply import ManifestError, apply_changes, load_manifest, plan
+    from .output import write_items
+
+    try:
+        specs = load_manifest(args.manifest)
+        changes = plan(client, specs, workers=args.workers, prune=args.prune)
+    except ManifestError as e:
+        print(f"Invalid manifest: {e}")
+        return
+    if args.dry_run or not changes:
+        if args.output_format != 'table':
+            write_items((change.as_dict() for change in changes), args.output_format)
+            return
+        print(f"{len(changes)} changes planned for {len(specs)} teams"
+              f"{' (dry run)' if args.dry_run and changes else ''}.")
+        for change in changes:
+            print(change.describe())
+        return
+    records = apply_changes(client, changes, workers=args.workers)
+    if args.output_format != 'table':
+        write_items(records, args.output_format)
         return
+    for record in records:
+        outcome = 'ok' if record['ok'] else f"failed: {record['error']}"
+        print(f"{changes[record['line'] - 1].describe()}: {outcome}")
+    failed = sum(1 for record in records if not record['ok'])
+    print(f"Applied {len(records) - failed} of {len(records)} changes.")
+
+
+def run_webhook_command(client: 'ClickUpClient', args: argparse.Namespace):
+    """Registers, lists or deletes webhooks, or receives their deliveries."""
+    from .output import write_item, write_items
+
+    if args.webhook_command == 'create':
+        result = client.create_webhook(args.team_id, args.endpoint, events=args.events or ['*'],
+                                       space_id=args.space_id)
+        webhook = result.get('webhook', result)
+        if args.output_format == 'table':
+            print(f"Created webhook {webhook.get('id')} for {webhook.get('endpoint')}.")
+            print(f"Signing secret: {webhook.get('secret')}")
+        else:
+            write_item(webhook, args.output_format)
+
+    elif args.webhook_command == 'list':
+        write_items(client.get_webhooks(args.team_id).get('webhooks', []), args.output_format,
+                    title=f"Webhooks of team {args.team_id}:")
+
+    elif args.webhook_command == 'delete':
+        result = client.delete_webhook(args.webhook_id)
+        if args.output_format == 'table':
+            print(f"Successfully deleted webhook with ID: {args.webhook_id}")
+        else:
+            write_item(result, args.output_format)
+
+    elif args.webhook_command == 'listen':
+        from .mirror import Mirror
+        from .webhooks import listen
+
+        mirror = Mirror(args.mirror) if args.to_mirror else None
+        try:
+            stats = listen(client, args.team_ids, mirror=mirror, host=args.host, port=args.port,
+                           on_ready=lambda receiver: print(
+                               f"Receiving webhooks on {receiver.url}. Press Ctrl+C to stop.",
+                               flush=True))
+        finally:
+            if mirror is not None:
+                mirror.close()
+        print(f"Received {stats['received']} events ({stats['rejected']} rejected), "
+              f"applied {stats['applied']}, {stats['failed']} failed.")
+
+    else:
+        print("Choose a webhook command: create, list, delete or listen.")
+
+
+def run_queue_command(client: Optional['ClickUpClient'], args: argparse.Namespace) -> int:
+    """Enqueues operations, reports the queue or drains it, returning the exit status.
+
+    Only ``resume`` needs a client; the other commands work on the queue file.
+    Only ``enqueue`` creates the file.
+    """
+    if args.queue_command is None:
+        print("Choose a queue command: enqueue, status or resume.")
+        return 1
+    if args.queue_command != 'enqueue' and not os.path.exists(args.queue_path):
+        print(f"No queue at {args.queue_path}. Add operations with: queue enqueue FILE")
+        return 1
+
+    from .job_queue import JobQueue
+
+    with JobQueue(args.queue_path) as queue:
+        if args.queue_command == 'enqueue':
+            from .batch import detect_format, read_operations
+
+            fmt = args.format or detect_format(args.file)
+            source = (sys.stdin if args.file == '-'
+                      else open(args.file, newline='', encoding='utf-8'))
+            try:
+                summary = queue.enqueue(read_operations(source, fmt))
+            finally:
+                if source is not sys.stdin:
+                    source.close()
+            print(f"Queued {summary['added']} operations ({summary['duplicates']} already "
+                  f"queued, {summary['invalid']} invalid) in {args.queue_path}.")
+
+        elif args.queue_command == 'status':
+            counts = queue.counts()
+            print(', '.join(f"{count} {state}" for state, count in counts.items()) + '.')
+            for failure in queue.failures(args.failures):
+                print(f"- {failure['operation']}: {failure['error']} "
+                      f"(after {failure['attempts']} attempts)")
+
+        elif args.queue_command == 'resume':
+            if args.retry_failed:
+                logger.info("Retrying %d failed jobs.", queue.retry_failed())
+            summary = queue.drain(client, workers=args.workers)
+            counts = queue.counts()
+            print(f"Ran {summary['done'] + summary['failed']} jobs: {summary['done']} done, "
+                  f"{summary['failed']} failed. {counts['pending']} pending, "
+                  f"{counts['done']} done and {counts['failed']} failed in total.")
+    return 0
+
+
+def where_value(text: str):
+    """Decodes a --where VALUE the way the mirror stores it.
+
+    JSON numbers, ``true``/``false`` and ``null`` become the values SQLite's
+    json_extract returns for them (booleans as 1 and 0); a quoted JSON string
+    is unquoted; anything else is matched as the raw text.
+    """
+    import json
+
+    try:
+        value = json.loads(text)
+    except ValueError:
+        return text
+    if isinstance(value, bool):
+        return int(value)
+    if value is None or isinstance(value, (int, float, str)):
+        return value
+    return text
+
 
-    client = ClickUpClient(api_token)
+def run_query_command(args: argparse.Namespace):
+    """Prints the mirror objects matching the query filters."""
+    from .mirror import Mirror
+    from .output import write_items
 
+    filters = {}
+    if args.team_id:
+        filters['team_id'] = args.team_id
+    if args.status:
+        filters['status'] = args.status
+    for condition in args.where:
+        field, separator, value = condition.partition('=')
+        if not separator:
+            print(f"Invalid --where condition: {condition!r}. Use FIELD=VALUE.")
+            return
+        filters[field] = where_value(value)
+    if args.kind == 'team' and 'team_id' in filters:
+        filters['id'] = filters.pop('team_id')
+    mirror = Mirror(args.mirror)
+    try:
+        results = mirror.query(args.kind, name=args.name, **filters)
+    finally:
+        mirror.close()
+    write_items(results, args.output_format,
+                title=f"{len(results)} matching {args.kind}s in the mirror:")
+
+
+def report_metrics(client, metrics: 'MetricsRecorder', args: argparse.Namespace):
+    """Writes the --metrics-out file and prints the --stats summary."""
+    scheduler = getattr(client, 'scheduler', None)
+    if scheduler is not None:
+        for name, value in scheduler.stats.as_dict().items():
+            metrics.set_gauge(f"rate_limit_{name}", value)
+    limiter = getattr(client, 'limiter', None)
+    if limiter is not None:
+        # The limiter keeps its concurrency_limit gauge current itself.
+        for name, value in limiter.stats.as_dict().items():
+            metrics.set_gauge(f"adaptive_{name}", value)
+    if args.metrics_out:
+        metrics.write(args.metrics_out, args.metrics_format)
+    if args.stats:
+        print(metrics.summary(), file=sys.stderr)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Builds the argument parser of the CLI, shared with the shell and daemon."""
     parser = argparse.ArgumentParser(
         description="A command-line interface to manage your ClickUp account.")
+    parser.add_argument(
+        '--base-url',
+        help='The API root, e.g. a local mock server (default: $CLICKUP_BASE_URL '
+             'or the ClickUp API).')
+    parser.add_argument(
+        '--cache', metavar='PATH',
+        help='Cache read responses in this SQLite file between runs.')
+    parser.add_argument(
+        '--mirror', metavar='PATH', default='clickup_mirror.sqlite',
+        help='The local SQLite mirror filled by sync and crawl --to-mirror '
+             '(default: %(default)s).')
+    parser.add_argument(
+        '--output', dest='output_format', choices=FORMATS, default='table',
+        help='How results are printed (default: %(default)s). Listings are '
+             'written item by item as the response is parsed.')
+    parser.add_argument(
+        '--metrics-out', metavar='PATH',
+        help='Write per-endpoint request metrics to this file when the command ends.')
+    parser.add_argument(
+        '--metrics-format', choices=['openmetrics', 'json'],
+        help='The --metrics-out format (default: json for .json files, else openmetrics).')
+    parser.add_argument(
+        '--stats', action='store_true',
+        help='Print a per-endpoint latency and quota summary to stderr at exit.')
+    parser.add_argument(
+        '--offline', '--from-mirror', action='store_true', dest='offline',
+        help='Answer list-teams, list-spaces and get-space from the mirror '
+             'without any API request.')
+    parser.add_argument(
+        '--transport', choices=['requests', 'httpx'], default='requests',
+        help='The HTTP library (default: %(default)s; httpx uses HTTP/2 when h2 is installed).')
+    parser.add_argument(
+        '--record', metavar='PATH',
+        help='Append every HTTP exchange to this JSONL file, for later --replay.')
+    parser.add_argument(
+        '--replay', metavar='PATH',
+        help='Answer requests from a --record file instead of the network.')
+    parser.add_argument(
+        '--inject-latency', type=float, default=0.0, metavar='SECONDS',
+        help='Add this delay to every request, e.g. to make --replay realistic.')
+    parser.add_argument(
+        '--inject-errors', type=float, default=0.0, metavar='RATE',
+        help='Fail this fraction of requests with a 503 or a timeout, to exercise retries.')
+    parser.add_argument(
+        '--inject-seed', type=int, metavar='N',
+        help='Seed the injected failures so runs are repeatable.')
+    parser.add_argument(
+        '--log-file', metavar='PATH', default='clickup_agent.log',
+        help='The log file, written by a background thread (default: %(default)s; '
+             'empty for none).')
+    parser.add_argument(
+        '--log-level', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], default='INFO',
+        help='The lowest level logged to the file (default: %(default)s). DEBUG '
+             'logs every HTTP attempt with its request ID and duration.')
+    parser.add_argument(
+        '--log-format', choices=['text', 'json'], default='text',
+        help='Log lines as text or as JSON objects (default: %(default)s).')
+    parser.add_argument(
+        '--log-max-bytes', type=int, default=10 * 1024 * 1024, metavar='BYTES',
+        help='Rotate the log file at this size, keeping 5 old files (default: %(default)s).')
+    parser.add_argument(
+        '--log-rotate-when', metavar='WHEN',
+        help='Rotate the log file by time instead, e.g. midnight or H (hourly).')
 
     # Team arguments
     team_parser = parser.add_subparsers(dest='command', title='Commands')
@@ -82,64 +426,439 @@ def main():
     delete_space_parser.add_argument(
         'space_id', type=str, help='The ID of the space to delete.')
 
-    args = parser.parse_args()
+    batch_parser = team_parser.add_parser(
+        'batch', help='Run many operations from a JSONL or CSV file.')
+    batch_parser.add_argument(
+        'file', type=str, help="The operations file, or '-' for stdin.")
+    batch_parser.add_argument(
+        '--format', choices=['jsonl', 'csv'],
+        help='The input format (guessed from the file name by default).')
+    batch_parser.add_argument(
+        '--output', type=str, help='Write JSONL results to this file instead of stdout.')
+    batch_parser.add_argument(
+        '--workers', type=int, default=8, help='The number of concurrent requests.')
+    batch_parser.add_argument(
+        '--adaptive', action='store_true',
+        help='Tune the requests in flight between 1 and --workers from latency, '
+             '429s and timeouts, with timeouts derived from p99 latency.')
+    batch_parser.add_argument(
+        '--resume', action='store_true',
+        help='Skip lines already completed in the --output file and append to it.')
+    batch_parser.add_argument(
+        '--token-pool', action='store_true',
+        help='Spread operations over one worker process per token of $CLICKUP_API_TOKENS.')
+
+    apply_parser = team_parser.add_parser(
+        'apply', help='Create, rename and delete spaces to match a YAML or JSON manifest.')
+    apply_parser.add_argument('manifest', type=str, help='The manifest file.')
+    apply_parser.add_argument(
+        '--dry-run', action='store_true', help='Print the planned changes without making them.')
+    apply_parser.add_argument(
+        '--prune', action='store_true',
+        help='Delete spaces missing from the manifest in every team.')
+    apply_parser.add_argument(
+        '--workers', type=int, default=8, help='The number of concurrent requests.')
+    apply_parser.add_argument(
+        '--adaptive', action='store_true',
+        help='Tune the requests in flight between 1 and --workers from latency, '
+             '429s and timeouts, with timeouts derived from p99 latency.')
+
+    crawl_parser = team_parser.add_parser(
+        'crawl', help='Snapshot teams, spaces, folders, lists and tasks to a JSONL file.')
+    crawl_parser.add_argument(
+        'output', type=str, nargs='?', help='The JSONL file to write the snapshot to.')
+    crawl_parser.add_argument(
+        '--to-mirror', action='store_true',
+        help='Store the snapshot in the --mirror database instead of a file.')
+    crawl_parser.add_argument(
+        '--team', action='append', dest='team_ids', metavar='TEAM_ID',
+        help='Only crawl this team (repeatable).')
+    crawl_parser.add_argument(
+        '--no-tasks', action='store_true', help='Stop at lists and skip tasks.')
+    crawl_parser.add_argument(
+        '--workers', type=int, default=10, help='The number of concurrent requests.')
+    crawl_parser.add_argument(
+        '--adaptive', action='store_true',
+        help='Tune the requests in flight between 1 and --workers from latency, '
+             '429s and timeouts, with timeouts derived from p99 latency.')
+    crawl_parser.add_argument(
+        '--token-pool', action='store_true',
+        help='Crawl each team in a worker process per token of $CLICKUP_API_TOKENS.')
+
+    sync_parser = team_parser.add_parser(
+        'sync', help='Fetch what changed since the last sync into the local store.')
+    sync_parser.add_argument(
+        '--team', action='append', dest='team_ids', metavar='TEAM_ID',
+        help='Only sync this team (repeatable).')
+    sync_parser.add_argument(
+        '--reconcile', action='store_true',
+        help='Also compare task IDs with the server to detect deletions.')
+
+    query_parser = team_parser.add_parser(
+        'query', help='Search the local mirror without any API request.')
+    query_parser.add_argument(
+        'kind', choices=['team', 'space', 'folder', 'list', 'task'],
+        help='The kind of object to search.')
+    query_parser.add_argument(
+        '--name', help='A case-insensitive substring of the name.')
+    query_parser.add_argument(
+        '--team', dest='team_id', help='Only this team, or spaces and tasks of it.')
+    query_parser.add_argument(
+        '--status', help='Only objects with this status.')
+    query_parser.add_argument(
+        '--where', action='append', default=[], metavar='FIELD=VALUE',
+        help='Only objects whose field equals the value (repeatable).')
+
+    webhook_parser = team_parser.add_parser(
+        'webhook', help='Manage webhooks and apply their events locally.')
+    webhook_commands = webhook_parser.add_subparsers(dest='webhook_command', title='Commands')
+    create_webhook_parser = webhook_commands.add_parser(
+        'create', help='Register a webhook for a team.')
+    create_webhook_parser.add_argument('team_id', type=str, help='The ID of the team.')
+    create_webhook_parser.add_argument(
+        'endpoint', type=str, help='The public URL ClickUp delivers events to.')
+    create_webhook_parser.add_argument(
+        '--event', action='append', dest='events', metavar='EVENT',
+        help="An event to subscribe to, e.g. taskUpdated (repeatable; default: all).")
+    create_webhook_parser.add_argument(
+        '--space', dest='space_id', help='Only deliver events of this space.')
+    list_webhooks_parser = webhook_commands.add_parser(
+        'list', help="List a team's webhooks.")
+    list_webhooks_parser.add_argument('team_id', type=str, help='The ID of the team.')
+    delete_webhook_parser = webhook_commands.add_parser(
+        'delete', help='Delete a webhook.')
+    delete_webhook_parser.add_argument(
+        'webhook_id', type=str, help='The ID of the webhook to delete.')
+    listen_parser = webhook_commands.add_parser(
+        'listen', help="Receive the teams' webhook deliveries and apply them locally.")
+    listen_parser.add_argument(
+        '--team', action='append', dest='team_ids', metavar='TEAM_ID', required=True,
+        help='A team whose webhooks are received (repeatable).')
+    listen_parser.add_argument(
+        '--host', default='127.0.0.1', help='The interface to listen on.')
+    listen_parser.add_argument(
+        '--port', type=int, default=8080, help='The port to listen on.')
+    listen_parser.add_argument(
+        '--to-mirror', action='store_true',
+        help='Apply events to the --mirror database; the --cache is always updated.')
+
+    queue_parser = team_parser.add_parser(
+        'queue', help='Run space mutations from a durable queue that survives restarts.')
+    queue_parser.add_argument(
+        '--queue', dest='queue_path', metavar='PATH', default='clickup_queue.sqlite',
+        help='The SQLite queue file (default: %(default)s).')
+    queue_commands = queue_parser.add_subparsers(dest='queue_command', title='Commands')
+    enqueue_parser = queue_commands.add_parser(
+        'enqueue', help='Add the operations of a JSONL or CSV file to the queue.')
+    enqueue_parser.add_argument(
+        'file', type=str, help="The operations file, or '-' for stdin.")
+    enqueue_parser.add_argument(
+        '--format', choices=['jsonl', 'csv'],
+        help='The input format (guessed from the file name by default).')
+    queue_status_parser = queue_commands.add_parser(
+        'status', help='Count the jobs in each state and show recent failures.')
+    queue_status_parser.add_argument(
+        '--failures', type=int, default=10, metavar='N',
+        help='How many failed jobs to show (default: %(default)s).')
+    resume_parser = queue_commands.add_parser(
+        'resume', help='Run the pending jobs, including those interrupted by a crash.')
+    resume_parser.add_argument(
+        '--workers', type=int, default=8, help='The number of concurrent requests.')
+    resume_parser.add_argument(
+        '--adaptive', action='store_true',
+        help='Tune the requests in flight between 1 and --workers from latency, '
+             '429s and timeouts, with timeouts derived from p99 latency.')
+    resume_parser.add_argument(
+        '--retry-failed', action='store_true', help='Run failed jobs again as well.')
+
+    team_parser.add_parser(
+        'shell', help='Run commands interactively on one warm client.')
+
+    serve_parser = team_parser.add_parser(
+        'serve', help='Run a daemon that executes commands sent by src/remote.py.')
+    serve_parser.add_argument(
+        '--socket',
+        help='The Unix socket to listen on (default: $CLICKUP_AGENT_SOCKET or '
+             'clickup-agent-<user>.sock in the temporary directory).')
+
+    return parser
+
+
+def resolve_base_url(args: argparse.Namespace) -> str:
+    """Returns the API base URL from --base-url, $CLICKUP_BASE_URL or the default."""
+    from .clickup_client import DEFAULT_BASE_URL
+    return args.base_url or os.getenv('CLICKUP_BASE_URL') or DEFAULT_BASE_URL
+
+
+def create_transport(args: argparse.Namespace, pool_maxsize: int):
+    """Returns the transport chosen by --transport, --record, --replay and --inject-*.
+
+    None selects the client's default pooled transport.
+    """
+    injecting = args.inject_latency or args.inject_errors
+    if not (args.replay or args.record or injecting or args.transport != 'requests'):
+        return None
+    from . import transport
+
+    if args.replay:
+        chosen = transport.ReplayTransport(args.replay)
+    else:
+        chosen = transport.create_transport(args.transport, pool_maxsize)
+        if args.record:
+            chosen = transport.RecordingTransport(chosen, args.record)
+    if injecting:
+        from .cassette import FaultInjectingTransport
+        chosen = FaultInjectingTransport(chosen, latency=args.inject_latency,
+                                         error_rate=args.inject_errors, seed=args.inject_seed)
+    return chosen
+
+
+def create_limiter(args: argparse.Namespace, metrics: Optional['MetricsRecorder'] = None):
+    """Returns the AdaptiveLimiter asked for by --adaptive, capped at --workers."""
+    if not getattr(args, 'adaptive', False):
+        return None
+    from .adaptive import AdaptiveLimiter
+    return AdaptiveLimiter(initial=min(4, args.workers), max_limit=args.workers,
+                           metrics=metrics)
+
+
+def create_client(api_token: str, args: argparse.Namespace,
+                  metrics: Optional['MetricsRecorder'] = None):
+    """Creates the client a command runs on: the mirror offline, else the API."""
+    if args.offline:
+        from .mirror import Mirror
+        return Mirror(args.mirror)
+    from .cache import ResponseCache
+    cache = ResponseCache(args.cache) if args.cache else None
+    # Size the connection pool to the commands that run requests in parallel.
+    pool_maxsize = getattr(args, 'workers', 10)
+    return _client_class()(api_token, base_url=resolve_base_url(args), cache=cache,
+                           metrics=metrics, pool_maxsize=pool_maxsize,
+                           transport=create_transport(args, pool_maxsize),
+                           limiter=create_limiter(args, metrics))
+
+
+def run_command(args: argparse.Namespace, parser: argparse.ArgumentParser,
+                api_token: Optional[str], client=None) -> int:
+    """Runs one parsed command.
+
+    Args:
+        args: The parsed command line.
+        parser: The parser, used to print help for a missing command.
+        api_token: The ClickUp API token.
+        client: A warm client to reuse, as the shell and daemon do. A new
+            one is created from the options when omitted.
 
+    Returns:
+        The exit status: 0 on success, 1 when the command failed.
+    """
+    if args.command == 'query':
+        run_query_command(args)
+        return 0
+    if args.command == 'queue' and args.queue_command != 'resume':
+        return run_queue_command(None, args)
+
+    from requests.exceptions import HTTPError
+
+    from .metrics import MetricsRecorder
+    from .mirror import OfflineError
+    from .output import write_item, write_items
+
+    if not (args.offline or args.replay) and (not api_token or api_token == "YOUR_API_TOKEN"):
+        logger.error(
+            "CLICKUP_API_TOKEN is not configured. Please set it in the .env file.")
+        print("Please configure your CLICKUP_API_TOKEN in the .env file.")
+        return 1
+    unsupported = unsupported_pool_options(args) if getattr(args, 'token_pool', False) else []
+    if unsupported:
+        print(f"--token-pool cannot be combined with {', '.join(unsupported)}.")
+        return 1
+
+    metrics = MetricsRecorder() if args.metrics_out or args.stats else None
+    shared_metrics = shared_limiter = False
+    owns_client = client is None
+    if owns_client:
+        client = create_client(api_token, args, metrics)
+    else:
+        if metrics is not None and hasattr(client, 'metrics'):
+            # Record this command only; the previous recorder is put back afterwards.
+            shared_metrics, client.metrics = client.metrics, metrics
+        if hasattr(client, 'limiter'):
+            # A warm client only adapts its concurrency for --adaptive commands.
+            shared_limiter, client.limiter = client.limiter, create_limiter(args, metrics)
+
+    status = 0
     try:
         if args.command == 'list-teams':
             logger.info("Fetching teams.")
-            teams = client.get_teams()
-            print("Your ClickUp teams (workspaces):")
-            for team in teams.get('teams', []):
-                print(f"- Name: {team.get('name')}, ID: {team.get('id')}")
+            write_items(client.iter_teams(), args.output_format,
+                        title="Your ClickUp teams (workspaces):")
 
         elif args.command == 'list-spaces':
-            logger.info(f"Fetching spaces for team {args.team_id}.")
-            spaces = client.get_spaces(args.team_id)
-            print(f"Spaces in team {args.team_id}:")
-            for space in spaces.get('spaces', []):
-                print(f"- Name: {space.get('name')}, ID: {space.get('id')}")
+            logger.info("Fetching spaces for team %s.", args.team_id)
+            write_items(client.iter_spaces(args.team_id), args.output_format,
+                        title=f"Spaces in team {args.team_id}:")
 
         elif args.command == 'create-space':
-            logger.info(
-                f"Creating space '{args.space_name}' in team {args.team_id}.")
+            logger.info("Creating space '%s' in team %s.", args.space_name, args.team_id)
             new_space = client.create_space(args.team_id, args.space_name)
-            print(f"Successfully created space: '{new_space.get('name')}'")
-            logger.info(
-                f"Successfully created space: '{new_space.get('name')}' with ID {new_space.get('id')}")
+            if args.output_format == 'table':
+                print(f"Successfully created space: '{new_space.get('name')}'")
+            else:
+                write_item(new_space, args.output_format)
+            logger.info("Successfully created space: '%s' with ID %s",
+                        new_space.get('name'), new_space.get('id'))
 
         elif args.command == 'get-space':
-            logger.info(f"Fetching details for space {args.space_id}.")
+            logger.info("Fetching details for space %s.", args.space_id)
             space = client.get_space(args.space_id)
-            print("Space details:")
-            print(space)
+            write_item(space, args.output_format, title="Space details:")
 
         elif args.command == 'update-space':
-            logger.info(
-                f"Updating space {args.space_id} with new name '{args.new_name}'.")
+            logger.info("Updating space %s with new name '%s'.", args.space_id, args.new_name)
             updated_space = client.update_space(args.space_id, args.new_name)
-            print(
-                f"Successfully updated space to '{updated_space.get('name')}'")
-            logger.info(f"Successfully updated space {args.space_id}")
+            if args.output_format == 'table':
+                print(
+                    f"Successfully updated space to '{updated_space.get('name')}'")
+            else:
+                write_item(updated_space, args.output_format)
+            logger.info("Successfully updated space %s", args.space_id)
 
         elif args.command == 'delete-space':
-            logger.info(f"Deleting space with ID: {args.space_id}")
-            client.delete_space(args.space_id)
-            print(f"Successfully deleted space with ID: {args.space_id}")
-            logger.info(f"Successfully deleted space with ID: {args.space_id}")
+            logger.info("Deleting space with ID: %s", args.space_id)
+            result = client.delete_space(args.space_id)
+            if args.output_format == 'table':
+                print(f"Successfully deleted space with ID: {args.space_id}")
+            else:
+                write_item(result, args.output_format)
+            logger.info("Successfully deleted space with ID: %s", args.space_id)
+
+        elif args.command == 'batch':
+            if args.token_pool:
+                with open_token_pool(api_token, args) as pool:
+                    run_batch_command(client, args, pool)
+                print(pool.summary(), file=sys.stderr)
+            else:
+                run_batch_command(client, args)
+
+        elif args.command == 'apply':
+            run_apply_command(client, args)
+
+        elif args.command == 'webhook':
+            run_webhook_command(client, args)
+
+        elif args.command == 'queue':
+            status = run_queue_command(client, args)
+
+        elif args.command == 'crawl':
+            if bool(args.output) == args.to_mirror:
+                print("Give either an output file or --to-mirror.")
+                return 1
+            if args.token_pool:
+                run_pooled_crawl(client, api_token, args)
+                return 0
+            from .async_client import AsyncClickUpClient
+            from .crawler import crawl_to_file, crawl_to_sink
+            from .mirror import Mirror, MirrorSink
+
+            async_client = AsyncClickUpClient(
+                api_token, max_concurrency=args.workers, client=client)
+            try:
+                if args.to_mirror:
+                    logger.info("Crawling workspace into mirror %s.", args.mirror)
+                    mirror = Mirror(args.mirror)
+                    try:
+                        stats = crawl_to_sink(async_client, MirrorSink(mirror), args.team_ids,
+                                              include_tasks=not args.no_tasks)
+                    finally:
+                        mirror.close()
+                else:
+                    logger.info("Crawling workspace into %s.", args.output)
+                    stats = crawl_to_file(async_client, args.output, team_ids=args.team_ids,
+                                          include_tasks=not args.no_tasks)
+            finally:
+                async_client.close()
+            counts = ', '.join(f"{count} {level}s" for level, count in stats['counts'].items())
+            print(f"Crawled {stats['total']} objects ({counts}) in {stats['seconds']:.1f}s "
+                  f"({stats['objects_per_second']:.1f} objects/sec).")
+
+        elif args.command == 'sync':
+            from .mirror import Mirror
+            from .sync import SyncEngine
+
+            logger.info("Syncing into %s.", args.mirror)
+            mirror = Mirror(args.mirror)
+            try:
+                results = SyncEngine(client, mirror).sync(args.team_ids, reconcile=args.reconcile)
+            finally:
+                mirror.close()
+            for result in results:
+                print(f"- Team {result['team_id']}: {result['tasks_changed']} tasks changed, "
+                      f"{result['tasks_deleted']} deleted"
+                      f"{' (reconciled)' if result['reconciled'] else ''}")
 
         else:
             parser.print_help()
 
+    except OfflineError as e:
+        status = 1
+        logger.error("Offline request failed: %s", e)
+        print(f"Not available offline: {e}")
     except HTTPError as e:
-        logger.error(
-            f"API error occurred: {e.response.status_code} - {e.response.reason}")
-        logger.error(f"Response body: {e.response.text}")
+        status = 1
+        logger.error("API error occurred: %s - %s", e.response.status_code, e.response.reason)
+        logger.error("Response body: %s", e.response.text)
         print(f"An API error occurred: {e}")
         print(f"Response body: {e.response.text}")
     except Exception as e:
+        status = 1
         logger.exception("An unexpected error occurred: %s", e)
         print(f"An unexpected error occurred: {e}")
+    finally:
+        if metrics is not None:
+            report_metrics(client, metrics, args)
+        if shared_metrics is not False:
+            client.metrics = shared_metrics
+        if shared_limiter is not False:
+            client.limiter = shared_limiter
+        if owns_client:
+            client.close()  # flushes a --record file
+    return status
+
+
+def main() -> int:
+    """Main function to run the ClickUp client CLI, returning its exit status."""
+    parser = build_parser()
+    args = parser.parse_args()
+    setup_logging(args)
+    logger.info("Starting ClickUp Agent CLI")
+
+    from dotenv import load_dotenv
+
+    # Load environment variables from .env file
+    load_dotenv()
+    api_token = os.getenv("CLICKUP_API_TOKEN")
+
+    if args.command in ('shell', 'serve'):
+        from .agent import AgentSession, AgentShell, serve
+        from .remote import DEFAULT_SOCKET
+
+        session = AgentSession(parser, api_token, run_command, create_client)
+        try:
+            if args.command == 'shell':
+                AgentShell(session).cmdloop()
+            else:
+                serve(session, args.socket or DEFAULT_SOCKET)
+        except RuntimeError as e:
+            logger.error("Could not start the agent: %s", e)
+            print(f"Could not start the agent: {e}")
+            return 1
+        finally:
+            session.close()
+        return 0
+
+    return run_command(args, parser, api_token)
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,210 @@
+import json
+import logging
+import threading
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Latency bucket upper bounds in seconds; the last bucket is unbounded.
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+
+
+class Histogram:
+    """A fixed-bucket histogram of observed values."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Estimates a quantile by interpolating inside its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index]
+                if upper == float('inf'):
+                    return lower
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-2]
+
+
+class EndpointMetrics:
+    """Everything recorded for one HTTP method and endpoint template."""
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.statuses = Counter()
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'requests': self.latency.count,
+            'seconds_total': self.latency.sum,
+            'p50_seconds': self.latency.quantile(0.5),
+            'p99_seconds': self.latency.quantile(0.99),
+            'latency_buckets': {str(bound): count for bound, count
+                                in zip(self.latency.buckets, self.latency.counts)},
+            'statuses': {str(status): count for status, count in self.statuses.items()},
+            'bytes_sent': self.bytes_sent,
+            'bytes_received': self.bytes_received,
+            'retries': self.retries,
+            'cache_hits': self.cache_hits,
+            'coalesced': self.coalesced,
+        }
+
+
+class MetricsRecorder:
+    """Thread-safe per-endpoint request metrics.
+
+    ClickUpClient reports every HTTP attempt here: its latency, status code
+    and size, plus retries and cache hits. Endpoints are keyed by method and
+    template (``GET space/{id}``), so IDs do not explode the key space.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints: Dict[Tuple[str, str], EndpointMetrics] = {}
+        self.gauges: Dict[str, float] = {}
+
+    def _get(self, method: str, endpoint: str) -> EndpointMetrics:
+        key = (method, endpoint)
+        metrics = self._endpoints.get(key)
+        if metrics is None:
+            metrics = self._endpoints[key] = EndpointMetrics()
+        return metrics
+
+    def record(self, method: str, endpoint: str, status, seconds: float,
+               bytes_sent: int = 0, bytes_received: int = 0):
+        """Records one HTTP attempt. ``status`` is a code or ``"error"``."""
+        with self._lock:
+            metrics = self._get(method, endpoint)
+            metrics.latency.observe(seconds)
+            metrics.statuses[status] += 1
+            metrics.bytes_sent += bytes_sent
+            metrics.bytes_received += bytes_received
+
+    def add_bytes_received(self, method: str, endpoint: str, count: int):
+        """Adds bytes of a streamed body read after its attempt was recorded."""
+        with self._lock:
+            self._get(method, endpoint).bytes_received += count
+
+    def record_retry(self, method: str, endpoint: str):
+        with self._lock:
+            self._get(method, endpoint).retries += 1
+
+    def record_cache_hit(self, method: str, endpoint: str):
+        with self._lock:
+            self._get(method, endpoint).cache_hits += 1
+
+    def record_coalesced(self, method: str, endpoint: str):
+        """Counts a call that shared another caller's in-flight request."""
+        with self._lock:
+            self._get(method, endpoint).coalesced += 1
+
+    def set_gauge(self, name: str, value: float):
+        """Sets a process-wide gauge, e.g. a rate-limit counter."""
+        with self._lock:
+            self.gauges[name] = value
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns all metrics as plain data."""
+        with self._lock:
+            return {
+                'endpoints': {f"{method} {endpoint}": metrics.as_dict()
+                              for (method, endpoint), metrics in sorted(self._endpoints.items())},
+                'gauges': dict(self.gauges),
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_openmetrics(self) -> str:
+        """Renders the metrics in the OpenMetrics text format."""
+        lines = [
+            '# TYPE clickup_request_duration_seconds histogram',
+            '# UNIT clickup_request_duration_seconds seconds',
+        ]
+        with self._lock:
+            items = sorted(self._endpoints.items())
+            for (method, endpoint), metrics in items:
+                labels = f'method="{method}",endpoint="{endpoint}"'
+                cumulative = 0
+                for bound, count in zip(metrics.latency.buckets, metrics.latency.counts):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'clickup_request_duration_seconds_bucket'
+                                 f'{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f'clickup_request_duration_seconds_count{{{labels}}} '
+                             f'{metrics.latency.count}')
+                lines.append(f'clickup_request_duration_seconds_sum{{{labels}}} '
+                             f'{metrics.latency.sum}')
+            counters = (
+                ('clickup_responses', 'Responses by status code.',
+                 lambda m: [(f',status="{s}"', n) for s, n in sorted(m.statuses.items(), key=str)]),
+                ('clickup_request_bytes', 'Request body bytes sent.',
+                 lambda m: [('', m.bytes_sent)]),
+                ('clickup_response_bytes', 'Response body bytes received.',
+                 lambda m: [('', m.bytes_received)]),
+                ('clickup_retries', 'Retried attempts.', lambda m: [('', m.retries)]),
+                ('clickup_cache_hits', 'Reads answered from the cache.',
+                 lambda m: [('', m.cache_hits)]),
+                ('clickup_coalesced', 'Reads that shared an identical in-flight request.',
+                 lambda m: [('', m.coalesced)]),
+            )
+            for name, help_text, values in counters:
+                lines.append(f'# TYPE {name} counter')
+                lines.append(f'# HELP {name} {help_text}')
+                for (method, endpoint), metrics in items:
+                    for extra, value in values(metrics):
+                        lines.append(f'{name}_total{{method="{method}",'
+                                     f'endpoint="{endpoint}"{extra}}} {value}')
+            for name, value in sorted(self.gauges.items()):
+                lines.append(f'# TYPE clickup_{name} gauge')
+                lines.append(f'clickup_{name} {value}')
+        lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path: str, fmt: Optional[str] = None):
+        """Writes the metrics to a file, as JSON for ``.json`` paths by default."""
+        fmt = fmt or ('json' if path.endswith('.json') else 'openmetrics')
+        with open(path, 'w', encoding='utf-8') as out:
+            out.write(self.to_json() if fmt == 'json' else self.to_openmetrics())
+        logger.info("Wrote %s metrics to %s.", fmt, path)
+
+    def summary(self) -> str:
+        """Returns a table of endpoints ordered by total time spent."""
+        snapshot = self.snapshot()
+        rows = sorted(snapshot['endpoints'].items(),
+                      key=lambda item: item[1]['seconds_total'], reverse=True)
+        lines = [f"{'Endpoint':<32} {'Calls':>6} {'Errors':>6} {'p50 ms':>8} "
+                 f"{'p99 ms':>8} {'Total s':>8} {'KiB in':>8} {'Retries':>7} {'Cached':>6} "
+                 f"{'Shared':>6}"]
+        for name, data in rows:
+            errors = sum(count for status, count in data['statuses'].items()
+                         if not status.startswith('2'))
+            lines.append(
+                f"{name:<32} {data['requests']:>6} {errors:>6} "
+                f"{data['p50_seconds'] * 1000:>8.1f} {data['p99_seconds'] * 1000:>8.1f} "
+                f"{data['seconds_total']:>8.2f} {data['bytes_received'] / 1024:>8.1f} "
+                f"{data['retries']:>7} {data['cache_hits']:>6} {data['coalesced']:>6}")
+        for name, value in sorted(snapshot['gauges'].items()):
+            lines.append(f"{name}: {value:g}")
+        return '\n'.join(lines)
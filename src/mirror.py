@@ -0,0 +1,297 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+from . import jsonio
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+PRAGMA journal_mode=WAL;
+CREATE TABLE IF NOT EXISTS teams (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    data TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS spaces (
+    id TEXT PRIMARY KEY,
+    team_id TEXT,
+    name TEXT,
+    data TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS folders (
+    id TEXT PRIMARY KEY,
+    space_id TEXT,
+    name TEXT,
+    data TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS lists (
+    id TEXT PRIMARY KEY,
+    space_id TEXT,
+    folder_id TEXT,
+    name TEXT,
+    status TEXT,
+    data TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    team_id TEXT,
+    space_id TEXT,
+    list_id TEXT,
+    name TEXT,
+    status TEXT,
+    date_updated INTEGER,
+    data TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS teams_name ON teams (name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS spaces_team ON spaces (team_id);
+CREATE INDEX IF NOT EXISTS spaces_name ON spaces (name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS folders_space ON folders (space_id);
+CREATE INDEX IF NOT EXISTS lists_space ON lists (space_id);
+CREATE INDEX IF NOT EXISTS lists_folder ON lists (folder_id);
+CREATE INDEX IF NOT EXISTS lists_name ON lists (name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS lists_status ON lists (status);
+CREATE INDEX IF NOT EXISTS tasks_team ON tasks (team_id);
+CREATE INDEX IF NOT EXISTS tasks_list ON tasks (list_id);
+CREATE INDEX IF NOT EXISTS tasks_name ON tasks (name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status);
+CREATE TABLE IF NOT EXISTS sync_state (
+    team_id TEXT PRIMARY KEY,
+    watermark INTEGER,
+    runs_since_reconcile INTEGER NOT NULL DEFAULT 0,
+    synced_at REAL);
+"""
+
+# The indexed columns of each table, in insertion order after ``id``.
+COLUMNS = {
+    'team': ('name',),
+    'space': ('team_id', 'name'),
+    'folder': ('space_id', 'name'),
+    'list': ('space_id', 'folder_id', 'name', 'status'),
+    'task': ('team_id', 'space_id', 'list_id', 'name', 'status', 'date_updated'),
+}
+TABLES = {'team': 'teams', 'space': 'spaces', 'folder': 'folders', 'list': 'lists',
+          'task': 'tasks'}
+
+
+class OfflineError(RuntimeError):
+    """Raised when the mirror cannot answer a request without the API."""
+
+
+def _nested_id(data: Dict[str, Any], key: str) -> Optional[str]:
+    value = data.get(key)
+    return value.get('id') if isinstance(value, dict) else None
+
+
+def _status(data: Dict[str, Any]) -> Optional[str]:
+    status = data.get('status')
+    return status.get('status') if isinstance(status, dict) else status
+
+
+def _row(kind: str, data: Dict[str, Any], parent_id: Optional[str] = None) -> tuple:
+    """Extracts the indexed columns of an API object."""
+    if kind == 'team':
+        values = (data.get('name'),)
+    elif kind == 'space':
+        values = (parent_id or _nested_id(data, 'team'), data.get('name'))
+    elif kind == 'folder':
+        values = (parent_id or _nested_id(data, 'space'), data.get('name'))
+    elif kind == 'list':
+        values = (_nested_id(data, 'space'), _nested_id(data, 'folder'),
+                  data.get('name'), _status(data))
+    else:
+        updated = data.get('date_updated')
+        values = (parent_id or data.get('team_id'), _nested_id(data, 'space'),
+                  _nested_id(data, 'list'), data.get('name'), _status(data),
+                  int(updated) if updated is not None else None)
+    return (data['id'],) + values + (json.dumps(data, default=jsonio.default),)
+
+
+class Mirror:
+    """A local SQLite copy of the workspace answering reads without the API.
+
+    Objects are kept as their original JSON alongside indexed columns (id,
+    team, parent, name and status) so lookups and filters stay fast. The
+    read methods return the same shapes as the ClickUpClient methods, and
+    the mirror doubles as the store of the SyncEngine.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initializes the Mirror.
+
+        Args:
+            path: The SQLite database file.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        """Closes the database connection."""
+        with self._lock:
+            self._db.close()
+
+    # --- Writes ---
+
+    def _insert(self, kind: str, objects: Iterable[Dict[str, Any]],
+                parent_id: Optional[str]) -> int:
+        """Writes rows inside the caller's transaction."""
+        rows = [_row(kind, data, parent_id) for data in objects]
+        placeholders = ', '.join('?' * (len(COLUMNS[kind]) + 2))
+        self._db.executemany(
+            f"INSERT OR REPLACE INTO {TABLES[kind]} VALUES ({placeholders})", rows)
+        return len(rows)
+
+    def upsert(self, kind: str, objects: Iterable[Dict[str, Any]],
+               parent_id: Optional[str] = None) -> int:
+        """Inserts or updates objects of one kind, returning how many were written."""
+        with self._lock, self._db:
+            return self._insert(kind, objects, parent_id)
+
+    def delete(self, kind: str, ids: Iterable[str]) -> int:
+        """Removes objects of one kind by ID, returning how many were removed."""
+        ids = list(ids)
+        with self._lock, self._db:
+            self._db.executemany(f"DELETE FROM {TABLES[kind]} WHERE id = ?",
+                                 ((object_id,) for object_id in ids))
+        return len(ids)
+
+    def replace_spaces(self, team_id: str, spaces: Iterable[Dict[str, Any]]) -> int:
+        """Stores a team's complete space listing, returning how many were removed."""
+        with self._lock, self._db:
+            before = self._db.execute(
+                "SELECT COUNT(*) FROM spaces WHERE team_id = ?", (team_id,)).fetchone()[0]
+            self._db.execute("DELETE FROM spaces WHERE team_id = ?", (team_id,))
+            written = self._insert('space', spaces, team_id)
+        return max(0, before - written)
+
+    def upsert_tasks(self, team_id: str, tasks: Iterable[Dict[str, Any]]) -> int:
+        """Inserts or updates a team's tasks, returning how many were written."""
+        return self.upsert('task', tasks, parent_id=team_id)
+
+    def delete_tasks(self, task_ids: Iterable[str]) -> int:
+        """Removes tasks by ID, returning how many were removed."""
+        return self.delete('task', task_ids)
+
+    def task_ids(self, team_id: str) -> Set[str]:
+        """Returns the IDs of a team's stored tasks."""
+        with self._lock:
+            rows = self._db.execute("SELECT id FROM tasks WHERE team_id = ?", (team_id,))
+            return {row[0] for row in rows}
+
+    def get_state(self, team_id: str) -> Dict[str, Any]:
+        """Returns the sync watermark and reconciliation counter of a team."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT watermark, runs_since_reconcile FROM sync_state WHERE team_id = ?",
+                (team_id,)).fetchone()
+        if row is None:
+            return {'watermark': None, 'runs_since_reconcile': 0}
+        return {'watermark': row[0], 'runs_since_reconcile': row[1]}
+
+    def set_state(self, team_id: str, watermark: Optional[int], runs_since_reconcile: int):
+        """Records the progress of a team's sync."""
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO sync_state"
+                " (team_id, watermark, runs_since_reconcile, synced_at) VALUES (?, ?, ?, ?)",
+                (team_id, watermark, runs_since_reconcile, time.time()))
+
+    # --- Reads, shaped like the API responses ---
+
+    def query(self, kind: str, name: Optional[str] = None,
+              **filters: Any) -> List[Dict[str, Any]]:
+        """Returns stored objects of one kind matching every filter.
+
+        Args:
+            kind: One of ``team``, ``space``, ``folder``, ``list`` or ``task``.
+            name: A case-insensitive substring of the object name.
+            **filters: Exact matches on indexed columns (e.g. ``team_id``,
+                ``status``) or, for any other key, on the top-level JSON field.
+                JSON numbers and booleans compare as SQLite numbers, so pass
+                ``0`` rather than ``'0'`` or ``False`` for them; ``None``
+                matches a null or missing field.
+        """
+        if kind not in TABLES:
+            raise ValueError(f"Unknown kind: {kind!r}")
+        clauses, params = [], []
+        if name:
+            clauses.append("name LIKE ? ESCAPE '\\' COLLATE NOCASE")
+            params.append('%' + name.replace('\\', '\\\\').replace('%', '\\%')
+                          .replace('_', '\\_') + '%')
+        for key, value in filters.items():
+            operator = 'IS' if value is None else '='
+            if key in COLUMNS[kind] or key == 'id':
+                clauses.append(f"{key} {operator} ?")
+            else:
+                clauses.append(f"json_extract(data, ?) {operator} ?")
+                params.append(f'$."{key}"')
+            params.append(value)
+        sql = f"SELECT data FROM {TABLES[kind]}"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        with self._lock:
+            rows = self._db.execute(sql + " ORDER BY name, id", params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def get_teams(self):
+        """Returns the stored teams, shaped like ClickUpClient.get_teams."""
+        return {'teams': self.query('team')}
+
+    def get_spaces(self, team_id: str):
+        """Returns a team's stored spaces, shaped like ClickUpClient.get_spaces."""
+        return {'spaces': self.query('space', team_id=team_id)}
+
+    def iter_teams(self) -> Iterator[Dict[str, Any]]:
+        """Yields the stored teams, like ClickUpClient.iter_teams."""
+        return iter(self.query('team'))
+
+    def iter_spaces(self, team_id: str) -> Iterator[Dict[str, Any]]:
+        """Yields a team's stored spaces, like ClickUpClient.iter_spaces."""
+        return iter(self.query('space', team_id=team_id))
+
+    def get_space(self, space_id: str):
+        """Returns a stored space, shaped like ClickUpClient.get_space."""
+        found = self.query('space', id=space_id)
+        if not found:
+            raise OfflineError(f"Space {space_id} is not in the mirror.")
+        return found[0]
+
+    def __getattr__(self, name: str):
+        # Mutations and uncached endpoints need the API.
+        if name.startswith(('create_', 'update_', 'delete_', 'get_', 'iter_')):
+            raise OfflineError(f"{name} is not available from the mirror.")
+        raise AttributeError(name)
+
+
+class MirrorSink:
+    """A crawler sink that stores every crawled object in a Mirror.
+
+    Objects are buffered per kind and parent and written in batches.
+    """
+
+    def __init__(self, mirror: Mirror, batch_size: int = 500):
+        self.mirror = mirror
+        self.batch_size = batch_size
+        self.counts = Counter()
+        self._pending: Dict[tuple, List[Dict[str, Any]]] = {}
+
+    def write(self, kind: str, parent_id: Optional[str], data: Dict[str, Any]):
+        # Lists and tasks carry their parents in the payload; teams have none.
+        key = (kind, parent_id if kind in ('space', 'folder') else None)
+        batch = self._pending.setdefault(key, [])
+        batch.append(data)
+        self.counts[kind] += 1
+        if len(batch) >= self.batch_size:
+            self.mirror.upsert(key[0], self._pending.pop(key), key[1])
+
+    def flush(self):
+        """Writes every buffered object."""
+        for (kind, parent_id), batch in self._pending.items():
+            self.mirror.upsert(kind, batch, parent_id)
+        self._pending.clear()
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
@@ -0,0 +1,161 @@
+"""Compact, read-only objects for API responses.
+
+A model keeps the fields most code reads (``id``, ``name``...) in slots and
+the rest of the object as one compact JSON string, decoded the first time
+one of those fields is read and kept decoded afterwards. Holding many tasks
+then costs a fraction of the memory of their nested dicts. Models also answer the dict methods the CLI
+uses (``get``, ``[]``, ``items``), so they can stand in for dicts::
+
+    client = ClickUpClient(token, models=True)
+    for task in client.iter_tasks(list_id):
+        print(task.name, task.get('due_date'))
+"""
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, Mapping, Tuple, Type
+
+from . import jsonio
+
+_MISSING = object()
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+
+class Model:
+    """Base class of the models: ``FIELDS`` live in slots, the rest in ``_extra``.
+
+    ``_extra`` holds the encoded JSON until a field in it is first read, then
+    the decoded dict.
+    """
+
+    __slots__ = ('_extra',)
+    FIELDS: Tuple[str, ...] = ()
+
+    def __init__(self, **fields):
+        extra = {}
+        for key, value in fields.items():
+            if key in self.FIELDS:
+                object.__setattr__(self, key, value)
+            else:
+                extra[key] = value
+        object.__setattr__(self, '_extra', jsonio.dumps(extra) if extra else None)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Model':
+        """Builds a model from an API object. Models are returned unchanged."""
+        if isinstance(data, Model):
+            return data
+        return cls(**data)
+
+    @property
+    def extra(self) -> Mapping[str, Any]:
+        """The fields not kept in slots, as a read-only mapping."""
+        extra = self._extra
+        if extra is None:
+            return _EMPTY
+        if not isinstance(extra, dict):
+            extra = jsonio.loads(extra)
+            object.__setattr__(self, '_extra', extra)
+        return MappingProxyType(extra)
+
+    def __getattr__(self, name: str):
+        # Only called when a slot is unset or the name is not a slot.
+        if name.startswith('_') or name in self.FIELDS:
+            raise AttributeError(name)
+        value = self.extra.get(name, _MISSING)
+        if value is _MISSING:
+            raise AttributeError(f"{type(self).__name__} has no field {name!r}")
+        return value
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"{type(self).__name__} objects are read-only")
+
+    def _lookup(self, key: str) -> Any:
+        if key in self.FIELDS:
+            return getattr(self, key, _MISSING)
+        return self.extra.get(key, _MISSING)
+
+    def _fields(self) -> Iterator[Tuple[str, Any]]:
+        for key in self.FIELDS:
+            value = getattr(self, key, _MISSING)
+            if value is not _MISSING:
+                yield key, value
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the complete object as the API sent it."""
+        return {**dict(self._fields()), **self.extra}
+
+    # --- The read-only mapping interface ---
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._lookup(key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self._lookup(key) is not _MISSING
+
+    def keys(self):
+        return self.to_dict().keys()
+
+    def items(self):
+        return self.to_dict().items()
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Model):
+            other = other.to_dict()
+        return isinstance(other, dict) and self.to_dict() == other
+
+    __hash__ = None
+
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, state: Dict[str, Any]):
+        type(self).__init__(self, **state)
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{key}={value!r}" for key, value in self._fields())
+        return f"{type(self).__name__}({fields})"
+
+
+class Team(Model):
+    """A team (workspace)."""
+
+    __slots__ = FIELDS = ('id', 'name')
+
+
+class Space(Model):
+    """A space of a team."""
+
+    __slots__ = FIELDS = ('id', 'name', 'private')
+
+
+class Folder(Model):
+    """A folder of a space. Its embedded ``lists`` stay dicts, in ``extra``."""
+
+    __slots__ = FIELDS = ('id', 'name')
+
+
+class TaskList(Model):
+    """A list of a folder or space, named to avoid shadowing ``typing.List``."""
+
+    __slots__ = FIELDS = ('id', 'name')
+
+
+class Task(Model):
+    """A task. ``status`` keeps the API's nested status object."""
+
+    __slots__ = FIELDS = ('id', 'name', 'status', 'date_updated', 'team_id')
+
+
+def convert_listing(model: Type[Model], result: Dict[str, Any], key: str) -> Dict[str, Any]:
+    """Returns a listing response with the items under ``key`` converted.
+
+    The response itself is left untouched, since it may be shared with
+    other callers of a coalesced request.
+    """
+    return {**result, key: [model.from_dict(item) for item in result.get(key, [])]}
@@ -0,0 +1,56 @@
+import sys
+from typing import Any, Dict, Iterable, Optional, TextIO
+
+FORMATS = ('table', 'json', 'jsonl')
+
+
+def write_items(items: Iterable[Dict[str, Any]], fmt: str = 'table',
+                title: Optional[str] = None, out: Optional[TextIO] = None) -> int:
+    """Writes a listing item by item as it is consumed.
+
+    Args:
+        items: The objects to write, typically a streaming iterator.
+        fmt: ``table`` for one ``- Name, ID`` line per item, ``json`` for a
+            single array or ``jsonl`` for one object per line.
+        title: A heading printed before the rows in table mode.
+        out: Where to write, standard output by default.
+
+    Returns:
+        The number of items written.
+    """
+    from . import jsonio  # not at module level: the CLI imports FORMATS at start-up
+
+    out = out or sys.stdout
+    count = 0
+    if fmt == 'table':
+        if title:
+            out.write(title + '\n')
+        for count, item in enumerate(items, start=1):
+            out.write(f"- Name: {item.get('name')}, ID: {item.get('id')}\n")
+    elif fmt == 'jsonl':
+        for count, item in enumerate(items, start=1):
+            out.write(jsonio.dumps(item) + '\n')
+    else:
+        out.write('[')
+        for count, item in enumerate(items, start=1):
+            out.write((',\n' if count > 1 else '\n') + jsonio.dumps(item))
+        out.write('\n]\n' if count else ']\n')
+    out.flush()
+    return count
+
+
+def write_item(item: Dict[str, Any], fmt: str = 'table', title: Optional[str] = None,
+               out: Optional[TextIO] = None):
+    """Writes one object, as ``field: value`` lines in table mode."""
+    from . import jsonio
+
+    out = out or sys.stdout
+    if fmt != 'table':
+        out.write(jsonio.dumps(item) + '\n')
+        return
+    if title:
+        out.write(title + '\n')
+    for key, value in item.items():
+        shown = value if isinstance(value, (str, int, float, bool)) or value is None \
+            else jsonio.dumps(value)
+        out.write(f"  {key}: {shown}\n")
@@ -0,0 +1,249 @@
+import logging
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# ClickUp's documented default budget for a personal token.
+DEFAULT_REQUESTS_PER_MINUTE = 100
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+
+def _parse_number(value) -> Optional[float]:
+    """Parses a numeric header value, ignoring anything that is not a string."""
+    if not isinstance(value, str):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def parse_retry_after(value, now: Optional[float] = None) -> Optional[float]:
+    """Returns the delay in seconds requested by a Retry-After header value.
+
+    Accepts both the delta-seconds and the HTTP-date form.
+    """
+    seconds = _parse_number(value)
+    if seconds is not None:
+        return max(0.0, seconds)
+    if not isinstance(value, str):
+        return None
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at - (time.time() if now is None else now))
+
+
+class TokenBucket:
+    """A thread-safe token bucket that paces callers to a steady rate."""
+
+    def __init__(self, rate: float, capacity: float,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        Initializes the TokenBucket.
+
+        Args:
+            rate: Tokens added per second.
+            capacity: The maximum number of tokens, i.e. the allowed burst.
+            clock: A monotonic clock returning seconds.
+            sleep: The function used to wait for tokens.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity,
+                           self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def tokens(self) -> float:
+        """The number of tokens currently available (negative when in debt)."""
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Takes tokens from the bucket, sleeping until they are available.
+
+        Tokens are reserved before sleeping so concurrent callers queue up
+        behind each other instead of waking up together.
+
+        Returns:
+            The number of seconds spent waiting.
+        """
+        with self._lock:
+            self._refill()
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+    def configure(self, rate: float, capacity: float):
+        """Changes the refill rate and burst size."""
+        with self._lock:
+            self._refill()
+            self.rate = rate
+            self.capacity = capacity
+            self._tokens = min(self._tokens, capacity)
+
+    def sync(self, remaining: float, reset_in: Optional[float] = None):
+        """Aligns the bucket with the budget reported by the server.
+
+        The local view never exceeds ``remaining``. When the server reports
+        the budget as exhausted, the bucket is drained until ``reset_in``.
+        """
+        with self._lock:
+            self._refill()
+            if remaining <= 0 and reset_in is not None:
+                self._tokens = min(self._tokens, -reset_in * self.rate)
+            else:
+                self._tokens = min(self._tokens, remaining)
+
+
+@dataclass
+class RateLimitStats:
+    """Counters describing how the scheduler shaped traffic."""
+
+    requests: int = 0
+    throttled: int = 0
+    retried: int = 0
+    dropped: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class RateLimitScheduler:
+    """Paces ClickUp requests to the per-token budget and retries rejections.
+
+    Requests pass through a token bucket sized from ClickUp's
+    ``X-RateLimit-*`` headers. Rate-limited (429) and gateway (5xx) responses
+    are retried with jittered exponential backoff that honours
+    ``Retry-After`` and ``X-RateLimit-Reset``.
+    """
+
+    def __init__(self, requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+                 max_retries: int = 5, backoff_base: float = 0.5,
+                 backoff_max: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep,
+                 rng: Optional[random.Random] = None):
+        """
+        Initializes the RateLimitScheduler.
+
+        Args:
+            requests_per_minute: The initial budget, until the server reports one.
+            max_retries: How many times a rejected request is retried before
+                its response is handed back to the caller.
+            backoff_base: The first backoff step in seconds.
+            backoff_max: The upper bound of a single backoff in seconds.
+            clock: A monotonic clock returning seconds.
+            sleep: The function used to wait.
+            rng: The random source used for jitter.
+        """
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.bucket = TokenBucket(requests_per_minute / 60.0, requests_per_minute,
+                                  clock=clock, sleep=sleep)
+        self.stats = RateLimitStats()
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+        self._limit = requests_per_minute
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> float:
+        """The current budget in requests per minute."""
+        return self._limit
+
+    def _count(self, name: str):
+        with self._lock:
+            setattr(self.stats, name, getattr(self.stats, name) + 1)
+
+    def observe(self, response):
+        """Updates the budget from a response's rate-limit headers."""
+        headers = getattr(response, "headers", None) or {}
+        limit = _parse_number(headers.get("X-RateLimit-Limit"))
+        remaining = _parse_number(headers.get("X-RateLimit-Remaining"))
+        reset = _parse_number(headers.get("X-RateLimit-Reset"))
+        if limit and limit != self._limit:
+            logger.info("Rate limit changed from %s to %s requests/min.", self._limit, limit)
+            self._limit = limit
+            self.bucket.configure(limit / 60.0, limit)
+        if remaining is not None:
+            reset_in = max(0.0, reset - time.time()) if reset is not None else None
+            self.bucket.sync(remaining, reset_in)
+
+    def backoff(self, attempt: int, response=None) -> float:
+        """Returns how long to wait before retry number ``attempt`` (from 0)."""
+        headers = getattr(response, "headers", None) or {}
+        retry_after = parse_retry_after(headers.get("Retry-After"))
+        if retry_after is None and getattr(response, "status_code", None) == 429:
+            reset = _parse_number(headers.get("X-RateLimit-Reset"))
+            if reset is not None:
+                retry_after = max(0.0, reset - time.time())
+        if retry_after is not None:
+            # Add a little jitter so concurrent workers do not all wake at once.
+            return retry_after + self._rng.uniform(0, self.backoff_base)
+        ceiling = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        return self._rng.uniform(0, ceiling)
+
+    def send(self, send: Callable[[], requests.Response], idempotent: bool = True):
+        """Sends a request through the bucket, retrying rejected attempts.
+
+        Args:
+            send: A callable performing the HTTP request.
+            idempotent: Whether server errors and connection failures may be
+                retried. Rate-limited (429) requests are always retried since
+                ClickUp rejects them before doing any work.
+
+        Returns:
+            The last response received. Callers still check its status.
+        """
+        attempt = 0
+        while True:
+            if self.bucket.acquire() > 0:
+                self._count("throttled")
+            self._count("requests")
+            try:
+                response = send()
+            except (requests.ConnectionError, requests.Timeout):
+                if not idempotent or attempt >= self.max_retries:
+                    self._count("dropped")
+                    raise
+                delay = self.backoff(attempt)
+                logger.warning("Connection failed, retrying in %.2fs.", delay)
+            else:
+                self.observe(response)
+                status = response.status_code
+                if status not in RETRY_STATUSES or (status != 429 and not idempotent):
+                    return response
+                if attempt >= self.max_retries:
+                    self._count("dropped")
+                    logger.error("Giving up after %d attempts (HTTP %s).", attempt + 1, status)
+                    return response
+                delay = self.backoff(attempt, response)
+                logger.warning("HTTP %s received, retrying in %.2fs.", status, delay)
+                # Release the connection of the rejected attempt.
+                response.close()
+            self._count("retried")
+            self._sleep(delay)
+            attempt += 1
@@ -0,0 +1,86 @@
+"""A thin client for the agent daemon started with ``main.py serve``.
+
+Sends its command line to the daemon and copies the output back, so a
+command costs one round trip on a warm client instead of a process start
+with all of the CLI's imports. Only the standard library is imported here.
+When no daemon is listening the command runs in this process instead::
+
+    python src/main.py serve &
+    python src/remote.py list-spaces <TEAM_ID>
+"""
+import getpass
+import json
+import os
+import socket
+import struct
+import sys
+import tempfile
+from typing import BinaryIO, List, Optional
+
+if not __package__:
+    # Run as a script (python src/remote.py): import the rest of the CLI as
+    # the src package, from the repository root rather than from src/.
+    _ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path[:] = [_ROOT] + [entry for entry in sys.path
+                             if os.path.abspath(entry or os.curdir) != os.path.join(_ROOT, 'src')]
+    __package__ = 'src'
+
+DEFAULT_SOCKET = os.environ.get('CLICKUP_AGENT_SOCKET') or os.path.join(
+    tempfile.gettempdir(), f"clickup-agent-{getpass.getuser()}.sock")
+
+# The daemon replies in frames: a kind byte and a payload length, then the
+# payload. OUTPUT frames carry what the command prints, as it prints it; the
+# final EXIT frame carries its exit status as decimal text.
+FRAME = struct.Struct('>cI')
+OUTPUT, EXIT = b'o', b'x'
+
+
+def send(argv: List[str], path: str = DEFAULT_SOCKET,
+         out: Optional[BinaryIO] = None) -> Optional[int]:
+    """Runs a command line on the daemon and copies what it prints to ``out``.
+
+    Returns:
+        The command's exit status, or None when no daemon listens on ``path``.
+    """
+    if not hasattr(socket, 'AF_UNIX'):
+        return None
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(path)
+    except OSError:
+        connection.close()
+        return None
+    out = out or sys.stdout.buffer
+    request = {'argv': argv, 'cwd': os.getcwd()}
+    if '-' in argv and not sys.stdin.isatty():
+        # e.g. "batch -": the daemon cannot read our standard input itself.
+        request['stdin'] = sys.stdin.read()
+    status = 1  # unless the daemon reports one before hanging up
+    with connection, connection.makefile('rb') as replies:
+        connection.sendall(json.dumps(request).encode('utf-8') + b'\n')
+        while True:
+            header = replies.read(FRAME.size)
+            if len(header) < FRAME.size:
+                break
+            kind, size = FRAME.unpack(header)
+            payload = replies.read(size)
+            if kind == EXIT:
+                status = int(payload)
+                break
+            out.write(payload)
+    out.flush()
+    return status
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    status = send(argv)
+    if status is not None:
+        return status
+    sys.argv = [os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py'), *argv]
+    from .main import main as run_in_process
+    return run_in_process()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
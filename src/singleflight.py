@@ -0,0 +1,76 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Call:
+    """One in-flight execution and the callers waiting for it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    runs wait and receive the same result or exception. Nothing is cached:
+    once the call finishes, the next caller runs the function again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.executed = 0
+        self.deduplicated = 0
+
+    def do(self, key: Hashable, function: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Runs ``function`` unless a call with the same key is in flight.
+
+        Returns:
+            The result and whether it was shared with another caller's call.
+        """
+        result, shared, _ = self.share(key, function)
+        return result, shared
+
+    def share(self, key: Hashable, function: Callable[[], Any]) -> Tuple[Any, bool, int]:
+        """Like do(), also returning how many other callers joined the call.
+
+        The count is final for the caller that ran ``function``, since no one
+        can join once the call has finished.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                call.followers += 1
+                self.deduplicated += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True, call.followers
+        try:
+            call.result = function()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call.done.set()
+        return call.result, False, call.followers
+
+    def forget(self):
+        """Makes later callers start new calls instead of joining running ones.
+
+        Used after a mutation, whose effect calls already in flight may miss.
+        """
+        with self._lock:
+            self._calls.clear()
@@ -0,0 +1,93 @@
+import logging
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Tasks updated within this window before the watermark are fetched again,
+# which covers clock skew and tasks updated in the same millisecond.
+WATERMARK_OVERLAP_MS = 60_000
+
+
+def _updated(task: Dict[str, Any]) -> Optional[int]:
+    value = task.get('date_updated')
+    return int(value) if value is not None else None
+
+
+class SyncEngine:
+    """Keeps a local store up to date by fetching only what changed.
+
+    Each team's tasks are requested with ``date_updated_gt`` set to the
+    newest update seen in the previous run, so a sync costs requests in
+    proportion to churn. Deletions are invisible to that filter, so every
+    ``reconcile_every`` runs the filter is dropped: that run pages through
+    all of the team's tasks once, upserting them and comparing their IDs
+    with the store's. Its cost grows with the size of the workspace rather
+    than with churn. Spaces are cheap to list and are refreshed on every run.
+    """
+
+    def __init__(self, client, store, reconcile_every: int = 7, batch_size: int = 500):
+        """
+        Initializes the SyncEngine.
+
+        Args:
+            client: The ClickUpClient used for every request.
+            store: The Mirror keeping synced objects and watermarks.
+            reconcile_every: Runs between two full, reconciling passes.
+            batch_size: Tasks written to the store per transaction.
+        """
+        self.client = client
+        self.store = store
+        self.reconcile_every = reconcile_every
+        self.batch_size = batch_size
+
+    def _task_filters(self) -> Dict[str, Any]:
+        return {'include_closed': True, 'subtasks': True}
+
+    def sync_team(self, team_id: str, reconcile: bool = False) -> Dict[str, Any]:
+        """Syncs one team and returns what changed."""
+        state = self.store.get_state(team_id)
+        watermark = state['watermark']
+        reconcile = (reconcile or watermark is None
+                     or state['runs_since_reconcile'] + 1 >= self.reconcile_every)
+
+        spaces_removed = self.store.replace_spaces(
+            team_id, self.client.get_spaces(team_id).get('spaces', []))
+
+        filters = self._task_filters()
+        cutoff = watermark - WATERMARK_OVERLAP_MS if watermark is not None else None
+        if not reconcile:
+            filters['date_updated_gt'] = cutoff
+        # A reconciling run walks every task once: the pages both refresh the
+        # store and give the ID set that reveals deletions.
+        seen = set() if reconcile else None
+        changed, newest, batch = 0, watermark, []
+        for task in self.client.iter_team_tasks(team_id, **filters):
+            updated = _updated(task)
+            if seen is not None:
+                seen.add(task['id'])
+            if cutoff is None or updated is None or updated > cutoff:
+                changed += 1
+            batch.append(task)
+            if updated is not None and (newest is None or updated > newest):
+                newest = updated
+            if len(batch) >= self.batch_size:
+                self.store.upsert_tasks(team_id, batch)
+                batch = []
+        self.store.upsert_tasks(team_id, batch)
+
+        deleted = 0
+        if seen is not None:
+            deleted = self.store.delete_tasks(self.store.task_ids(team_id) - seen)
+        self.store.set_state(team_id, newest, 0 if reconcile else state['runs_since_reconcile'] + 1)
+        result = {'team_id': team_id, 'tasks_changed': changed, 'tasks_deleted': deleted,
+                  'spaces_removed': spaces_removed, 'reconciled': reconcile}
+        logger.info("Synced team %s: %s", team_id, result)
+        return result
+
+    def sync(self, team_ids: Optional[Iterable[str]] = None, reconcile: bool = False):
+        """Syncs the given teams (all teams by default) and returns per-team results."""
+        if team_ids is None:
+            teams = self.client.get_teams().get('teams', [])
+            self.store.upsert('team', teams)
+            team_ids = [team['id'] for team in teams]
+        return [self.sync_team(team_id, reconcile=reconcile) for team_id in team_ids]
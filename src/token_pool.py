@@ -0,0 +1,352 @@
+import asyncio
+import json
+import logging
+import multiprocessing
+import queue
+import re
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
+
+from .clickup_client import DEFAULT_BASE_URL
+
+logger = logging.getLogger(__name__)
+
+# How many jobs each token's worker has queued at once. One more than it
+# runs, so a worker never idles waiting for the parent to submit.
+JOBS_PER_WORKER = 2
+# Workers send their records to the parent in chunks of this many, with at
+# most CHUNKS_PER_WORKER chunks per worker waiting to be read. A worker that
+# gets ahead blocks, so memory stays bounded however large a team is.
+RECORDS_PER_CHUNK = 500
+CHUNKS_PER_WORKER = 4
+
+
+def parse_tokens(value: Optional[str]) -> List[str]:
+    """Splits a comma- or whitespace-separated token list, dropping duplicates."""
+    tokens = []
+    for token in re.split(r"[\s,]+", value or ""):
+        if token and token not in tokens:
+            tokens.append(token)
+    return tokens
+
+
+def mask(token: str) -> str:
+    """Returns a label identifying a token in reports without revealing it."""
+    return f"...{token[-4:]}" if len(token) > 8 else "..."
+
+
+@dataclass
+class TokenUsage:
+    """What one token's worker did during a pooled run."""
+
+    token: str
+    jobs: int = 0
+    requests: int = 0
+    throttled: int = 0
+    retried: int = 0
+    busy_seconds: float = 0.0
+    limit_per_minute: float = 0.0
+
+    def utilisation(self, seconds: float) -> float:
+        """The share of the token's rate budget used over ``seconds``."""
+        budget = self.limit_per_minute / 60.0 * seconds
+        return self.requests / budget if budget else 0.0
+
+    def as_dict(self, seconds: float) -> Dict[str, Any]:
+        return {**asdict(self), 'utilisation': self.utilisation(seconds)}
+
+
+# --- Worker processes ---
+
+_client = None
+_records = None
+
+
+def _init_worker(token: str, base_url: str, pool_maxsize: int, records):
+    global _client, _records
+    from .clickup_client import ClickUpClient
+    _client = ClickUpClient(token, base_url=base_url, pool_maxsize=pool_maxsize)
+    _records = records
+
+
+class QueueSink:
+    """Sends a job's records to the parent in chunks as they are produced.
+
+    Also a crawler sink, writing crawled objects as snapshot records.
+    """
+
+    def __init__(self, records, job_id: int, chunk_size: int = RECORDS_PER_CHUNK):
+        """
+        Initializes the QueueSink.
+
+        Args:
+            records: The queue the parent reads records from.
+            job_id: The job the records belong to.
+            chunk_size: The number of records sent at a time.
+        """
+        self._records = records
+        self.job_id = job_id
+        self.chunk_size = chunk_size
+        self._chunk: List[Dict[str, Any]] = []
+        self.counts = Counter()
+
+    def add(self, record: Dict[str, Any]):
+        self._chunk.append(record)
+        if len(self._chunk) >= self.chunk_size:
+            self.flush()
+
+    def write(self, kind: str, parent_id: Optional[str], data: Dict[str, Any]):
+        self.add({'type': kind, 'parent_id': parent_id, 'data': data})
+        self.counts[kind] += 1
+
+    def flush(self):
+        if self._chunk:
+            self._records.put(('records', self.job_id, self._chunk))
+            self._chunk = []
+
+    def close(self):
+        """Sends the last records and tells the parent the job is over."""
+        try:
+            self.flush()
+        finally:
+            self._records.put(('end', self.job_id, None))
+
+
+def _crawl_job(client, payload: Dict[str, Any], sink: QueueSink):
+    """Crawls one team, sending snapshot records as objects are crawled."""
+    from .async_client import AsyncClickUpClient
+    from .crawler import Crawler
+
+    async_client = AsyncClickUpClient(client.api_token, max_concurrency=payload['concurrency'],
+                                      client=client)
+    try:
+        crawler = Crawler(async_client, sink, include_tasks=payload['include_tasks'],
+                          task_filters={'include_closed': True, 'subtasks': True})
+        asyncio.run(crawler.crawl([payload['team_id']]))
+    finally:
+        async_client.close()
+
+
+def _batch_job(client, payload: Dict[str, Any], sink: QueueSink):
+    """Runs a chunk of batch operations, sending their result records."""
+    from .batch import execute
+
+    with ThreadPoolExecutor(max_workers=payload['concurrency'],
+                            thread_name_prefix='batch') as executor:
+        for record in executor.map(lambda item: execute(client, *item), payload['operations']):
+            sink.add(record)
+
+
+JOBS = {'crawl': _crawl_job, 'batch': _batch_job}
+
+
+def _run_job(job: str, job_id: int, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Runs one job on this worker's client, returning its usage.
+
+    The records go to the parent through the worker's queue, followed by an
+    end marker even when the job fails.
+    """
+    stats = _client.scheduler.stats
+    before = (stats.requests, stats.throttled, stats.retried)
+    started = time.perf_counter()
+    sink = QueueSink(_records, job_id)
+    try:
+        JOBS[job](_client, payload, sink)
+    finally:
+        sink.close()
+    return {
+        'busy_seconds': time.perf_counter() - started,
+        'requests': stats.requests - before[0],
+        'throttled': stats.throttled - before[1],
+        'retried': stats.retried - before[2],
+        'limit_per_minute': _client.scheduler.limit,
+    }
+
+
+# --- The pool ---
+
+class TokenPool:
+    """Fans work out over several API tokens, one worker process per token.
+
+    ClickUp's rate limit applies per token, so each worker runs its own
+    ClickUpClient with its own RateLimitScheduler, and total throughput grows
+    with the number of tokens. Jobs go to whichever worker frees up first and
+    their records are streamed back in chunks through a bounded queue, merged
+    into one stream in arrival order.
+    """
+
+    def __init__(self, tokens: List[str], base_url: str = DEFAULT_BASE_URL,
+                 concurrency: int = 8):
+        """
+        Initializes the TokenPool.
+
+        Args:
+            tokens: The API tokens, one worker process each.
+            base_url: The base URL for the ClickUp API.
+            concurrency: The number of requests each worker keeps in flight.
+        """
+        if not tokens:
+            raise ValueError("The token pool needs at least one token.")
+        self.concurrency = concurrency
+        # Spawned rather than forked: the parent may be running threads (the
+        # daemon, a webhook receiver) whose locks a fork would copy mid-use.
+        context = multiprocessing.get_context('spawn')
+        self._records = context.Queue(maxsize=CHUNKS_PER_WORKER * len(tokens))
+        self._executors = [
+            ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=_init_worker,
+                                initargs=(token, base_url, concurrency, self._records))
+            for token in tokens]
+        self._next_job = 0
+        self.usage = [TokenUsage(mask(token)) for token in tokens]
+        self.seconds = 0.0
+
+    def __enter__(self) -> 'TokenPool':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Stops the worker processes."""
+        for executor in self._executors:
+            executor.shutdown(wait=True)
+        self._records.close()
+
+    def run(self, job: str, payloads: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Runs a job for each payload and yields every record as it arrives.
+
+        Payloads are read lazily, at most JOBS_PER_WORKER per worker ahead.
+        """
+        payloads = iter(payloads)
+        pending: Dict[int, Tuple[Any, int]] = {}
+        load = [0] * len(self._executors)
+        started = time.perf_counter()
+
+        def submit() -> bool:
+            index = min(range(len(load)), key=load.__getitem__)
+            if load[index] >= JOBS_PER_WORKER:
+                return False
+            payload = next(payloads, None)
+            if payload is None:
+                return False
+            self._next_job += 1
+            future = self._executors[index].submit(_run_job, job, self._next_job, payload)
+            pending[self._next_job] = future, index
+            load[index] += 1
+            return True
+
+        try:
+            while submit():
+                pass
+            while pending:
+                try:
+                    kind, job_id, records = self._records.get(timeout=0.5)
+                except queue.Empty:
+                    self._raise_lost_jobs(pending)
+                    continue
+                if job_id not in pending:
+                    continue  # left over from a run that was abandoned
+                if kind == 'records':
+                    yield from records
+                    continue
+                future, index = pending.pop(job_id)
+                load[index] -= 1
+                self._account(index, future.result())
+                while submit():
+                    pass
+        finally:
+            self._abandon(pending)
+            self.seconds += time.perf_counter() - started
+
+    @staticmethod
+    def _raise_lost_jobs(pending: Dict[int, Tuple[Any, int]]):
+        # A job whose worker died sends no end marker; its future has the error.
+        for future, _ in pending.values():
+            if future.done() and future.exception() is not None:
+                raise future.exception()
+
+    def _abandon(self, pending: Dict[int, Tuple[Any, int]]):
+        """Cancels unstarted jobs and discards the records of running ones."""
+        for future, _ in pending.values():
+            future.cancel()
+        # Running jobs block once the queue is full, so keep reading until they end.
+        while any(not future.done() for future, _ in pending.values()):
+            try:
+                self._records.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+    def _account(self, index: int, usage: Dict[str, Any]):
+        totals = self.usage[index]
+        totals.jobs += 1
+        totals.requests += usage['requests']
+        totals.throttled += usage['throttled']
+        totals.retried += usage['retried']
+        totals.busy_seconds += usage['busy_seconds']
+        totals.limit_per_minute = usage['limit_per_minute']
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Returns the usage of each token over the pool's running time."""
+        return [usage.as_dict(self.seconds) for usage in self.usage]
+
+    def summary(self) -> str:
+        """Renders the usage of each token as a table."""
+        lines = [f"{'Token':<10} {'Jobs':>6} {'Requests':>9} {'Req/min':>8} {'Budget':>7} "
+                 f"{'Busy':>6} {'Waited':>7} {'Retried':>8}"]
+        minutes = self.seconds / 60.0
+        for usage in self.usage:
+            busy = usage.busy_seconds / self.seconds if self.seconds else 0.0
+            rate = usage.requests / minutes if minutes else 0.0
+            lines.append(f"{usage.token:<10} {usage.jobs:>6} {usage.requests:>9} {rate:>8.0f} "
+                         f"{usage.utilisation(self.seconds):>7.0%} {busy:>6.0%} "
+                         f"{usage.throttled:>7} {usage.retried:>8}")
+        return '\n'.join(lines)
+
+
+def crawl_teams(pool: TokenPool, team_ids: Iterable[str],
+                include_tasks: bool = True) -> Iterator[Dict[str, Any]]:
+    """Crawls teams in parallel across the pool's tokens, one job per team.
+
+    Yields snapshot records (``type``, ``parent_id``, ``data``) team by team.
+    """
+    return pool.run('crawl', ({'team_id': team_id, 'include_tasks': include_tasks,
+                               'concurrency': pool.concurrency} for team_id in team_ids))
+
+
+def _chunks(operations: Iterable[Tuple[int, Dict[str, Any]]], skip: Set[int],
+            size: int, summary: Dict[str, int]) -> Iterator[Dict[str, Any]]:
+    chunk = []
+    for line_number, operation in operations:
+        if line_number in skip:
+            summary['skipped'] += 1
+            continue
+        chunk.append((line_number, operation))
+        if len(chunk) == size:
+            yield {'operations': chunk}
+            chunk = []
+    if chunk:
+        yield {'operations': chunk}
+
+
+def run_batch(pool: TokenPool, operations: Iterable[Tuple[int, Dict[str, Any]]],
+              output: TextIO, skip: Optional[Set[int]] = None,
+              chunk_size: int = 50) -> Dict[str, int]:
+    """Executes batch operations across the pool's tokens.
+
+    Works like batch.run_batch: operations are read in chunks of
+    ``chunk_size`` as workers free up, results are streamed to ``output`` as
+    JSONL in completion order and the returned summary has the same counts.
+    """
+    skip = skip or set()
+    summary = {'succeeded': 0, 'failed': 0, 'skipped': 0}
+    payloads = ({**chunk, 'concurrency': pool.concurrency}
+                for chunk in _chunks(operations, skip, chunk_size, summary))
+    for record in pool.run('batch', payloads):
+        output.write(json.dumps(record) + '\n')
+        output.flush()
+        summary['succeeded' if record['ok'] else 'failed'] += 1
+    logger.info("Pooled batch finished: %s", summary)
+    return summary
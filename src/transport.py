@@ -0,0 +1,276 @@
+"""Pluggable HTTP transports for ClickUpClient.
+
+A transport sends one HTTP request and returns a ``requests.Response`` (or
+an object behaving like one), so everything above it — rate limiting,
+retries, caching, metrics, streaming — works the same whichever is used:
+
+- RequestsTransport: a pooled ``requests.Session`` (the default).
+- HttpxTransport: an ``httpx`` client, with HTTP/2 when ``h2`` is installed.
+- RecordingTransport: wraps another transport and records every exchange.
+- ReplayTransport: answers from a recording, without any network.
+
+Recordings are JSONL files of exchanges, gzip-compressed when the file name
+ends in ``.gz``.
+"""
+import base64
+import gzip
+import json
+import logging
+import threading
+from collections import defaultdict, deque
+from typing import IO, Any, Deque, Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - depends on the environment
+    httpx = None
+
+
+def open_recording(path: str, mode: str = 'r'):
+    """Opens a recording as text, through gzip when its name ends in ``.gz``.
+
+    Each time a compressed recording is opened for appending, a new gzip
+    member is started; members read back as one stream.
+    """
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def build_response(method: str, url: str, status_code: int, headers: Dict[str, str],
+                   content: bytes, reason: str = '',
+                   request: Optional[requests.PreparedRequest] = None) -> requests.Response:
+    """Builds a complete ``requests.Response`` from its parts.
+
+    ``request`` is the request it answers; one is prepared from the method
+    and URL when omitted.
+    """
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers = CaseInsensitiveDict(headers)
+    response._content = content
+    response._content_consumed = True
+    response.url = url
+    response.reason = reason
+    response.encoding = 'utf-8'
+    response.request = request or requests.Request(method, url).prepare()
+    return response
+
+
+class Transport:
+    """Sends requests for a client. Subclasses implement send()."""
+
+    def __init__(self):
+        # Sent with every request, e.g. the Authorization header.
+        self.headers: Dict[str, str] = {}
+
+    def send(self, method: str, url: str, timeout: float, **kwargs) -> requests.Response:
+        """Sends one request.
+
+        Args:
+            method: The HTTP method.
+            url: The full URL, without query parameters.
+            timeout: The timeout in seconds.
+            **kwargs: ``params``, ``json``, ``headers`` and ``stream``, as
+                ``requests`` accepts them.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Releases pooled connections."""
+
+
+class RequestsTransport(Transport):
+    """Sends requests on a pooled, keep-alive ``requests.Session``."""
+
+    def __init__(self, pool_maxsize: int = 10):
+        """
+        Initializes the RequestsTransport.
+
+        Args:
+            pool_maxsize: The number of keep-alive connections kept per host.
+        """
+        super().__init__()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.headers = self.session.headers
+
+    def send(self, method: str, url: str, timeout: float, **kwargs) -> requests.Response:
+        return getattr(self.session, method.lower())(url, timeout=timeout, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+class HttpxTransport(Transport):
+    """Sends requests with ``httpx``, multiplexed over HTTP/2 when possible.
+
+    One HTTP/2 connection carries many concurrent requests, which suits the
+    threaded and async callers. Responses are converted to
+    ``requests.Response`` and transport errors to their ``requests``
+    equivalents, so retries and error handling are unchanged.
+    """
+
+    def __init__(self, pool_maxsize: int = 10, http2: bool = True):
+        """
+        Initializes the HttpxTransport.
+
+        Args:
+            pool_maxsize: The maximum number of connections.
+            http2: Negotiate HTTP/2. Ignored unless the ``h2`` package is installed.
+        """
+        if httpx is None:
+            raise RuntimeError("HttpxTransport requires httpx (pip install 'httpx[http2]').")
+        super().__init__()
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("h2 is not installed; falling back to HTTP/1.1.")
+                http2 = False
+        self.client = httpx.Client(
+            http2=http2, limits=httpx.Limits(max_connections=pool_maxsize,
+                                             max_keepalive_connections=pool_maxsize))
+        self.headers = self.client.headers
+
+    def send(self, method: str, url: str, timeout: float, **kwargs) -> requests.Response:
+        kwargs.pop('stream', None)  # bodies are read in full; ArrayStream still parses them
+        try:
+            response = self.client.request(method, url, timeout=timeout, **kwargs)
+        except httpx.TimeoutException as e:
+            raise requests.Timeout(str(e)) from e
+        except httpx.TransportError as e:
+            raise requests.ConnectionError(str(e)) from e
+        return build_response(method, str(response.url), response.status_code,
+                              dict(response.headers), response.content,
+                              reason=response.reason_phrase)
+
+    def close(self):
+        self.client.close()
+
+
+def _request_key(method: str, url: str, kwargs: Dict[str, Any]) -> Tuple[str, str, str]:
+    """Identifies a request by method, URL with query and JSON body."""
+    if kwargs.get('params'):
+        url = f"{url}?{urlencode(sorted(kwargs['params'].items()))}"
+    body = json.dumps(kwargs['json'], sort_keys=True) if kwargs.get('json') is not None else ''
+    return method.upper(), url, body
+
+
+def _encode_body(content: bytes) -> Dict[str, str]:
+    try:
+        return {'body': content.decode('utf-8')}
+    except UnicodeDecodeError:
+        return {'body_base64': base64.b64encode(content).decode('ascii')}
+
+
+def _decode_body(exchange: Dict[str, Any]) -> bytes:
+    if 'body_base64' in exchange:
+        return base64.b64decode(exchange['body_base64'])
+    return exchange.get('body', '').encode('utf-8')
+
+
+class RecordingTransport(Transport):
+    """Passes requests to another transport and appends each exchange to a JSONL file.
+
+    The file is opened on the first exchange and kept open until ``close()``,
+    so a ``.gz`` recording is one compressed stream rather than a gzip member
+    per exchange. Request headers are not recorded, so the API token stays out
+    of the file.
+    """
+
+    def __init__(self, inner: Transport, path: str):
+        super().__init__()
+        self.inner = inner
+        self.path = path
+        self.headers = inner.headers
+        self._lock = threading.Lock()
+        self._stream: Optional[IO[str]] = None
+
+    def send(self, method: str, url: str, timeout: float, **kwargs) -> requests.Response:
+        response = self.inner.send(method, url, timeout, **kwargs)
+        content = response.content  # reads a streamed body so it can be recorded
+        method, full_url, body = _request_key(method, url, kwargs)
+        exchange = {'method': method, 'url': full_url, 'request_body': body,
+                    'status': response.status_code, 'headers': dict(response.headers),
+                    **_encode_body(content)}
+        with self._lock:
+            if self._stream is None:
+                self._stream = open_recording(self.path, 'a')
+            self._stream.write(json.dumps(exchange) + '\n')
+        return response
+
+    def close(self):
+        with self._lock:
+            if self._stream is not None:
+                self._stream.close()
+                self._stream = None
+        self.inner.close()
+
+
+class _Replay:
+    """A recorded response, decoded once so replaying it is cheap."""
+
+    __slots__ = ('status', 'headers', 'content', 'request')
+
+    def __init__(self, method: str, url: str, exchange: Dict[str, Any]):
+        self.status = exchange['status']
+        self.headers = exchange.get('headers', {})
+        self.content = _decode_body(exchange)
+        self.request = requests.Request(method, url).prepare()
+
+
+class ReplayTransport(Transport):
+    """Answers requests from a recording made by RecordingTransport.
+
+    The recording is loaded into memory up front. Exchanges for the same
+    method, URL and body are replayed in recorded order; the last one is
+    repeated once they run out. A request that was never recorded gets a
+    404 unless ``strict`` is set, which raises instead.
+    """
+
+    def __init__(self, path: str, strict: bool = False):
+        super().__init__()
+        self.strict = strict
+        self._lock = threading.Lock()
+        self._exchanges: Dict[Tuple[str, str, str], Deque[_Replay]] = defaultdict(deque)
+        with open_recording(path) as stream:
+            for line in stream:
+                if line.strip():
+                    exchange = json.loads(line)
+                    key = (exchange['method'], exchange['url'], exchange.get('request_body', ''))
+                    self._exchanges[key].append(_Replay(key[0], key[1], exchange))
+
+    def send(self, method: str, url: str, timeout: float, **kwargs) -> requests.Response:
+        key = _request_key(method, url, kwargs)
+        with self._lock:
+            queue = self._exchanges.get(key)
+            replay: Optional[_Replay] = None
+            if queue:
+                replay = queue.popleft() if len(queue) > 1 else queue[0]
+        if replay is None:
+            if self.strict:
+                raise LookupError(f"No recorded response for {key[0]} {key[1]}.")
+            return build_response(key[0], key[1], 404, {'Content-Type': 'application/json'},
+                                  b'{"err": "Not recorded"}', reason='Not Found')
+        return build_response(key[0], key[1], replay.status, replay.headers, replay.content,
+                              request=replay.request)
+
+
+TRANSPORTS = {'requests': RequestsTransport, 'httpx': HttpxTransport}
+
+
+def create_transport(name: str = 'requests', pool_maxsize: int = 10) -> Transport:
+    """Creates a network transport by name: ``requests`` or ``httpx``."""
+    if name not in TRANSPORTS:
+        raise ValueError(f"Unknown transport: {name!r}")
+    return TRANSPORTS[name](pool_maxsize=pool_maxsize)
@@ -0,0 +1,314 @@
+import hashlib
+import hmac
+import json
+import logging
+import queue
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from requests.exceptions import HTTPError
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = "X-Signature"
+
+# Events the processor acts on. Others (folders, lists, goals...) are ignored.
+SPACE_EVENTS = frozenset({"spaceCreated", "spaceUpdated", "spaceDeleted"})
+TASK_DELETED = "taskDeleted"
+# The cached task listings a task event makes stale.
+TASK_LISTINGS = ("list/{id}/task", "team/{id}/task")
+
+
+def sign(secret: str, body: bytes) -> str:
+    """Returns the signature ClickUp sends for a body: its hex HMAC-SHA256."""
+    return hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+
+
+def verify_signature(secret: str, body: bytes, signature: Optional[str]) -> bool:
+    """Tells whether a delivery's signature matches its body."""
+    return bool(signature) and hmac.compare_digest(sign(secret, body), signature)
+
+
+class EventProcessor:
+    """Applies webhook events to the response cache and the mirror.
+
+    Webhook payloads only name what changed, so changed spaces and tasks are
+    fetched once each; deletions need no request at all. Either store is
+    optional.
+    """
+
+    def __init__(self, client, mirror=None, cache=None,
+                 teams: Optional[Dict[str, str]] = None):
+        """
+        Initializes the EventProcessor.
+
+        Args:
+            client: The ClickUpClient used to fetch changed objects.
+            mirror: An optional Mirror kept up to date.
+            cache: The ResponseCache to invalidate, the client's by default.
+            teams: Maps webhook IDs to the team they were registered for, so
+                spaces and tasks are stored under the right team.
+        """
+        self.client = client
+        self.mirror = mirror
+        self.cache = cache if cache is not None else getattr(client, "cache", None)
+        self.teams = dict(teams or {})
+
+    def _team(self, event: Dict[str, Any], data: Optional[Dict[str, Any]] = None):
+        team = (data or {}).get("team_id") or event.get("team_id")
+        return str(team) if team else self.teams.get(str(event.get("webhook_id")))
+
+    def _invalidate(self, *keys: str, endpoints: Iterable[str] = ()):
+        if self.cache is None:
+            return
+        for key in keys:
+            self.cache.invalidate(key)
+        for endpoint in endpoints:
+            self.cache.invalidate_endpoint(endpoint)
+
+    def apply(self, event: Dict[str, Any]) -> bool:
+        """Applies one event, returning False when it is not handled."""
+        name = event.get("event")
+        if name in SPACE_EVENTS and event.get("space_id"):
+            self._apply_space(event, name, str(event["space_id"]))
+        elif name and name.startswith("task") and event.get("task_id"):
+            self._apply_task(event, name, str(event["task_id"]))
+        else:
+            logger.debug("Ignoring webhook event %r.", name)
+            return False
+        return True
+
+    def _apply_space(self, event: Dict[str, Any], name: str, space_id: str):
+        team_id = self._team(event)
+        # The team's space listing changes with any space event.
+        listing = f"team/{team_id}/space" if team_id else None
+        self._invalidate(f"space/{space_id}", *([listing] if listing else []),
+                         endpoints=() if listing else ("team/{id}/space",))
+        if name == "spaceDeleted":
+            if self.mirror is not None:
+                self.mirror.delete("space", [space_id])
+            return
+        if self.mirror is not None:
+            space = self.client.get_space(space_id)
+            if team_id is None:
+                logger.warning("Space %s changed in an unknown team; not mirrored.", space_id)
+                return
+            self.mirror.upsert("space", [space], parent_id=team_id)
+
+    def _apply_task(self, event: Dict[str, Any], name: str, task_id: str):
+        # Task pages are cached per list or team and page, and a task may have
+        # moved between lists, so every cached task listing is dropped.
+        self._invalidate(f"task/{task_id}", endpoints=TASK_LISTINGS)
+        if self.mirror is None:
+            return
+        if name == TASK_DELETED:
+            self.mirror.delete_tasks([task_id])
+            return
+        try:
+            task = self.client.get_task(task_id)
+        except HTTPError as e:
+            if e.response is None or e.response.status_code != 404:
+                raise
+            # Deleted again before we got to it.
+            self.mirror.delete_tasks([task_id])
+            return
+        team_id = self._team(event, task)
+        self.mirror.upsert_tasks(team_id, [task])
+
+
+class EventQueue:
+    """Applies events in arrival order on a background thread.
+
+    Receiving and applying are decoupled so deliveries are acknowledged
+    immediately, while a slow fetch only delays later events.
+    """
+
+    def __init__(self, processor: EventProcessor, maxsize: int = 10000):
+        self.processor = processor
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize)
+        self._thread: Optional[threading.Thread] = None
+        self.processed = 0
+        self.failed = 0
+
+    def start(self) -> "EventQueue":
+        self._thread = threading.Thread(target=self._run, name="webhook-events", daemon=True)
+        self._thread.start()
+        return self
+
+    def put(self, event: Dict[str, Any]) -> bool:
+        """Queues an event, returning False when the queue is full."""
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            return False
+        return True
+
+    def join(self):
+        """Waits until every queued event has been applied."""
+        self._queue.join()
+
+    def stop(self):
+        """Applies the remaining events and stops the worker."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while True:
+            event = self._queue.get()
+            try:
+                if event is None:
+                    return
+                self.processor.apply(event)
+                self.processed += 1
+            except Exception:
+                self.failed += 1
+                logger.exception("Failed to apply webhook event %r.", event.get('event'))
+            finally:
+                self._queue.task_done()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_Server"
+
+    def log_message(self, format, *args):
+        logger.debug("%s - " + format, self.address_string(), *args)
+
+    def _reply(self, status: int, message: str):
+        body = json.dumps({"message": message}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        receiver = self.server.receiver
+        if self.path.split("?", 1)[0] != receiver.path:
+            self._reply(404, "Not found")
+            return
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        try:
+            event = json.loads(body)
+        except ValueError:
+            self._reply(400, "Invalid JSON")
+            return
+        if not isinstance(event, dict):
+            self._reply(400, "Expected a JSON object")
+            return
+        secret = receiver.secret_for(event.get("webhook_id"))
+        if secret is None or not verify_signature(secret, body,
+                                                  self.headers.get(SIGNATURE_HEADER)):
+            receiver.rejected += 1
+            logger.warning("Rejected a webhook delivery for %r: bad signature.",
+                           event.get('webhook_id'))
+            self._reply(401, "Invalid signature")
+            return
+        if not receiver.events.put(event):
+            # ClickUp retries failed deliveries, so shed load instead of blocking.
+            self._reply(503, "Busy")
+            return
+        receiver.received += 1
+        self._reply(200, "OK")
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    receiver: "WebhookReceiver"
+
+
+class WebhookReceiver:
+    """A small HTTP endpoint verifying ClickUp webhook deliveries.
+
+    Deliveries signed with the secret of their ``webhook_id`` are queued on
+    an EventQueue; others are rejected with 401.
+    """
+
+    def __init__(self, events: EventQueue, secrets: Dict[str, str],
+                 host: str = "127.0.0.1", port: int = 0, path: str = "/webhook"):
+        """
+        Initializes the WebhookReceiver.
+
+        Args:
+            events: The queue deliveries are put on.
+            secrets: Maps webhook IDs to their signing secret.
+            host: The interface to listen on.
+            port: The port to listen on, or 0 for any free port.
+            path: The URL path ClickUp posts to.
+        """
+        self.events = events
+        self.secrets = dict(secrets)
+        self.path = path
+        self.received = 0
+        self.rejected = 0
+        self._httpd = _Server((host, port), _Handler)
+        self._httpd.receiver = self
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}{self.path}"
+
+    def secret_for(self, webhook_id: Any) -> Optional[str]:
+        return self.secrets.get(str(webhook_id)) if webhook_id is not None else None
+
+    def serve_forever(self):
+        """Serves deliveries in the calling thread until stop() is called."""
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+
+    def start(self) -> "WebhookReceiver":
+        """Serves deliveries in a background thread."""
+        threading.Thread(target=self._httpd.serve_forever, name="webhook-receiver",
+                         daemon=True).start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "WebhookReceiver":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def registered_webhooks(client, team_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """Returns this token's webhooks of several teams, keyed by webhook ID."""
+    webhooks = {}
+    for team_id in team_ids:
+        for webhook in client.get_webhooks(team_id).get("webhooks", []):
+            webhooks[str(webhook["id"])] = {**webhook, "team_id": str(team_id)}
+    return webhooks
+
+
+def listen(client, team_ids: Iterable[str], mirror=None, host: str = "127.0.0.1",
+           port: int = 8080, path: str = "/webhook",
+           on_ready: Optional[Callable[[WebhookReceiver], None]] = None):
+    """Receives the teams' webhook deliveries and applies them until interrupted.
+
+    The signing secrets and teams of the webhooks are fetched once at start.
+    """
+    webhooks = registered_webhooks(client, team_ids)
+    processor = EventProcessor(client, mirror=mirror,
+                               teams={hook_id: hook["team_id"] for hook_id, hook in webhooks.items()})
+    events = EventQueue(processor).start()
+    receiver = WebhookReceiver(events, {hook_id: hook["secret"] for hook_id, hook
+                                        in webhooks.items() if hook.get("secret")},
+                               host=host, port=port, path=path)
+    logger.info("Receiving %d webhooks on %s.", len(webhooks), receiver.url)
+    if on_ready is not None:
+        on_ready(receiver)
+    try:
+        receiver.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        events.stop()
+    return {"received": receiver.received, "rejected": receiver.rejected,
+            "applied": events.processed, "failed": events.failed}
@@ -0,0 +1,23 @@
+import os
+import sys
+
+# The tests import the src and benchmarks packages from the repository root,
+# however pytest is started.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def run_in_tmp_path(tmp_path, monkeypatch):
+    """Runs each test in its own directory, which receives the CLI's default files."""
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.fixture(autouse=True)
+def stop_logging_pipeline():
+    """Stops the logging pipeline a CLI test started, so it does not outlive the test."""
+    yield
+    logs = sys.modules.get("src.logs")
+    if logs is not None:
+        logs.shutdown_logging()
@@ -0,0 +1,158 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+
+from benchmarks.mock_server import MockClickUpServer, MockConfig
+from src.adaptive import MIN_SAMPLES, AdaptiveLimiter
+from src.clickup_client import ClickUpClient
+from src.metrics import MetricsRecorder
+from src.rate_limit import RateLimitScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def complete(limiter: AdaptiveLimiter, clock: FakeClock, count: int, latency: float,
+             overloaded: bool = False, endpoint=None):
+    """Runs ``count`` rounds of ``latency`` seconds, as many requests at once as allowed."""
+    for _ in range(count):
+        started = [limiter.acquire() for _ in range(limiter.limit)]
+        clock.now += latency
+        for start in started:
+            limiter.release(start, overloaded=overloaded, endpoint=endpoint)
+
+
+def test_grows_while_latency_is_flat():
+    """Test that the limit grows additively up to its maximum while latency is flat."""
+    clock = FakeClock()
+    limiter = AdaptiveLimiter(initial=2, max_limit=10, clock=clock)
+    complete(limiter, clock, 3, 0.05)
+    assert 3 <= limiter.limit < 10
+    complete(limiter, clock, 20, 0.05)
+    assert limiter.limit == 10 and limiter.stats.peak_limit == 10
+    assert limiter.in_flight == 0
+
+
+def test_backs_off_once_per_overload():
+    """Test that requests in flight during an overload cut the limit only once."""
+    clock = FakeClock()
+    limiter = AdaptiveLimiter(initial=8, min_limit=2, clock=clock)
+    started = [limiter.acquire() for _ in range(8)]
+    clock.now += 0.05
+    for start in started:
+        limiter.release(start, overloaded=True)
+    assert limiter.limit == 4 and limiter.stats.decreases == 1
+    assert limiter.stats.overloads == 8
+    complete(limiter, clock, 5, 0.05, overloaded=True)
+    assert limiter.limit == 2
+
+
+def test_backs_off_on_latency_spikes():
+    """Test that latency well above the baseline cuts the limit."""
+    clock = FakeClock()
+    limiter = AdaptiveLimiter(initial=8, clock=clock)
+    complete(limiter, clock, 2, 0.02)
+    limit = limiter.limit
+    complete(limiter, clock, 3, 0.2)
+    assert limiter.limit < limit and limiter.stats.decreases >= 1
+
+
+def test_fast_outlier_does_not_become_the_baseline():
+    """Test that one unusually fast response does not make normal latency look like a spike."""
+    clock = FakeClock()
+    limiter = AdaptiveLimiter(initial=32, max_limit=32, clock=clock)
+    complete(limiter, clock, 50, 0.05)
+    outlier, *others = [limiter.acquire() for _ in range(limiter.limit)]
+    clock.now += 0.002
+    limiter.release(outlier)
+    clock.now += 0.048
+    for start in others:
+        limiter.release(start)
+    complete(limiter, clock, 50, 0.05)
+    assert limiter.limit == 32 and limiter.stats.decreases == 0
+
+
+def test_mixed_endpoints_are_judged_apart():
+    """Test that alternating fast and slow endpoints do not pin the limit at its minimum."""
+    clock = FakeClock()
+    limiter = AdaptiveLimiter(initial=4, max_limit=32, clock=clock)
+    for round_number in range(400):
+        if round_number % 2:
+            complete(limiter, clock, 1, 0.06, endpoint="POST team/{id}/space")
+        else:
+            complete(limiter, clock, 1, 0.01, endpoint="GET space/{id}")
+    assert limiter.limit == 32 and limiter.stats.decreases == 0
+    complete(limiter, clock, 3, 0.2, endpoint="GET space/{id}")
+    assert limiter.limit < 32
+
+
+def test_timeout_follows_p99():
+    """Test that timeouts are derived from the p99 latency within their bounds."""
+    clock = FakeClock()
+    limiter = AdaptiveLimiter(initial=1, max_limit=1, min_timeout=0.5, clock=clock)
+    assert limiter.timeout(10) == 10
+    complete(limiter, clock, 40, 0.4)
+    assert limiter.timeout(10) == pytest.approx(1.2)
+    complete(limiter, clock, 500, 0.01)
+    assert limiter.timeout(10) == 0.5
+    complete(limiter, clock, 500, 5)
+    assert limiter.timeout(10) == 10
+
+
+def test_p99_is_recomputed_every_few_samples():
+    """Test that a full latency window is re-sorted and published every MIN_SAMPLES releases."""
+    clock = FakeClock()
+    metrics = MagicMock()
+    limiter = AdaptiveLimiter(initial=1, max_limit=1, window=500, metrics=metrics, clock=clock)
+    complete(limiter, clock, 1500, 0.01)
+    published = [call for call in metrics.set_gauge.call_args_list
+                 if call.args[0] == "latency_p99_seconds"]
+    assert len(published) == 1500 // MIN_SAMPLES
+
+
+def test_limits_concurrency_against_mock_server():
+    """Test that the limiter settles near the capacity of a server whose latency grows."""
+    config = MockConfig(teams=1, spaces_per_team=8, folders_per_space=0, lists_per_folder=0,
+                        folderless_lists=0, tasks_per_list=0, latency=0.02, jitter=0,
+                        payload_bytes=0, capacity=4)
+    metrics = MetricsRecorder()
+    limiter = AdaptiveLimiter(initial=2, max_limit=32, metrics=metrics)
+    with MockClickUpServer(config) as server:
+        client = ClickUpClient("test_token", base_url=server.url, pool_maxsize=32,
+                               coalesce=False, metrics=metrics, limiter=limiter,
+                               scheduler=RateLimitScheduler(requests_per_minute=100_000))
+        with ThreadPoolExecutor(32) as executor:
+            list(executor.map(lambda index: client.get_space(f"1_{index % 8}"), range(400)))
+        client.close()
+    assert limiter.stats.increases > 0 and limiter.stats.decreases > 0
+    assert 2 <= limiter.stats.peak_limit <= 16
+    assert server.peak_in_flight <= 16
+    gauges = metrics.snapshot()["gauges"]
+    assert gauges["concurrency_limit"] == limiter.limit
+    assert "latency_p99_seconds" in gauges
+
+
+def test_backs_off_on_429():
+    """Test that rate-limited responses from the mock server keep the limit down."""
+    config = MockConfig(teams=1, spaces_per_team=2, folders_per_space=0, lists_per_folder=0,
+                        folderless_lists=0, tasks_per_list=0, latency=0.005, jitter=0,
+                        payload_bytes=0, throttle_every=5)
+    limiter = AdaptiveLimiter(initial=8, max_limit=16)
+    with MockClickUpServer(config) as server:
+        client = ClickUpClient("test_token", base_url=server.url, pool_maxsize=16,
+                               coalesce=False, limiter=limiter,
+                               scheduler=RateLimitScheduler(requests_per_minute=100_000,
+                                                            backoff_base=0.001))
+        with ThreadPoolExecutor(16) as executor:
+            spaces = list(executor.map(lambda index: client.get_space(f"1_{index % 2}"),
+                                       range(100)))
+        client.close()
+    assert len(spaces) == 100 and server.throttled > 0
+    assert limiter.stats.overloads == server.throttled
+    assert limiter.stats.decreases > 0 and limiter.limit < 8
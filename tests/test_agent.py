@@ -0,0 +1,107 @@
+import io
+import os
+import socket
+import subprocess
+import sys
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.agent import AgentServer, AgentSession, AgentShell
+from src.main import build_parser, run_command
+from src.remote import EXIT, FRAME, send
+
+
+@pytest.fixture
+def create_client():
+    """Fixture for a client factory returning mocked ClickUp clients."""
+    def create(api_token, args):
+        client = MagicMock()
+        client.iter_teams.side_effect = lambda: iter([{"id": "123", "name": "Test Team"}])
+        client.get_space.return_value = {"id": "456", "name": "Test Space"}
+        client.create_space.side_effect = RuntimeError("Space limit reached")
+        return client
+    return MagicMock(side_effect=create)
+
+
+@pytest.fixture
+def session(create_client):
+    """Fixture for an AgentSession on mocked clients."""
+    return AgentSession(build_parser(), "test_token", run_command, create_client)
+
+
+def test_session_reuses_client(session, create_client):
+    """Test that consecutive commands share one warm client."""
+    out = io.StringIO()
+    session.execute(['list-teams'], out)
+    session.execute(['get-space', '456'], out)
+
+    assert "Test Team" in out.getvalue()
+    assert "Test Space" in out.getvalue()
+    assert create_client.call_count == 1
+    assert session.commands == 2
+
+
+def test_session_client_per_options(session, create_client):
+    """Test that commands with different client options get their own client."""
+    session.execute(['list-teams'], io.StringIO())
+    session.execute(['--base-url', 'http://localhost/', 'list-teams'], io.StringIO())
+    assert create_client.call_count == 2
+    # The worker count sizes the client's connection pool.
+    parser = session.parser
+    assert (session.client(parser.parse_args(['crawl', 'a.jsonl', '--workers', '4']))
+            is not session.client(parser.parse_args(['crawl', 'a.jsonl', '--workers', '32'])))
+
+
+def test_session_reports_usage_errors(session):
+    """Test that invalid command lines print usage instead of exiting."""
+    out = io.StringIO()
+    session.execute(['no-such-command'], out)
+    assert "usage:" in out.getvalue()
+    session.execute(['shell'], out)
+    assert "Already running as an agent." in out.getvalue()
+
+
+def test_shell(session):
+    """Test running commands from the interactive shell."""
+    out = io.StringIO()
+    AgentShell(session, stdin=io.StringIO("list-teams\nhelp get-space\nexit\n"),
+               stdout=out).cmdloop()
+    assert "Test Team" in out.getvalue()
+    assert "space_id" in out.getvalue()
+
+
+def test_daemon(session, tmp_path):
+    """Test sending commands to the daemon through the thin client."""
+    path = str(tmp_path / "agent.sock")
+    server = AgentServer(session, path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        out = io.BytesIO()
+        assert send(['--output', 'jsonl', 'list-teams'], path, out=out) == 0
+        assert out.getvalue() == b'{"id":"123","name":"Test Team"}\n'
+        # Failed commands and usage errors report their exit status.
+        assert send(['create-space', '123', 'New'], path, out=io.BytesIO()) == 1
+        assert send(['no-such-command'], path, out=io.BytesIO()) == 2
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.connect(path)
+            connection.sendall(b'not json\n')
+            reply = connection.makefile('rb').read()
+        assert b"Invalid request" in reply and reply.endswith(FRAME.pack(EXIT, 1) + b"2")
+        with pytest.raises(RuntimeError):
+            AgentServer(session, path)
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert send(['list-teams'], path, out=io.BytesIO()) is None
+
+
+def test_remote_does_not_import_requests():
+    """Test that the thin client stays free of the heavy imports."""
+    code = "import sys; import src.remote; print('requests' in sys.modules)"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True,
+                            text=True)
+    assert result.stdout.strip() == "False"
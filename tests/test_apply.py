@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from benchmarks.mock_server import MockClickUpServer, MockConfig
+from src.apply import (Change, ManifestError, TeamSpec, apply_changes, diff_spaces,
+                       load_manifest, parse_manifest, plan)
+from src.clickup_client import ClickUpClient
+
+CURRENT = [{"id": "1", "name": "Engineering"}, {"id": "2", "name": "Mktg"},
+           {"id": "3", "name": "Old"}]
+
+
+def test_parse_manifest():
+    """Test both the short and the long team forms."""
+    specs = parse_manifest({"teams": {
+        "10": ["Engineering"],
+        20: {"prune": True, "spaces": [{"name": "Marketing", "id": 2}]},
+    }})
+    assert specs == [TeamSpec("10", [{"name": "Engineering"}]),
+                     TeamSpec("20", [{"name": "Marketing", "id": "2"}], prune=True)]
+
+
+@pytest.mark.parametrize("data", [
+    [], {"teams": []}, {"teams": {"1": {"spaces": "x"}}},
+    {"teams": {"1": [{"id": "2"}]}}, {"teams": {"1": ["A", "A"]}},
+])
+def test_parse_manifest_errors(data):
+    """Test that malformed manifests are rejected."""
+    with pytest.raises(ManifestError):
+        parse_manifest(data)
+
+
+def test_load_manifest_yaml_and_json(tmp_path):
+    """Test reading manifests in both formats."""
+    pytest.importorskip("yaml")
+    yaml_path = tmp_path / "spaces.yaml"
+    yaml_path.write_text("teams:\n  '10':\n    - Engineering\n")
+    json_path = tmp_path / "spaces.json"
+    json_path.write_text(json.dumps({"teams": {"10": ["Engineering"]}}))
+    assert load_manifest(str(yaml_path)) == load_manifest(str(json_path))
+
+
+def test_diff_no_changes():
+    """Test that a manifest matching the workspace plans nothing."""
+    spec = TeamSpec("10", [{"name": "Engineering"}, {"name": "Mktg"}, {"name": "Old"}])
+    assert diff_spaces(spec, CURRENT) == []
+
+
+def test_diff_create_rename_prune():
+    """Test creations, renames by ID and pruning."""
+    spec = TeamSpec("10", [{"name": "Engineering"}, {"name": "Marketing", "id": "2"},
+                           {"name": "Sales"}], prune=True)
+    assert diff_spaces(spec, CURRENT) == [
+        Change('update-space', "10", "Marketing", space_id="2", old_name="Mktg"),
+        Change('create-space', "10", "Sales"),
+        Change('delete-space', "10", "Old", space_id="3"),
+    ]
+
+
+def test_diff_keeps_unlisted_spaces_without_prune():
+    """Test that unlisted spaces survive unless pruning is asked for."""
+    spec = TeamSpec("10", [{"name": "Engineering"}])
+    assert diff_spaces(spec, CURRENT) == []
+    assert len(diff_spaces(spec, CURRENT, prune=True)) == 2
+
+
+def test_diff_unknown_id():
+    """Test that renaming a missing space is an error."""
+    with pytest.raises(ManifestError):
+        diff_spaces(TeamSpec("10", [{"name": "X", "id": "99"}]), CURRENT)
+
+
+def test_plan_and_apply_against_server():
+    """Test that reconciling costs one listing per team plus the changes."""
+    config = MockConfig(teams=3, spaces_per_team=2)
+    with MockClickUpServer(config) as server:
+        client = ClickUpClient(api_token="test_token", base_url=server.url)
+        specs = parse_manifest({"teams": {
+            "1": ["Space 1_0", "Space 1_1", "New"],
+            "2": {"prune": True, "spaces": ["Space 2_0"]},
+            "3": ["Space 3_0", {"name": "Renamed", "id": "3_1"}],
+        }})
+        changes = plan(client, specs)
+        assert server.requests == 3
+        assert [change.op for change in changes] == ['create-space', 'delete-space',
+                                                    'update-space']
+
+        records = apply_changes(client, changes)
+        assert all(record['ok'] for record in records)
+        assert server.requests == 6
+        assert plan(client, specs) == []
+        client.close()
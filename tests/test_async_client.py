@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from benchmarks.mock_server import MockClickUpServer, MockConfig
+from src.async_client import TASKS_PER_BATCH, AsyncClickUpClient
+from src.clickup_client import ClickUpClient
+
+
+@pytest.fixture
+def client():
+    """Fixture for AsyncClickUpClient."""
+    async_client = AsyncClickUpClient(api_token="test_token", max_concurrency=4)
+    yield async_client
+    async_client.close()
+
+
+def test_get_spaces(client, mocker):
+    """Test getting spaces for a team through the async client."""
+    mocker.patch.object(client.client, "get_spaces",
+                        return_value={"spaces": [{"id": "123", "name": "Test Space"}]})
+
+    spaces = asyncio.run(client.get_spaces("test_team"))
+
+    assert spaces["spaces"][0]["name"] == "Test Space"
+    client.client.get_spaces.assert_called_with("test_team")
+
+
+def test_create_space(client, mocker):
+    """Test creating a space through the async client."""
+    mocker.patch.object(client.client, "create_space",
+                        return_value={"id": "456", "name": "New Space"})
+
+    new_space = asyncio.run(client.create_space("test_team", "New Space"))
+
+    assert new_space["name"] == "New Space"
+    client.client.create_space.assert_called_with("test_team", "New Space")
+
+
+def test_get_inventory(client, mocker):
+    """Test fetching every team with its spaces."""
+    mocker.patch.object(client.client, "get_teams", return_value={
+        "teams": [{"id": "1", "name": "A"}, {"id": "2", "name": "B"}]})
+    mocker.patch.object(client.client, "get_spaces", side_effect=lambda team_id: {
+        "spaces": [{"id": f"s{team_id}", "name": f"Space {team_id}"}]})
+
+    inventory = asyncio.run(client.get_inventory())
+
+    assert [team["id"] for team in inventory] == ["1", "2"]
+    assert inventory[1]["spaces"] == [{"id": "s2", "name": "Space 2"}]
+
+
+def test_concurrency_is_bounded(client, mocker):
+    """Test that no more than max_concurrency requests run at once."""
+    lock = threading.Lock()
+    state = {"current": 0, "peak": 0}
+
+    def slow_get_spaces(team_id):
+        with lock:
+            state["current"] += 1
+            state["peak"] = max(state["peak"], state["current"])
+        time.sleep(0.02)
+        with lock:
+            state["current"] -= 1
+        return {"spaces": []}
+
+    mocker.patch.object(client.client, "get_spaces", side_effect=slow_get_spaces)
+
+    results = asyncio.run(client.get_spaces_for_teams(str(i) for i in range(12)))
+
+    assert len(results) == 12
+    assert state["peak"] == 4
+
+
+def test_iter_tasks_streams_pages(mocker):
+    """Test that task pages are streamed by the shared client and handed over in batches."""
+    config = MockConfig(teams=1, spaces_per_team=1, folders_per_space=1, lists_per_folder=1,
+                        folderless_lists=0, tasks_per_list=250, latency=0, jitter=0)
+
+    async def collect(client):
+        return [task["id"] async for task in client.iter_tasks("1_0_0_0")]
+
+    with MockClickUpServer(config) as server:
+        sync_client = ClickUpClient("test_token", base_url=server.url)
+        expected = [task["id"] for task in sync_client.iter_tasks("1_0_0_0")]
+        stream = mocker.patch.object(sync_client, "_stream", wraps=sync_client._stream)
+        client = AsyncClickUpClient("test_token", client=sync_client)
+        try:
+            assert asyncio.run(collect(client)) == expected
+        finally:
+            client.close()
+            sync_client.close()
+    assert len(expected) == 250 > TASKS_PER_BATCH
+    assert stream.call_count == 3
+
+
+def test_invalid_concurrency():
+    """Test that a concurrency cap below one is rejected."""
+    with pytest.raises(ValueError):
+        AsyncClickUpClient(api_token="test_token", max_concurrency=0)
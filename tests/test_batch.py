@@ -0,0 +1,100 @@
+import io
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from requests.exceptions import HTTPError
+
+from src.batch import detect_format, load_completed, read_operations, run_batch
+
+
+@pytest.fixture
+def client():
+    """Fixture for a mocked ClickUpClient."""
+    mock = MagicMock()
+    mock.create_space.side_effect = lambda team_id, name: {"id": "1", "name": name}
+    mock.update_space.side_effect = lambda space_id, name: {"id": space_id, "name": name}
+    mock.delete_space.return_value = {}
+    return mock
+
+
+def results_of(output):
+    """Parses JSONL results, ordered by input line."""
+    return sorted((json.loads(line) for line in output.getvalue().splitlines()),
+                  key=lambda record: record["line"])
+
+
+def test_read_jsonl_operations():
+    """Test that JSONL lines are numbered, skipping blank lines."""
+    stream = io.StringIO('{"op": "delete-space", "space_id": "1"}\n\n{"op": "list-teams"}\n')
+
+    assert list(read_operations(stream)) == [
+        (1, {"op": "delete-space", "space_id": "1"}),
+        (2, {"op": "list-teams"}),
+    ]
+
+
+def test_read_csv_operations():
+    """Test that CSV rows become operations without empty columns."""
+    stream = io.StringIO("op,team_id,space_id,name\ncreate-space,9,,Docs\n")
+
+    assert list(read_operations(stream, "csv")) == [
+        (1, {"op": "create-space", "team_id": "9", "name": "Docs"})]
+    assert detect_format("ops.CSV") == "csv"
+    assert detect_format("ops.jsonl") == "jsonl"
+
+
+def test_run_batch_writes_a_result_per_line(client):
+    """Test that every operation produces a streamed result record."""
+    operations = [
+        (1, {"op": "create-space", "team_id": "9", "name": "Docs"}),
+        (2, {"op": "update-space", "space_id": "5", "name": "Renamed"}),
+        (3, {"op": "delete-space", "space_id": "6"}),
+    ]
+    output = io.StringIO()
+
+    summary = run_batch(client, operations, output, workers=2)
+
+    assert summary == {"succeeded": 3, "failed": 0, "skipped": 0}
+    assert [record["result"] for record in results_of(output)] == [
+        {"id": "1", "name": "Docs"}, {"id": "5", "name": "Renamed"}, {}]
+    client.delete_space.assert_called_once_with("6")
+
+
+def test_run_batch_reports_errors(client):
+    """Test that failures are recorded per line without stopping the batch."""
+    error_response = MagicMock(status_code=404, text='{"err": "Space not found"}')
+    client.delete_space.side_effect = HTTPError(response=error_response)
+    operations = [
+        (1, {"op": "delete-space", "space_id": "6"}),
+        (2, {"op": "create-space", "team_id": "9"}),
+        (3, {"op": "rename-everything"}),
+        (4, {"op": "create-space", "team_id": "9", "name": "Docs"}),
+    ]
+    output = io.StringIO()
+
+    summary = run_batch(client, operations, output)
+
+    records = results_of(output)
+    assert summary == {"succeeded": 1, "failed": 3, "skipped": 0}
+    assert records[0]["status"] == 404
+    assert records[1]["error"] == "Missing field: name"
+    assert records[2]["error"] == "Unknown operation: 'rename-everything'"
+    assert records[3]["ok"] is True
+
+
+def test_resume_skips_completed_lines(client, tmp_path):
+    """Test that lines recorded as successful are not run again."""
+    results = tmp_path / "results.jsonl"
+    results.write_text(
+        '{"line": 1, "op": "delete-space", "ok": true, "result": {}}\n'
+        '{"line": 2, "op": "delete-space", "ok": false, "error": "boom"}\n'
+        '{"line": 3, "op": "del')
+    operations = [(n, {"op": "delete-space", "space_id": str(n)}) for n in (1, 2, 3)]
+
+    completed = load_completed(str(results))
+    summary = run_batch(client, operations, io.StringIO(), skip=completed)
+
+    assert completed == {1}
+    assert summary == {"succeeded": 2, "failed": 0, "skipped": 1}
+    assert sorted(call.args[0] for call in client.delete_space.call_args_list) == ["2", "3"]
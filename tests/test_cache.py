@@ -0,0 +1,132 @@
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.cache import ResponseCache
+from src.clickup_client import ClickUpClient
+
+
+class FakeClock:
+    """A manually advanced wall clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_response(body=b'{"id": "123", "name": "Test Space"}', status_code=200,
+                  headers=None):
+    """Builds a mock response carrying a raw JSON body."""
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.content = body
+    response.json.side_effect = lambda: json.loads(body)
+    return response
+
+
+@pytest.fixture
+def clock():
+    """Fixture for a fake clock."""
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    """Fixture for a ResponseCache in a temporary directory."""
+    response_cache = ResponseCache(str(tmp_path / "cache.sqlite"), clock=clock)
+    yield response_cache
+    response_cache.close()
+
+
+@pytest.fixture
+def client(cache):
+    """Fixture for a ClickUpClient using the cache."""
+    return ClickUpClient(api_token="test_token", cache=cache)
+
+
+def test_fresh_entry_is_served_from_cache(client, mocker):
+    """Test that a second read within the TTL does not hit the network."""
+    mocker.patch.object(client.session, "get", return_value=make_response())
+
+    first = client.get_space("123")
+    second = client.get_space("123")
+
+    assert first == second == {"id": "123", "name": "Test Space"}
+    assert client.session.get.call_count == 1
+
+
+def test_stale_entry_is_revalidated_with_etag(client, clock, mocker):
+    """Test that a stale entry sends If-None-Match and reuses the body on 304."""
+    mocker.patch.object(client.session, "get", side_effect=[
+        make_response(headers={"ETag": '"v1"'}),
+        make_response(body=b"", status_code=304),
+    ])
+
+    client.get_space("123")
+    clock.now += 301
+    space = client.get_space("123")
+
+    assert space["name"] == "Test Space"
+    client.session.get.assert_called_with(
+        f"{client.base_url}space/123", timeout=client.timeout,
+        headers={"If-None-Match": '"v1"'})
+    assert client.cache.get("space/123").fresh
+
+
+def test_ttl_is_per_endpoint(cache):
+    """Test that team listings live longer than space details."""
+    assert cache.ttl_for("team") == 3600.0
+    assert cache.ttl_for("space/{id}") == 300.0
+    assert cache.ttl_for("list/{id}") == cache.default_ttl
+
+
+def test_mutations_invalidate_affected_entries(client, mocker):
+    """Test that create and update drop the listings and details they change."""
+    mocker.patch.object(client.session, "get", side_effect=lambda url, **kwargs: make_response(
+        body=b'{"spaces": []}' if url.endswith("/space") else b'{"id": "123"}'))
+    mocker.patch.object(client.session, "post", return_value=make_response())
+    mocker.patch.object(client.session, "put", return_value=make_response())
+    client.get_spaces("team_a")
+    client.get_spaces("team_b")
+    client.get_space("123")
+
+    client.create_space("team_a", "New Space")
+    assert client.cache.get("team/team_a/space") is None
+    assert client.cache.get("team/team_b/space") is not None
+
+    client.update_space("123", "Renamed")
+    assert client.cache.get("space/123") is None
+    assert client.cache.get("team/team_b/space") is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    """Test that the cache stays within max_entries, dropping the oldest use."""
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), max_entries=2, clock=clock)
+    cache.set("space/1", "space/{id}", b"1")
+    clock.now += 1
+    cache.set("space/2", "space/{id}", b"2")
+    clock.now += 1
+    cache.get("space/1")
+    clock.now += 1
+    cache.set("space/3", "space/{id}", b"3")
+
+    assert len(cache) == 2
+    assert cache.get("space/2") is None
+    assert cache.get("space/1").body == b"1"
+    cache.close()
+
+
+def test_cache_persists_between_instances(tmp_path):
+    """Test that entries survive reopening the database."""
+    path = str(tmp_path / "cache.sqlite")
+    first = ResponseCache(path)
+    first.set("team", "team", b'{"teams": []}')
+    first.close()
+
+    second = ResponseCache(path)
+    assert second.get("team").body == b'{"teams": []}'
+    second.close()
@@ -0,0 +1,131 @@
+import gzip
+import sys
+import time
+
+import pytest
+import requests
+
+from benchmarks.mock_server import MockClickUpServer, MockConfig
+from src.cassette import FaultInjectingTransport, cassette
+from src.clickup_client import ClickUpClient
+from src.main import main
+from src.rate_limit import RateLimitScheduler
+from src.transport import RecordingTransport, ReplayTransport, Transport
+
+CONFIG = MockConfig(teams=2, spaces_per_team=30, folders_per_space=1, lists_per_folder=1,
+                    folderless_lists=0, tasks_per_list=120, latency=0, jitter=0,
+                    payload_bytes=256)
+COMMANDS = [["list-teams"], ["list-spaces", "1"], ["--output", "json", "list-spaces", "2"],
+            ["get-space", "1_3"]]
+
+
+def run(argv, capsys) -> str:
+    sys.argv = ["main.py", *argv]
+    main()
+    return capsys.readouterr().out
+
+
+@pytest.fixture(scope="module")
+def recorded(tmp_path_factory):
+    """Records a gzipped cassette of a client session against the mock server."""
+    path = str(tmp_path_factory.mktemp("cassettes") / "session.jsonl.gz")
+    with MockClickUpServer(CONFIG) as server:
+        client = ClickUpClient("test_token", base_url=server.url, transport=cassette(path))
+        spaces = client.get_spaces("1")
+        tasks = list(client.iter_tasks("1_0_0_0"))
+        client.close()
+    return path, server.url, spaces, tasks
+
+
+def test_cli_replays_recorded_session(tmp_path, monkeypatch, capsys):
+    """Test that CLI commands replay from a cassette with the same output and no server."""
+    monkeypatch.setenv("CLICKUP_API_TOKEN", "test_token")
+    path = str(tmp_path / "cli.jsonl.gz")
+    with MockClickUpServer(CONFIG) as server:
+        live = [run(["--base-url", server.url, "--record", path, *command], capsys)
+                for command in COMMANDS]
+    assert "- Name: Space 1_29, ID: 1_29" in live[1]
+
+    monkeypatch.delenv("CLICKUP_API_TOKEN")
+    replayed = [run(["--base-url", server.url, "--replay", path, *command], capsys)
+                for command in COMMANDS]
+    assert replayed == live
+    slowed = run(["--base-url", server.url, "--replay", path, "--inject-latency", "0.01",
+                  *COMMANDS[1]], capsys)
+    assert slowed == live[1]
+
+
+def test_cassette_is_compact(recorded):
+    """Test that cassettes ending in .gz are compressed JSONL."""
+    path = recorded[0]
+    with open(path, "rb") as stream:
+        compressed = stream.read()
+    assert compressed[:2] == b"\x1f\x8b"
+    assert len(compressed) * 5 < len(gzip.decompress(compressed))
+
+
+def test_cassette_is_one_gzip_stream(tmp_path):
+    """Test that a recording compresses as well as gzipping its content in one go."""
+    path = str(tmp_path / "session.jsonl.gz")
+    with MockClickUpServer(CONFIG) as server:
+        client = ClickUpClient("test_token", base_url=server.url, transport=cassette(path))
+        for space_id in ("1_0", "1_1", "1_2", "2_0", "2_1"):
+            client.get_space(space_id)
+        client.get_spaces("1")
+        client.close()
+    with open(path, "rb") as stream:
+        compressed = stream.read()
+    content = gzip.decompress(compressed)
+    assert content.count(b"\n") == 6
+    assert len(compressed) < len(gzip.compress(content)) * 1.1
+
+
+def test_record_once(recorded, tmp_path):
+    """Test that an existing cassette is replayed, at memory speed, unless recording again."""
+    path, url, spaces, tasks = recorded
+    transport = cassette(path)
+    assert isinstance(transport, ReplayTransport)
+    client = ClickUpClient("test_token", base_url=url, transport=transport,
+                           scheduler=RateLimitScheduler(requests_per_minute=10 ** 9))
+    assert client.get_spaces("1") == spaces
+    assert list(client.iter_tasks("1_0_0_0")) == tasks
+    started = time.perf_counter()
+    for _ in range(500):
+        client.get_spaces("1")
+    assert time.perf_counter() - started < 2
+    again = tmp_path / "again.jsonl.gz"
+    again.write_bytes(b"stale")
+    assert isinstance(cassette(str(again), record="all"), RecordingTransport)
+    assert not again.exists()
+    with pytest.raises(ValueError):
+        cassette(path, record="sometimes")
+
+
+def test_injected_faults_are_retried(recorded):
+    """Test that injected 503s and resets go through the client's retries."""
+    path, url, spaces, _ = recorded
+    faulty = FaultInjectingTransport(ReplayTransport(path), error_rate=0.4,
+                                     faults=("503", "reset"), seed=7)
+    scheduler = RateLimitScheduler(requests_per_minute=10 ** 9, max_retries=10,
+                                   sleep=lambda seconds: None)
+    client = ClickUpClient("test_token", base_url=url, transport=faulty, scheduler=scheduler,
+                           coalesce=False)
+    assert all(client.get_spaces("1") == spaces for _ in range(20))
+    assert faulty.injected > 0 and scheduler.stats.retried == faulty.injected
+
+
+def test_injected_latency():
+    """Test that injected latency delays requests and times out past the timeout."""
+    waits = []
+
+    class Answer(Transport):
+        def send(self, method, url, timeout, **kwargs):
+            return "response"
+
+    transport = FaultInjectingTransport(Answer(), latency=0.5, sleep=waits.append)
+    assert transport.send("GET", "http://x/team", 1.0) == "response"
+    with pytest.raises(requests.Timeout):
+        transport.send("GET", "http://x/team", 0.2)
+    assert waits == [0.5, 0.2]
+    with pytest.raises(ValueError):
+        FaultInjectingTransport(Answer(), faults=("418",))
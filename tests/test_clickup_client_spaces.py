@@ -1,10 +1,13 @@
 
+import json
 from unittest.mock import MagicMock
 
 import pytest
 import requests
 
+from src import jsonio
 from src.clickup_client import ClickUpClient
+from src.rate_limit import RateLimitScheduler
 
 
 @pytest.fixture
@@ -16,8 +19,8 @@ def client():
 def test_get_spaces(client, mocker):
     """Test getting spaces for a team."""
     mock_response = MagicMock()
-    mock_response.json.return_value = {
-        "spaces": [{"id": "123", "name": "Test Space"}]}
+    mock_response.content = json.dumps({
+        "spaces": [{"id": "123", "name": "Test Space"}]}).encode()
     mock_response.raise_for_status.return_value = None
     mocker.patch.object(client.session, "get", return_value=mock_response)
 
@@ -31,7 +34,7 @@ def test_get_spaces(client, mocker):
 def test_get_space(client, mocker):
     """Test getting a single space."""
     mock_response = MagicMock()
-    mock_response.json.return_value = {"id": "123", "name": "Test Space"}
+    mock_response.content = json.dumps({"id": "123", "name": "Test Space"}).encode()
     mock_response.raise_for_status.return_value = None
     mocker.patch.object(client.session, "get", return_value=mock_response)
 
@@ -45,7 +48,7 @@ def test_get_space(client, mocker):
 def test_create_space(client, mocker):
     """Test creating a space."""
     mock_response = MagicMock()
-    mock_response.json.return_value = {"id": "456", "name": "New Space"}
+    mock_response.content = json.dumps({"id": "456", "name": "New Space"}).encode()
     mock_response.raise_for_status.return_value = None
     mocker.patch.object(client.session, "post", return_value=mock_response)
 
@@ -62,7 +65,7 @@ def test_create_space(client, mocker):
 def test_update_space(client, mocker):
     """Test updating a space."""
     mock_response = MagicMock()
-    mock_response.json.return_value = {"id": "123", "name": "Updated Space"}
+    mock_response.content = json.dumps({"id": "123", "name": "Updated Space"}).encode()
     mock_response.raise_for_status.return_value = None
     mocker.patch.object(client.session, "put", return_value=mock_response)
 
@@ -79,7 +82,7 @@ def test_update_space(client, mocker):
 def test_delete_space(client, mocker):
     """Test deleting a space."""
     mock_response = MagicMock()
-    mock_response.json.return_value = {}
+    mock_response.content = json.dumps({}).encode()
     mock_response.raise_for_status.return_value = None
     mocker.patch.object(client.session, "delete", return_value=mock_response)
 
@@ -90,6 +93,18 @@ def test_delete_space(client, mocker):
         f"{client.base_url}space/123", timeout=client.timeout)
 
 
+def test_reads_decode_with_the_jsonio_backend(client, mocker):
+    """Test that non-streamed responses are decoded by the selected jsonio backend."""
+    mock_response = MagicMock()
+    mock_response.content = b'{"id": "123", "name": "Test Space"}'
+    mocker.patch.object(client.session, "get", return_value=mock_response)
+    loads = mocker.patch.object(jsonio, "loads", wraps=jsonio.loads)
+
+    assert client.get_space(space_id="123")["name"] == "Test Space"
+    loads.assert_called_once_with(mock_response.content)
+    mock_response.json.assert_not_called()
+
+
 def test_api_error(client, mocker):
     """Test that API errors are raised."""
     mocker.patch.object(client.session, "get",
@@ -97,3 +112,54 @@ def test_api_error(client, mocker):
 
     with pytest.raises(requests.exceptions.HTTPError):
         client.get_spaces(team_id="test_team")
+
+
+def test_rate_limited_request_is_retried(mocker):
+    """Test that a 429 response is retried by the scheduler."""
+    client = ClickUpClient(api_token="test_token",
+                           scheduler=RateLimitScheduler(sleep=lambda seconds: None))
+    limited = MagicMock(status_code=429, headers={"Retry-After": "1"})
+    ok = MagicMock(status_code=200, headers={})
+    ok.content = json.dumps({"id": "123", "name": "Test Space"}).encode()
+    mocker.patch.object(client.session, "get", side_effect=[limited, ok])
+
+    space = client.get_space(space_id="123")
+
+    assert space["name"] == "Test Space"
+    assert client.session.get.call_count == 2
+    assert client.scheduler.stats.retried == 1
+
+
+def test_iter_tasks_follows_pages(client, mocker):
+    """Test that task iteration requests pages until the last one."""
+    pages = [
+        b'{"tasks": [{"id": "a"}, {"id": "b"}], "last_page": false}',
+        b'{"tasks": [{"id": "c"}], "last_page": true}',
+    ]
+    responses = []
+    for page in pages:
+        response = MagicMock()
+        response.iter_content.return_value = [page[:10], page[10:]]
+        responses.append(response)
+    mocker.patch.object(client.session, "get", side_effect=responses)
+
+    tasks = list(client.iter_tasks("list_1", include_closed=True))
+
+    assert [task["id"] for task in tasks] == ["a", "b", "c"]
+    client.session.get.assert_called_with(
+        f"{client.base_url}list/list_1/task", timeout=client.timeout, stream=True,
+        params={"include_closed": "true", "page": 1})
+    assert all(response.close.called for response in responses)
+
+
+def test_iter_spaces_streams_items(client, mocker):
+    """Test that spaces are decoded one at a time from a streamed body."""
+    response = MagicMock()
+    response.iter_content.return_value = [
+        b'{"spaces": [{"id": "1", "name": "A"},', b' {"id": "2", "name": "B"}]}']
+    mocker.patch.object(client.session, "get", return_value=response)
+
+    spaces = client.iter_spaces("test_team")
+
+    assert next(spaces) == {"id": "1", "name": "A"}
+    assert [space["id"] for space in spaces] == ["2"]
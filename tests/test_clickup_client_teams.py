@@ -1,4 +1,5 @@
 
+import json
 from unittest.mock import MagicMock
 
 import pytest
@@ -15,8 +16,8 @@ def client():
 def test_get_teams(client, mocker):
     """Test getting teams."""
     mock_response = MagicMock()
-    mock_response.json.return_value = {
-        "teams": [{"id": "123", "name": "Test Team"}]}
+    mock_response.content = json.dumps({
+        "teams": [{"id": "123", "name": "Test Team"}]}).encode()
     mock_response.raise_for_status.return_value = None
     mocker.patch.object(client.session, "get", return_value=mock_response)
 
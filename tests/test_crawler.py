@@ -0,0 +1,82 @@
+import asyncio
+import io
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.async_client import AsyncClickUpClient
+from src.crawler import Crawler, JsonlSink, crawl_to_file
+
+
+@pytest.fixture
+def client():
+    """Fixture for an async client over a mocked workspace."""
+    sync_client = MagicMock()
+    sync_client.get_teams.return_value = {"teams": [{"id": "t1"}, {"id": "t2"}]}
+    sync_client.get_spaces.side_effect = lambda team_id: {
+        "spaces": [{"id": f"{team_id}-s"}]}
+    sync_client.get_folders.side_effect = lambda space_id: {"folders": [
+        {"id": f"{space_id}-f1", "lists": [{"id": f"{space_id}-f1-l"}]},
+        {"id": f"{space_id}-f2"},
+    ]}
+    sync_client.get_folderless_lists.side_effect = lambda space_id: {
+        "lists": [{"id": f"{space_id}-l"}]}
+    sync_client.get_lists.side_effect = lambda folder_id: {
+        "lists": [{"id": f"{folder_id}-l"}]}
+
+    def iter_tasks(list_id, **params):
+        yield {"id": f"{list_id}-a"}
+        yield {"id": f"{list_id}-b"}
+
+    sync_client.iter_tasks.side_effect = iter_tasks
+    async_client = AsyncClickUpClient(api_token="test_token", max_concurrency=4,
+                                      client=sync_client)
+    yield async_client
+    async_client.close()
+
+
+def test_crawl_walks_every_level(client):
+    """Test that every object of the hierarchy is written once with its parent."""
+    stream = io.StringIO()
+    sink = JsonlSink(stream)
+
+    counts = asyncio.run(Crawler(client, sink).crawl())
+
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert counts == {"team": 2, "space": 2, "folder": 4, "list": 6, "task": 12}
+    assert {"type": "list", "parent_id": "t1-s-f1", "data": {"id": "t1-s-f1-l"}} in records
+    folder = next(r for r in records if r["data"]["id"] == "t1-s-f1")
+    assert "lists" not in folder["data"]
+
+
+def test_crawl_only_expands_folders_without_embedded_lists(client):
+    """Test that folders with embedded lists cost no extra request."""
+    asyncio.run(Crawler(client, JsonlSink(io.StringIO()), include_tasks=False).crawl())
+
+    called = sorted(call.args[0] for call in client.client.get_lists.call_args_list)
+    assert called == ["t1-s-f2", "t2-s-f2"]
+    client.client.iter_tasks.assert_not_called()
+
+
+def test_crawl_filters_teams_and_passes_task_filters(client):
+    """Test restricting the crawl to one team with task filters."""
+    sink = JsonlSink(io.StringIO())
+
+    asyncio.run(Crawler(client, sink, task_filters={"include_closed": True}).crawl(["t2"]))
+
+    assert sink.counts["team"] == 1
+    client.client.get_spaces.assert_called_once_with("t2")
+    client.client.iter_tasks.assert_any_call("t2-s-l", include_closed=True)
+
+
+def test_crawl_to_file_reports_throughput(client, tmp_path):
+    """Test that the file crawl reports counts and objects per second."""
+    path = tmp_path / "snapshot.jsonl"
+
+    stats = crawl_to_file(client, str(path), include_tasks=False)
+
+    assert stats["total"] == 14
+    assert stats["counts"]["task"] == 0
+    assert stats["objects_per_second"] > 0
+    assert len(path.read_text().splitlines()) == 14
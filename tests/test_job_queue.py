@@ -0,0 +1,149 @@
+import json
+import sys
+
+import pytest
+import requests
+
+from benchmarks.mock_server import MockClickUpServer, MockConfig
+from src.clickup_client import ClickUpClient
+from src.job_queue import JobQueue, idempotency_key, run_job
+from src.main import main
+
+CONFIG = MockConfig(teams=1, spaces_per_team=3, folders_per_space=0, lists_per_folder=0,
+                    folderless_lists=0, tasks_per_list=0, latency=0, jitter=0, payload_bytes=0)
+OPERATIONS = [
+    {"op": "create-space", "team_id": "1", "name": "Migrated"},
+    {"op": "update-space", "space_id": "1_0", "name": "Renamed"},
+    {"op": "delete-space", "space_id": "1_1"},
+]
+
+
+def numbered(operations):
+    return list(enumerate(operations, start=1))
+
+
+@pytest.fixture
+def server():
+    with MockClickUpServer(CONFIG) as server:
+        yield server
+
+
+def space_names(server):
+    return sorted(space["name"] for space in server.workspace.spaces("1"))
+
+
+def test_enqueue_deduplicates(tmp_path):
+    """Test that operations are queued once per idempotency key and reads are refused."""
+    with JobQueue(str(tmp_path / "queue.sqlite")) as queue:
+        assert queue.enqueue(numbered(OPERATIONS)) == {"added": 3, "duplicates": 0, "invalid": 0}
+        again = OPERATIONS + [{"op": "list-teams"},
+                              {"op": "delete-space", "space_id": "1_1", "key": "twice"}]
+        assert queue.enqueue(numbered(again), chunk_size=2) == {
+            "added": 1, "duplicates": 3, "invalid": 1}
+        assert queue.counts() == {"pending": 4, "running": 0, "done": 0, "failed": 1}
+        [failure] = queue.failures()
+        assert "Not a queueable operation" in failure["error"]
+    assert idempotency_key({"op": "x", "a": 1, "b": 2}) == idempotency_key({"b": 2, "a": 1, "op": "x"})
+
+
+def test_enqueue_rejects_missing_fields(tmp_path):
+    """Test that operations missing a required field are refused when queued, not when run."""
+    with JobQueue(str(tmp_path / "queue.sqlite")) as queue:
+        summary = queue.enqueue(numbered([{"op": "update-space", "space_id": "1_0"},
+                                          {"op": "delete-space"}]))
+        assert summary == {"added": 0, "duplicates": 0, "invalid": 2}
+        assert sorted(failure["error"] for failure in queue.failures()) == [
+            "Missing field: name", "Missing field: space_id"]
+
+
+def test_drain(tmp_path, server):
+    """Test that draining runs every job once on parallel workers."""
+    client = ClickUpClient("test_token", base_url=server.url)
+    with JobQueue(str(tmp_path / "queue.sqlite")) as queue:
+        queue.enqueue(numbered(OPERATIONS))
+        assert queue.drain(client, workers=3) == {"done": 3, "retried": 0, "failed": 0}
+        assert queue.drain(client) == {"done": 0, "retried": 0, "failed": 0}
+        assert queue.counts()["done"] == 3
+    assert space_names(server) == ["Migrated", "Renamed", "Space 1_2"]
+    assert server.requests == 3
+
+
+def test_resume_after_crash(tmp_path, server):
+    """Test that jobs interrupted after they landed are checked, not repeated."""
+    path = str(tmp_path / "queue.sqlite")
+    client = ClickUpClient("test_token", base_url=server.url)
+    queue = JobQueue(path)
+    queue.enqueue(numbered(OPERATIONS))
+    # The process sends every job and dies before recording any outcome.
+    for job in queue.claim(10):
+        run_job(client, job)
+    queue.close()
+    requests_before = server.requests
+
+    with JobQueue(path) as queue:
+        assert queue.counts()["running"] == 3
+        assert queue.drain(client) == {"done": 3, "retried": 0, "failed": 0}
+    assert space_names(server) == ["Migrated", "Renamed", "Space 1_2"]
+    # Only the checks ran: one listing and two space lookups.
+    assert server.requests - requests_before == 3
+
+
+def test_transient_failures_are_retried(tmp_path):
+    """Test that connection failures are retried and permanent errors are not."""
+    class FlakyClient:
+        def __init__(self):
+            self.calls = 0
+
+        def delete_space(self, space_id):
+            self.calls += 1
+            if self.calls == 1:
+                raise requests.ConnectionError("reset")
+            return {}
+
+        def get_space(self, space_id):
+            return {"id": space_id}
+
+        def create_space(self, team_id, name):
+            response = requests.Response()
+            response.status_code, response._content = 400, b'{"err": "Bad name"}'
+            raise requests.HTTPError(response=response)
+
+    waits = []
+    with JobQueue(str(tmp_path / "queue.sqlite")) as queue:
+        queue.enqueue(numbered([{"op": "delete-space", "space_id": "9"},
+                                {"op": "create-space", "team_id": "1", "name": ""}]))
+        summary = queue.drain(FlakyClient(), workers=1, retry_delay=0.01, sleep=waits.append)
+        assert summary == {"done": 1, "retried": 1, "failed": 1}
+        assert queue.failures()[0]["error"].startswith("HTTP 400")
+        assert queue.retry_failed() == 1 and queue.counts()["pending"] == 1
+
+
+def test_queue_cli(tmp_path, server, monkeypatch, capsys):
+    """Test the queue enqueue, status and resume commands."""
+    monkeypatch.setenv("CLICKUP_API_TOKEN", "test_token")
+    ops = tmp_path / "ops.jsonl"
+    ops.write_text("".join(json.dumps(operation) + "\n" for operation in OPERATIONS))
+    queue = ["--base-url", server.url, "queue", "--queue", str(tmp_path / "queue.sqlite")]
+
+    sys.argv = ["main.py", *queue, "enqueue", str(ops)]
+    main()
+    assert "Queued 3 operations (0 already queued, 0 invalid)" in capsys.readouterr().out
+    sys.argv = ["main.py", *queue, "status"]
+    main()
+    assert "3 pending, 0 running, 0 done, 0 failed." in capsys.readouterr().out
+    sys.argv = ["main.py", *queue, "resume", "--workers", "2"]
+    main()
+    assert "Ran 3 jobs: 3 done, 0 failed." in capsys.readouterr().out
+    assert space_names(server) == ["Migrated", "Renamed", "Space 1_2"]
+
+
+def test_queue_cli_without_a_queue(tmp_path, monkeypatch, capsys):
+    """Test that status and a bare queue command report a missing queue without creating it."""
+    path = tmp_path / "missing.sqlite"
+    for command in (["status"], []):
+        sys.argv = ["main.py", "queue", "--queue", str(path), *command]
+        assert main() == 1
+        assert not path.exists()
+    output = capsys.readouterr().out
+    assert f"No queue at {path}." in output
+    assert "Choose a queue command" in output
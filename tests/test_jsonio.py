@@ -0,0 +1,104 @@
+import io
+import json
+
+import pytest
+
+from src import jsonio
+from src.jsonio import ArrayStream
+from src.output import write_item, write_items
+
+DOCUMENT = {
+    "before": {"tasks": ["not this one"]},
+    "tasks": [
+        {"id": "a", "name": "Brackets ]} and \"quotes\"", "tags": [{"name": "x"}]},
+        "plain string, with comma",
+        42,
+        None,
+        [1, [2, 3]],
+        {"path": "C:\\\\temp"},
+    ],
+    "last_page": True,
+}
+
+
+def chunked(data, size):
+    """Splits bytes into chunks of the given size."""
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 100_000])
+def test_array_stream_yields_items_across_chunk_boundaries(size):
+    """Test that items and the envelope survive any chunking of the body."""
+    stream = ArrayStream(chunked(json.dumps(DOCUMENT).encode(), size), "tasks")
+
+    assert list(stream) == DOCUMENT["tasks"]
+    assert stream.count == len(DOCUMENT["tasks"])
+    assert stream.envelope == {**DOCUMENT, "tasks": []}
+
+
+def test_array_stream_is_lazy():
+    """Test that items are produced before the rest of the body is read."""
+    def chunks():
+        yield b'{"spaces": [{"id": "1"}, '
+        raise AssertionError("read too far")
+
+    assert next(iter(ArrayStream(chunks(), "spaces"))) == {"id": "1"}
+
+
+def test_array_stream_without_the_key():
+    """Test that a body without the array yields nothing and keeps the body."""
+    stream = ArrayStream([b'{"err": "Team not found"}'], "spaces")
+
+    assert list(stream) == []
+    assert stream.envelope == {"err": "Team not found"}
+
+
+def test_array_stream_from_document():
+    """Test wrapping an already decoded document."""
+    stream = ArrayStream.from_document({"spaces": [{"id": "1"}], "extra": 1}, "spaces")
+
+    assert list(stream) == [{"id": "1"}]
+    assert stream.envelope == {"spaces": [], "extra": 1}
+
+
+def test_backend_selection():
+    """Test switching between JSON backends."""
+    original = jsonio.get_backend()
+    try:
+        jsonio.set_backend("json")
+        assert jsonio.loads(b'{"a": 1}') == {"a": 1}
+        assert jsonio.dumps({"a": "é"}) == '{"a":"é"}'
+        with pytest.raises(ValueError):
+            jsonio.set_backend("simdjson-but-missing")
+    finally:
+        jsonio.set_backend(original)
+
+
+@pytest.mark.parametrize("fmt, expected", [
+    ("table", "Spaces:\n- Name: A, ID: 1\n- Name: B, ID: 2\n"),
+    ("jsonl", '{"id":"1","name":"A"}\n{"id":"2","name":"B"}\n'),
+    ("json", '[\n{"id":"1","name":"A"},\n{"id":"2","name":"B"}\n]\n'),
+])
+def test_write_items(fmt, expected):
+    """Test the three listing formats."""
+    out = io.StringIO()
+
+    count = write_items(iter([{"id": "1", "name": "A"}, {"id": "2", "name": "B"}]),
+                        fmt, title="Spaces:", out=out)
+
+    assert count == 2
+    assert out.getvalue() == expected
+
+
+def test_write_items_empty_json_array():
+    """Test that an empty listing is still valid JSON."""
+    out = io.StringIO()
+    write_items(iter([]), "json", out=out)
+    assert json.loads(out.getvalue()) == []
+
+
+def test_write_item_table():
+    """Test that a single object is shown as field lines."""
+    out = io.StringIO()
+    write_item({"id": "1", "features": {"due_dates": True}}, "table", title="Space:", out=out)
+    assert out.getvalue() == 'Space:\n  id: 1\n  features: {"due_dates":true}\n'
@@ -0,0 +1,109 @@
+import json
+import logging
+import threading
+import time
+
+from benchmarks.mock_server import MockClickUpServer, MockConfig
+from src import logs
+from src.clickup_client import ClickUpClient
+
+CONFIG = MockConfig(teams=1, spaces_per_team=2, folders_per_space=0, lists_per_folder=0,
+                    folderless_lists=0, tasks_per_list=0, latency=0, jitter=0, payload_bytes=0)
+
+
+def read_records(path) -> list:
+    with open(path) as stream:
+        return [json.loads(line) for line in stream]
+
+
+def test_json_records_carry_request_ids_and_timings(tmp_path):
+    """Test that client requests are logged as JSON with their request ID and duration."""
+    path = tmp_path / "agent.log"
+    logs.setup_logging(str(path), level=logging.DEBUG, fmt="json")
+    try:
+        with MockClickUpServer(CONFIG) as server:
+            client = ClickUpClient("test_token", base_url=server.url)
+            client.get_space("1_0")
+            client.get_space("1_1")
+            client.close()
+    finally:
+        logs.shutdown_logging()
+
+    attempts = [record for record in read_records(path) if "duration_ms" in record]
+    assert [record["endpoint"] for record in attempts] == ["space/{id}", "space/{id}"]
+    assert all(record["method"] == "GET" and record["status"] == 200 for record in attempts)
+    assert all(record["duration_ms"] >= 0 and record["attempt"] == 1 for record in attempts)
+    assert len({record["request_id"] for record in attempts}) == 2
+
+
+def test_context_request_id(tmp_path):
+    """Test that records logged during a request get its ID from the context."""
+    path = tmp_path / "agent.log"
+    logs.setup_logging(str(path), fmt="json")
+    token = logs.current_request_id.set("abc-1")
+    try:
+        logging.getLogger("test").warning("Retrying %s.", "space/1")
+    finally:
+        logs.current_request_id.reset(token)
+        logs.shutdown_logging()
+    [record] = read_records(path)
+    assert record["request_id"] == "abc-1" and record["message"] == "Retrying space/1."
+
+
+def test_rotation(tmp_path):
+    """Test that the log file rotates at its size limit."""
+    path = tmp_path / "agent.log"
+    logs.setup_logging(str(path), max_bytes=500, backups=2)
+    try:
+        for index in range(50):
+            logging.getLogger("test").info("Line %d of the rotation test.", index)
+    finally:
+        logs.shutdown_logging()
+    assert sorted(file.name for file in tmp_path.iterdir()) == [
+        "agent.log", "agent.log.1", "agent.log.2"]
+    assert "Line 49" in path.read_text()
+
+
+def test_logging_does_not_block(tmp_path):
+    """Test that a slow log destination does not slow down the code that logs."""
+    release = threading.Event()
+
+    class SlowHandler(logging.Handler):
+        def emit(self, record):
+            release.wait(5)
+
+    listener = logs.setup_logging(None)
+    listener.handlers += (SlowHandler(),)
+    try:
+        started = time.perf_counter()
+        for index in range(100):
+            logging.getLogger("test").warning("Record %d.", index)
+        assert time.perf_counter() - started < 0.5
+    finally:
+        release.set()
+        logs.shutdown_logging()
+
+
+def test_lazy_formatting(tmp_path):
+    """Test that filtered records are never formatted and cost little."""
+    formatted = []
+
+    class Expensive:
+        def __str__(self):
+            formatted.append(self)
+            return "expensive"
+
+    logs.setup_logging(str(tmp_path / "agent.log"))
+    try:
+        logger = logging.getLogger("test")
+        started = time.perf_counter()
+        for _ in range(10000):
+            logger.debug("Value %s.", Expensive())
+        elapsed = time.perf_counter() - started
+        assert formatted == []
+        logger.info("Value %s.", Expensive())
+    finally:
+        logs.shutdown_logging()
+    assert formatted
+    # Far below what thousands of requests per second could notice.
+    assert elapsed / 10000 < 20e-6
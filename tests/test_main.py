@@ -1,4 +1,5 @@
 
+import json
 import sys
 from unittest.mock import MagicMock, patch
 
@@ -6,6 +7,7 @@ import pytest
 
 from src.clickup_client import ClickUpClient
 from src.main import main
+from src.mirror import Mirror
 
 
 @pytest.fixture
@@ -17,6 +19,10 @@ def mock_client():
             "teams": [{"id": "123", "name": "Test Team"}]}
         instance.get_spaces.return_value = {
             "spaces": [{"id": "456", "name": "Test Space"}]}
+        instance.iter_teams.side_effect = lambda: iter(
+            instance.get_teams.return_value["teams"])
+        instance.iter_spaces.side_effect = lambda team_id: iter(
+            instance.get_spaces.return_value["spaces"])
         instance.create_space.return_value = {"id": "789", "name": "New Space"}
         instance.get_space.return_value = {"id": "456", "name": "Test Space"}
         instance.update_space.return_value = {
@@ -86,3 +92,165 @@ def test_no_api_token(mock_getenv, capsys):
     main()
     captured = capsys.readouterr()
     assert "Please configure your CLICKUP_API_TOKEN" in captured.out
+
+
+@patch('src.main.os.getenv', return_value="test_token")
+def test_cache_option(mock_getenv, mock_client, tmp_path, capsys):
+    """Test that --cache gives the client an on-disk response cache."""
+    sys.argv = ['main.py', '--cache', str(tmp_path / 'cache.sqlite'),
+                'list-spaces', '123']
+    main()
+    cache = mock_client.call_args.kwargs['cache']
+    assert cache.path == str(tmp_path / 'cache.sqlite')
+    assert "Test Space" in capsys.readouterr().out
+
+
+@patch('src.main.os.getenv', return_value="test_token")
+def test_batch(mock_getenv, mock_client, tmp_path, capsys):
+    """Test the batch command streams one result per operation."""
+    ops = tmp_path / 'ops.jsonl'
+    ops.write_text('{"op": "create-space", "team_id": "123", "name": "New Space"}\n'
+                   '{"op": "delete-space", "space_id": "456"}\n')
+    results = tmp_path / 'results.jsonl'
+    sys.argv = ['main.py', 'batch', str(ops), '--output', str(results)]
+    main()
+    captured = capsys.readouterr()
+    assert "Batch complete: 2 succeeded, 0 failed, 0 skipped." in captured.out
+    assert len(results.read_text().splitlines()) == 2
+
+
+@patch('src.main.os.getenv', return_value="test_token")
+def test_batch_adaptive(mock_getenv, mock_client, tmp_path, capsys):
+    """Test that --adaptive gives the client a limiter capped at --workers."""
+    ops = tmp_path / 'ops.jsonl'
+    ops.write_text('{"op": "delete-space", "space_id": "456"}\n')
+    sys.argv = ['main.py', 'batch', str(ops), '--workers', '16', '--adaptive']
+    main()
+    limiter = mock_client.call_args.kwargs['limiter']
+    assert limiter.max_limit == 16 and limiter.limit == 4
+    sys.argv = ['main.py', 'batch', str(ops)]
+    main()
+    assert mock_client.call_args.kwargs['limiter'] is None
+
+
+@patch('src.main.os.getenv', return_value="test_token")
+def test_apply(mock_getenv, mock_client, tmp_path, capsys):
+    """Test the apply command plans with --dry-run and then applies the changes."""
+    manifest = tmp_path / 'spaces.json'
+    manifest.write_text('{"teams": {"123": ["Test Space", "New Space"]}}')
+    sys.argv = ['main.py', 'apply', str(manifest), '--dry-run']
+    main()
+    assert "+ create space 'New Space' in team 123" in capsys.readouterr().out
+    mock_client.return_value.create_space.assert_not_called()
+
+    sys.argv = ['main.py', 'apply', str(manifest)]
+    main()
+    assert "Applied 1 of 1 changes." in capsys.readouterr().out
+    mock_client.return_value.create_space.assert_called_once_with("123", "New Space")
+
+
+@patch('src.main.os.getenv', return_value="test_token")
+def test_webhook_create(mock_getenv, mock_client, capsys):
+    """Test the webhook create command prints the new webhook's signing secret."""
+    mock_client.return_value.create_webhook.return_value = {
+        "id": "wh1", "webhook": {"id": "wh1", "endpoint": "https://example.com/hook",
+                                 "secret": "s3cret"}}
+    sys.argv = ['main.py', 'webhook', 'create', '123', 'https://example.com/hook',
+                '--event', 'taskUpdated']
+    main()
+    assert "Signing secret: s3cret" in capsys.readouterr().out
+    mock_client.return_value.create_webhook.assert_called_once_with(
+        "123", "https://example.com/hook", events=['taskUpdated'], space_id=None)
+
+
+@patch('src.main.os.getenv', return_value="test_token")
+def test_crawl(mock_getenv, mock_client, tmp_path, capsys):
+    """Test the crawl command reports objects per second."""
+    instance = mock_client.return_value
+    instance.get_folders.return_value = {"folders": []}
+    instance.get_folderless_lists.return_value = {"lists": []}
+    sys.argv = ['main.py', 'crawl', str(tmp_path / 'snapshot.jsonl')]
+    main()
+    captured = capsys.readouterr()
+    assert "Crawled 2 objects (1 teams, 1 spaces" in captured.out
+    assert "objects/sec" in captured.out
+
+
+@patch('src.main.os.getenv', return_value="test_token")
+def test_sync(mock_getenv, mock_client, tmp_path, capsys):
+    """Test the sync command reports the changes per team."""
+    mock_client.return_value.iter_team_tasks.return_value = iter(
+        [{"id": "t1", "date_updated": "1000"}])
+    sys.argv = ['main.py', '--mirror', str(tmp_path / 'mirror.sqlite'), 'sync']
+    main()
+    captured = capsys.readouterr()
+    assert "- Team 123: 1 tasks changed, 0 deleted (reconciled)" in captured.out
+
+
+@patch('src.main.os.getenv', return_value=None)
+def test_offline_reads_from_mirror(mock_getenv, mock_client, tmp_path, capsys):
+    """Test that --offline answers from the mirror without a token or client."""
+    path = str(tmp_path / 'mirror.sqlite')
+    mirror = Mirror(path)
+    mirror.replace_spaces('123', [{'id': '456', 'name': 'Mirrored Space'}])
+    mirror.close()
+    sys.argv = ['main.py', '--mirror', path, '--offline', 'list-spaces', '123']
+    main()
+    captured = capsys.readouterr()
+    assert "Mirrored Space" in captured.out
+    mock_client.assert_not_called()
+
+
+@patch('src.main.os.getenv', return_value=None)
+def test_query(mock_getenv, mock_client, tmp_path, capsys):
+    """Test the query command filters the mirror by name."""
+    path = str(tmp_path / 'mirror.sqlite')
+    mirror = Mirror(path)
+    mirror.replace_spaces('123', [{'id': '1', 'name': 'Docs'}, {'id': '2', 'name': 'Ops'}])
+    mirror.close()
+    sys.argv = ['main.py', '--mirror', path, 'query', 'space', '--name', 'doc']
+    main()
+    captured = capsys.readouterr()
+    assert "1 matching spaces in the mirror:" in captured.out
+    assert "- Name: Docs, ID: 1" in captured.out
+
+
+@patch('src.main.os.getenv', return_value=None)
+def test_query_where_matches_json_types(mock_getenv, mock_client, tmp_path, capsys):
+    """Test that --where values match numbers, booleans and strings as stored."""
+    path = str(tmp_path / 'mirror.sqlite')
+    mirror = Mirror(path)
+    mirror.replace_spaces('123', [
+        {'id': '1', 'name': 'Docs', 'private': False, 'points': 3, 'color': '3'},
+        {'id': '2', 'name': 'Ops', 'private': True, 'points': 5, 'color': None}])
+    mirror.close()
+    expected = {'private=0': 'Docs', 'private=false': 'Docs', 'private=true': 'Ops',
+                'points=3': 'Docs', 'points=5.0': 'Ops', 'color="3"': 'Docs',
+                'color=null': 'Ops', 'id=2': 'Ops'}
+    for condition, name in expected.items():
+        sys.argv = ['main.py', '--mirror', path, '--output', 'jsonl', 'query', 'space',
+                    '--where', condition]
+        main()
+        output = capsys.readouterr().out
+        assert [json.loads(line)['name'] for line in output.splitlines()] == [name], condition
+
+
+@patch('src.main.os.getenv', return_value="test_token")
+def test_jsonl_output(mock_getenv, mock_client, capsys):
+    """Test that --output jsonl prints one object per line."""
+    sys.argv = ['main.py', '--output', 'jsonl', 'list-spaces', '123']
+    main()
+    captured = capsys.readouterr()
+    assert captured.out == '{"id":"456","name":"Test Space"}\n'
+
+
+@patch('src.main.os.getenv', return_value="test_token")
+def test_metrics_out(mock_getenv, mock_client, tmp_path, capsys):
+    """Test that --metrics-out writes metrics and passes a recorder to the client."""
+    path = tmp_path / "metrics.prom"
+    sys.argv = ['main.py', '--metrics-out', str(path), '--stats', 'list-teams']
+    main()
+    captured = capsys.readouterr()
+    assert mock_client.call_args.kwargs['metrics'] is not None
+    assert path.read_text().endswith('# EOF\n')
+    assert "Endpoint" in captured.err
@@ -0,0 +1,110 @@
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.cache import ResponseCache
+from src.clickup_client import ClickUpClient, endpoint_template
+from src.metrics import Histogram, MetricsRecorder
+from src.rate_limit import RateLimitScheduler
+
+
+def _response(status=200, body=None):
+    response = MagicMock()
+    response.status_code = status
+    response.headers = {}
+    response.json.return_value = body or {}
+    response.content = json.dumps(body or {}).encode()
+    if status >= 400:
+        response.raise_for_status.side_effect = Exception(f"HTTP {status}")
+    return response
+
+
+@pytest.fixture
+def recorder():
+    """Fixture for an empty MetricsRecorder."""
+    return MetricsRecorder()
+
+
+def test_endpoint_template():
+    """Test that IDs in API paths are replaced by placeholders."""
+    assert endpoint_template("team") == "team"
+    assert endpoint_template("team/1/space") == "team/{id}/space"
+    assert endpoint_template("list/9/task?page=2") == "list/{id}/task"
+
+
+def test_histogram_quantile():
+    """Test that quantiles are interpolated inside their bucket."""
+    histogram = Histogram(buckets=(1.0, 2.0, float('inf')))
+    for value in (0.5, 0.5, 1.5, 1.5):
+        histogram.observe(value)
+    assert histogram.quantile(0.5) == pytest.approx(1.0)
+    assert histogram.quantile(1.0) == pytest.approx(2.0)
+    assert Histogram().quantile(0.99) == 0.0
+
+
+def test_snapshot(recorder):
+    """Test that attempts are aggregated per method and endpoint."""
+    recorder.record("GET", "space/{id}", 200, 0.02, bytes_received=100)
+    recorder.record("GET", "space/{id}", 429, 0.01)
+    recorder.record_retry("GET", "space/{id}")
+    recorder.set_gauge("rate_limit_throttled", 3)
+
+    snapshot = recorder.snapshot()
+    space = snapshot['endpoints']["GET space/{id}"]
+    assert space['requests'] == 2
+    assert space['statuses'] == {"200": 1, "429": 1}
+    assert space['bytes_received'] == 100
+    assert space['retries'] == 1
+    assert snapshot['gauges'] == {"rate_limit_throttled": 3}
+
+
+def test_openmetrics(recorder):
+    """Test the OpenMetrics exposition of histograms and counters."""
+    recorder.record("GET", "team", 200, 0.03)
+    text = recorder.to_openmetrics()
+    assert '# TYPE clickup_request_duration_seconds histogram' in text
+    assert ('clickup_request_duration_seconds_bucket'
+            '{method="GET",endpoint="team",le="+Inf"} 1') in text
+    assert ('clickup_request_duration_seconds_bucket'
+            '{method="GET",endpoint="team",le="0.025"} 0') in text
+    assert 'clickup_responses_total{method="GET",endpoint="team",status="200"} 1' in text
+    assert text.endswith('# EOF\n')
+
+
+def test_write_json(recorder, tmp_path):
+    """Test that .json paths are written as JSON."""
+    recorder.record("POST", "team/{id}/space", 200, 0.1)
+    path = tmp_path / "metrics.json"
+    recorder.write(str(path))
+    assert "POST team/{id}/space" in json.loads(path.read_text())['endpoints']
+
+
+def test_client_records_attempts(recorder, mocker):
+    """Test that the client reports every attempt, including retries."""
+    scheduler = RateLimitScheduler(sleep=lambda seconds: None)
+    client = ClickUpClient(api_token="test_token", scheduler=scheduler, metrics=recorder)
+    mocker.patch.object(client.session, "get", side_effect=[
+        _response(429), _response(200, {"id": "1"})])
+
+    assert client.get_space("1") == {"id": "1"}
+
+    space = recorder.snapshot()['endpoints']["GET space/{id}"]
+    assert space['requests'] == 2
+    assert space['statuses'] == {"429": 1, "200": 1}
+    assert space['retries'] == 1
+    assert space['bytes_received'] == len(b'{}') + len(b'{"id": "1"}')
+
+
+def test_client_records_cache_hits(recorder, tmp_path, mocker):
+    """Test that reads answered from the cache are counted."""
+    client = ClickUpClient(api_token="test_token", metrics=recorder,
+                           cache=ResponseCache(str(tmp_path / "cache.sqlite")))
+    mocker.patch.object(client.session, "get", return_value=_response(200, {"teams": []}))
+
+    client.get_teams()
+    client.get_teams()
+
+    team = recorder.snapshot()['endpoints']["GET team"]
+    assert team['requests'] == 1
+    assert team['cache_hits'] == 1
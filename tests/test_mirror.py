@@ -0,0 +1,67 @@
+import pytest
+
+from src.mirror import Mirror, MirrorSink, OfflineError
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    """Fixture for a Mirror holding a small workspace."""
+    local = Mirror(str(tmp_path / "mirror.sqlite"))
+    local.upsert("team", [{"id": "t1", "name": "Acme"}])
+    local.replace_spaces("t1", [{"id": "s1", "name": "Engineering"},
+                                {"id": "s2", "name": "Marketing 100%"}])
+    local.upsert_tasks("t1", [
+        {"id": "k1", "name": "Fix login", "status": {"status": "open"},
+         "list": {"id": "l1"}, "space": {"id": "s1"}, "priority": "high",
+         "date_updated": "10"},
+        {"id": "k2", "name": "Write docs", "status": {"status": "closed"},
+         "list": {"id": "l1"}, "space": {"id": "s1"}, "date_updated": "20"},
+    ])
+    yield local
+    local.close()
+
+
+def test_reads_match_client_shapes(mirror):
+    """Test that the read methods mirror the ClickUpClient responses."""
+    assert mirror.get_teams() == {"teams": [{"id": "t1", "name": "Acme"}]}
+    assert [s["id"] for s in mirror.get_spaces("t1")["spaces"]] == ["s1", "s2"]
+    assert mirror.get_space("s2")["name"] == "Marketing 100%"
+
+
+def test_query_by_name_substring(mirror):
+    """Test case-insensitive substring search, with LIKE wildcards escaped."""
+    assert [t["id"] for t in mirror.query("task", name="LOGIN")] == ["k1"]
+    assert [s["id"] for s in mirror.query("space", name="100%")] == ["s2"]
+    assert mirror.query("space", name="_") == []
+
+
+def test_query_by_indexed_and_json_attributes(mirror):
+    """Test filtering on indexed columns and on arbitrary JSON fields."""
+    assert [t["id"] for t in mirror.query("task", status="closed")] == ["k2"]
+    assert [t["id"] for t in mirror.query("task", list_id="l1", priority="high")] == ["k1"]
+    with pytest.raises(ValueError):
+        mirror.query("goal")
+
+
+def test_missing_objects_and_mutations_raise_offline_error(mirror):
+    """Test that the mirror refuses what it cannot answer locally."""
+    with pytest.raises(OfflineError):
+        mirror.get_space("missing")
+    with pytest.raises(OfflineError):
+        mirror.create_space("t1", "New Space")
+
+
+def test_sink_stores_crawled_objects(mirror):
+    """Test that crawled folders, lists and tasks land in their tables."""
+    sink = MirrorSink(mirror, batch_size=2)
+    sink.write("folder", "s1", {"id": "f1", "name": "Q3"})
+    sink.write("list", "f1", {"id": "l2", "name": "Backlog", "folder": {"id": "f1"},
+                              "space": {"id": "s1"}})
+    sink.write("task", "l2", {"id": "k3", "name": "Plan", "team_id": "t1",
+                              "list": {"id": "l2"}})
+    sink.flush()
+
+    assert mirror.query("folder", space_id="s1") == [{"id": "f1", "name": "Q3"}]
+    assert [l["id"] for l in mirror.query("list", folder_id="f1")] == ["l2"]
+    assert "k3" in mirror.task_ids("t1")
+    assert sink.total == 3
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from benchmarks.mock_server import MockClickUpServer, MockConfig
+from benchmarks.run import main as run_benchmarks, percentile
+from src.clickup_client import ClickUpClient
+from src.rate_limit import RateLimitScheduler
+
+
+@pytest.fixture
+def server():
+    """Fixture for a small mock ClickUp server."""
+    with MockClickUpServer(MockConfig(teams=1, spaces_per_team=3, tasks_per_list=250)) as server:
+        yield server
+
+
+@pytest.fixture
+def client(server):
+    """Fixture for a ClickUpClient pointed at the mock server."""
+    client = ClickUpClient(api_token="test_token", base_url=server.url,
+                           scheduler=RateLimitScheduler(sleep=lambda seconds: None))
+    yield client
+    client.close()
+
+
+def test_serves_workspace(server, client):
+    """Test that the mock server answers the endpoints the client uses."""
+    assert [team["id"] for team in client.get_teams()["teams"]] == ["1"]
+    assert len(client.get_spaces("1")["spaces"]) == 3
+    assert client.get_space("1_2")["name"] == "Space 1_2"
+    assert len(client.get_folders("1_0")["folders"][0]["lists"]) == 3
+    assert len(list(client.iter_tasks("1_0_0_0"))) == 250
+    assert server.requests == 7
+
+
+def test_space_mutations(client):
+    """Test that created, renamed and deleted spaces are reflected in listings."""
+    created = client.create_space("1", "New Space")
+    client.update_space("1_0", "Renamed")
+    client.delete_space("1_1")
+
+    names = [space["name"] for space in client.get_spaces("1")["spaces"]]
+    assert names == ["Renamed", "Space 1_2", "New Space"]
+    assert created["id"] in {space["id"] for space in client.get_spaces("1")["spaces"]}
+
+
+def test_throttling(server, client):
+    """Test that forced 429 responses are retried by the client."""
+    server.config.throttle_every = 2
+
+    assert client.get_space("1_0")["id"] == "1_0"
+    assert client.get_space("1_1")["id"] == "1_1"
+    assert server.throttled == 1
+    assert client.scheduler.stats.retried == 1
+
+
+def test_percentile():
+    """Test linear interpolation between samples."""
+    assert percentile([1.0, 2.0, 3.0, 4.0], 0.5) == pytest.approx(2.5)
+    assert percentile([5.0], 0.99) == 5.0
+    assert percentile([], 0.5) == 0.0
+
+
+def test_run_records_results(tmp_path, capsys):
+    """Test that a benchmark run reports and appends its results."""
+    results = tmp_path / "results.jsonl"
+    record = run_benchmarks(['--scenario', 'sync', '--ops', '20', '--results', str(results)])
+
+    sync = record["results"]["sync"]
+    assert sync["ops"] == 20 and sync["requests"] == 20
+    assert sync["requests_per_second"] > 0
+    assert json.loads(results.read_text())["results"]["sync"]["ops"] == 20
+    assert "sync" in capsys.readouterr().out
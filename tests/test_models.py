@@ -0,0 +1,99 @@
+import io
+import json
+import pickle
+import tracemalloc
+
+import pytest
+
+from benchmarks.mock_server import MockClickUpServer, MockConfig
+from src.clickup_client import ClickUpClient
+from src.models import Space, Task
+from src.output import write_items
+
+TASK = {
+    "id": "t1", "name": "Write docs", "status": {"status": "open", "color": "#d3d3d3"},
+    "date_updated": "1700000000000", "team_id": "1", "custom_id": None,
+    "assignees": [{"id": 7, "username": "ada"}], "tags": [], "list": {"id": "l1"},
+    "description": "x" * 40,
+}
+
+
+def make_task(index: int) -> dict:
+    return json.loads(json.dumps({**TASK, "id": f"t{index}"}))
+
+
+def test_fields_and_extras():
+    """Test that selected fields are slots and the rest is decoded when first read."""
+    task = Task.from_dict(TASK)
+    assert task.id == "t1" and task.name == "Write docs"
+    assert task.assignees == [{"id": 7, "username": "ada"}]
+    assert task["list"] == {"id": "l1"} and task.get("custom_id", "unset") is None
+    assert task.get("missing", 42) == 42 and "missing" not in task
+    assert "tags" in task and not hasattr(task, "__dict__")
+    with pytest.raises(KeyError):
+        task["missing"]
+    with pytest.raises(AttributeError):
+        task.name = "Other"
+
+
+def test_extras_are_decoded_once(monkeypatch):
+    """Test that repeated reads of extra fields decode the stored JSON only once."""
+    from src import models
+
+    decoded = []
+    loads = models.jsonio.loads
+    monkeypatch.setattr(models.jsonio, "loads", lambda data: decoded.append(data) or loads(data))
+    task = Task.from_dict(TASK)
+    for _ in range(3):
+        assert task.get("tags") == [] and task.assignees[0]["username"] == "ada"
+    assert task.to_dict() == TASK and len(decoded) == 1
+    with pytest.raises(TypeError):
+        task.extra["tags"] = ["changed"]
+
+
+def test_round_trip():
+    """Test that a model converts, serializes and pickles back to the same object."""
+    task = Task.from_dict(TASK)
+    assert task.to_dict() == TASK and task == TASK
+    assert Task.from_dict(task) is task
+    assert pickle.loads(pickle.dumps(task)) == task
+    assert json.loads(write_items_jsonl([task])) == TASK
+    assert Space.from_dict({"id": "s1"}).to_dict() == {"id": "s1"}
+
+
+def write_items_jsonl(items) -> str:
+    out = io.StringIO()
+    write_items(items, "jsonl", out=out)
+    return out.getvalue()
+
+
+def test_models_use_less_memory():
+    """Test that holding tasks as models takes well under half the memory of dicts."""
+    def measure(build):
+        tracemalloc.start()
+        try:
+            items = build()
+            return tracemalloc.get_traced_memory()[0], items
+        finally:
+            tracemalloc.stop()
+
+    dict_bytes, _ = measure(lambda: [make_task(index) for index in range(2000)])
+    model_bytes, _ = measure(lambda: [Task.from_dict(make_task(index)) for index in range(2000)])
+    assert model_bytes < dict_bytes / 2
+
+
+def test_client_returns_models():
+    """Test the client's models option for single objects, listings and streams."""
+    config = MockConfig(teams=1, spaces_per_team=1, folders_per_space=1, lists_per_folder=1,
+                        folderless_lists=0, tasks_per_list=3, latency=0, jitter=0,
+                        payload_bytes=0)
+    with MockClickUpServer(config) as server:
+        client = ClickUpClient("test_token", base_url=server.url, models=True)
+        space = client.get_space("1_0")
+        assert isinstance(space, Space) and space.name == "Space 1_0"
+        assert [type(space) for space in client.get_spaces("1")["spaces"]] == [Space]
+        tasks = list(client.iter_tasks("1_0_0_0"))
+        assert [task.id for task in tasks] == ["1_0_0_0_0", "1_0_0_0_1", "1_0_0_0_2"]
+        assert all(isinstance(task, Task) for task in tasks)
+        assert tasks[0].status == {"status": "closed"}
+        client.close()
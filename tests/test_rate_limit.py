@@ -0,0 +1,137 @@
+import random
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from src.rate_limit import RateLimitScheduler, TokenBucket, parse_retry_after
+
+
+class FakeClock:
+    """A manually advanced clock whose sleep moves time forward."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def make_response(status_code=200, headers=None):
+    """Builds a mock response with the given status and headers."""
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    return response
+
+
+@pytest.fixture
+def clock():
+    """Fixture for a fake clock."""
+    return FakeClock()
+
+
+@pytest.fixture
+def scheduler(clock):
+    """Fixture for a scheduler driven by the fake clock."""
+    return RateLimitScheduler(requests_per_minute=60, max_retries=2,
+                              clock=clock, sleep=clock.sleep,
+                              rng=random.Random(0))
+
+
+def test_token_bucket_paces_after_burst(clock):
+    """Test that the bucket allows a burst and then paces to its rate."""
+    bucket = TokenBucket(rate=2.0, capacity=2, clock=clock, sleep=clock.sleep)
+
+    waits = [bucket.acquire() for _ in range(4)]
+
+    assert waits == [0.0, 0.0, 0.5, 0.5]
+
+
+def test_token_bucket_sync_drains_until_reset(clock):
+    """Test that an exhausted server budget blocks until the reset."""
+    bucket = TokenBucket(rate=1.0, capacity=10, clock=clock, sleep=clock.sleep)
+
+    bucket.sync(remaining=0, reset_in=5)
+
+    assert bucket.acquire() == pytest.approx(6.0)
+
+
+def test_parse_retry_after():
+    """Test parsing both forms of Retry-After."""
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:10 GMT",
+                             now=1445412480.0) == 10.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+
+
+def test_scheduler_retries_429_honouring_retry_after(scheduler, clock):
+    """Test that a 429 is retried after the Retry-After delay."""
+    responses = [make_response(429, {"Retry-After": "2"}), make_response(200)]
+    send = MagicMock(side_effect=responses)
+
+    response = scheduler.send(send)
+
+    assert response.status_code == 200
+    assert send.call_count == 2
+    assert 2.0 <= clock.sleeps[-1] <= 2.5
+    assert scheduler.stats.retried == 1
+    assert scheduler.stats.dropped == 0
+
+
+def test_scheduler_drops_after_max_retries(scheduler):
+    """Test that the last rejection is returned once retries are exhausted."""
+    send = MagicMock(return_value=make_response(503))
+
+    response = scheduler.send(send)
+
+    assert response.status_code == 503
+    assert send.call_count == 3
+    assert scheduler.stats.as_dict() == {
+        "requests": 3, "throttled": 0, "retried": 2, "dropped": 1}
+
+
+def test_scheduler_does_not_retry_server_errors_for_post(scheduler):
+    """Test that non-idempotent requests are not replayed on a 5xx."""
+    send = MagicMock(return_value=make_response(502))
+
+    response = scheduler.send(send, idempotent=False)
+
+    assert response.status_code == 502
+    assert send.call_count == 1
+
+
+def test_scheduler_retries_connection_errors(scheduler):
+    """Test that connection failures are retried for idempotent requests."""
+    send = MagicMock(side_effect=[requests.ConnectionError(), make_response(200)])
+
+    assert scheduler.send(send).status_code == 200
+    assert scheduler.stats.retried == 1
+
+
+def test_scheduler_adopts_server_limit(scheduler):
+    """Test that the X-RateLimit-Limit header resizes the bucket."""
+    scheduler.observe(make_response(200, {"X-RateLimit-Limit": "900",
+                                          "X-RateLimit-Remaining": "899"}))
+
+    assert scheduler.bucket.rate == 15.0
+    assert scheduler.bucket.capacity == 900
+
+
+def test_scheduler_counts_throttled_requests(clock):
+    """Test that requests delayed by the bucket are counted."""
+    scheduler = RateLimitScheduler(requests_per_minute=1, clock=clock,
+                                   sleep=clock.sleep)
+    send = MagicMock(return_value=make_response(200))
+
+    scheduler.send(send)
+    scheduler.send(send)
+
+    assert scheduler.stats.throttled == 1
+    assert clock.sleeps == [60.0]
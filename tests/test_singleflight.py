@@ -0,0 +1,155 @@
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.async_client import AsyncClickUpClient
+from src.clickup_client import ClickUpClient
+from src.metrics import MetricsRecorder
+from src.singleflight import SingleFlight
+from src.transport import build_response
+
+CALLERS = 5
+
+
+def _slow_get(release: threading.Event, body):
+    """Returns a session.get replacement that blocks until ``release`` is set."""
+    def get(url, **kwargs):
+        release.wait(5)
+        response = MagicMock()
+        response.status_code = 200
+        response.headers = {}
+        response.content = json.dumps(body).encode()
+        return response
+    return MagicMock(side_effect=get)
+
+
+def _wait_for_callers(flight: SingleFlight, count: int):
+    """Waits until ``count`` callers joined the first call."""
+    for _ in range(500):
+        if flight.deduplicated >= count:
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError(f"only {flight.deduplicated} callers joined")
+
+
+def test_concurrent_calls_share_one_execution():
+    """Test that callers arriving during a call receive its result."""
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        release.wait(5)
+        return "result"
+
+    with ThreadPoolExecutor(CALLERS) as executor:
+        futures = [executor.submit(flight.do, "key", work) for _ in range(CALLERS)]
+        _wait_for_callers(flight, CALLERS - 1)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(calls) == 1
+    assert sorted(results) == [("result", False)] + [("result", True)] * (CALLERS - 1)
+    assert (flight.executed, flight.deduplicated) == (1, CALLERS - 1)
+
+
+def test_errors_are_shared_and_not_cached():
+    """Test that waiters receive the exception and later calls run again."""
+    flight = SingleFlight()
+    with pytest.raises(ValueError):
+        flight.do("key", lambda: (_ for _ in ()).throw(ValueError("boom")))
+    assert flight.do("key", lambda: 42) == (42, False)
+    assert flight.executed == 2
+
+
+def test_client_coalesces_identical_gets():
+    """Test that concurrent get_space calls send one request with separate results."""
+    metrics = MetricsRecorder()
+    client = ClickUpClient(api_token="test_token", metrics=metrics)
+    release = threading.Event()
+    client.session.get = _slow_get(release, {"id": "456", "name": "Test Space"})
+
+    with ThreadPoolExecutor(CALLERS) as executor:
+        futures = [executor.submit(client.get_space, "456") for _ in range(CALLERS)]
+        _wait_for_callers(client.singleflight, CALLERS - 1)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert client.session.get.call_count == 1
+    assert all(result == {"id": "456", "name": "Test Space"} for result in results)
+    assert len({id(result) for result in results}) == CALLERS
+    assert metrics.snapshot()['endpoints']["GET space/{id}"]['coalesced'] == CALLERS - 1
+
+
+def test_client_coalesces_streamed_listings():
+    """Test that concurrent iter_spaces calls share one streamed body, chunk by chunk."""
+    metrics = MetricsRecorder()
+    client = ClickUpClient(api_token="test_token", metrics=metrics)
+    release = threading.Event()
+    spaces = [{"id": str(index), "name": "x" * 500} for index in range(300)]
+    body = json.dumps({"spaces": spaces}).encode()
+
+    def get(url, **kwargs):
+        release.wait(5)
+        return build_response("GET", url, 200, {}, body)
+
+    client.session.get = MagicMock(side_effect=get)
+    with ThreadPoolExecutor(CALLERS) as executor:
+        futures = [executor.submit(lambda: list(client.iter_spaces("123")))
+                   for _ in range(CALLERS)]
+        _wait_for_callers(client.singleflight, CALLERS - 1)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert client.session.get.call_count == 1
+    assert all(result == spaces for result in results)
+    assert metrics.snapshot()['endpoints']["GET team/{id}/space"]['coalesced'] == CALLERS - 1
+    assert metrics.snapshot()['endpoints']["GET team/{id}/space"]['bytes_received'] == len(body)
+    assert list(client.iter_spaces("123")) == spaces  # nothing is kept once read
+    assert client.session.get.call_count == 2
+
+
+def test_async_tasks_are_coalesced():
+    """Test that async tasks share requests through the underlying client."""
+    client = ClickUpClient(api_token="test_token")
+    release = threading.Event()
+    client.session.get = _slow_get(release, {"spaces": []})
+
+    async def run():
+        async with AsyncClickUpClient("test_token", max_concurrency=CALLERS,
+                                      client=client) as async_client:
+            tasks = [asyncio.ensure_future(async_client.get_spaces("123"))
+                     for _ in range(CALLERS)]
+            await asyncio.get_running_loop().run_in_executor(
+                None, _wait_for_callers, client.singleflight, CALLERS - 1)
+            release.set()
+            return await asyncio.gather(*tasks)
+
+    assert asyncio.run(run()) == [{"spaces": []}] * CALLERS
+    assert client.session.get.call_count == 1
+
+
+def test_mutation_starts_new_flights():
+    """Test that reads after a mutation do not join reads started before it."""
+    client = ClickUpClient(api_token="test_token")
+    release = threading.Event()
+    client.session.get = _slow_get(release, {"id": "456"})
+    client.session.put = MagicMock(return_value=MagicMock(status_code=200, content=b"{}"))
+
+    with ThreadPoolExecutor(2) as executor:
+        before = executor.submit(client.get_space, "456")
+        for _ in range(500):
+            if client.session.get.call_count:
+                break
+            threading.Event().wait(0.01)
+        client.update_space("456", "Renamed")
+        after = executor.submit(client.get_space, "456")
+        release.set()
+        before.result(), after.result()
+
+    assert client.session.get.call_count == 2
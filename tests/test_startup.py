@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(ROOT, "src", "main.py")
+
+# Generous budgets: a cold start measures well under a tenth of these, so only
+# a heavy import creeping back into the start-up path should trip them.
+IMPORT_BUDGET_SECONDS = 0.25
+HELP_BUDGET_SECONDS = 1.5
+# Modules only a running command may load.
+DEFERRED_MODULES = ('requests', 'dotenv', 'sqlite3', 'asyncio', 'orjson', 'src.jsonio')
+
+
+def _import_profile(stderr: str) -> dict:
+    """Parses ``python -X importtime`` output into cumulative seconds per module."""
+    profile = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        profile[name.strip()] = int(cumulative) / 1_000_000
+    return profile
+
+
+def test_help_defers_heavy_imports(tmp_path):
+    """Test that --help neither imports the heavy modules nor creates the log file."""
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", MAIN, "--help"],
+                            cwd=tmp_path, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+
+    assert result.returncode == 0
+    assert "usage:" in result.stdout
+    loaded = _import_profile(result.stderr)
+    assert [name for name in DEFERRED_MODULES if name in loaded] == []
+    assert not (tmp_path / "clickup_agent.log").exists()
+    assert elapsed < HELP_BUDGET_SECONDS
+
+
+def test_import_time_budget(tmp_path):
+    """Test that importing the CLI module stays within its start-up budget."""
+    code = f"import sys; sys.path.insert(0, {ROOT!r}); import src.main"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            cwd=tmp_path, capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    assert _import_profile(result.stderr)["src.main"] < IMPORT_BUDGET_SECONDS
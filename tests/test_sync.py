@@ -0,0 +1,84 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.mirror import Mirror
+from src.sync import WATERMARK_OVERLAP_MS, SyncEngine
+
+
+def task(task_id, updated):
+    """Builds a minimal task payload."""
+    return {"id": task_id, "name": f"Task {task_id}", "date_updated": str(updated)}
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Fixture for a Mirror in a temporary directory."""
+    mirror = Mirror(str(tmp_path / "mirror.sqlite"))
+    yield mirror
+    mirror.close()
+
+
+@pytest.fixture
+def client():
+    """Fixture for a mocked ClickUpClient with one team."""
+    mock = MagicMock()
+    mock.get_teams.return_value = {"teams": [{"id": "t1"}]}
+    mock.get_spaces.return_value = {"spaces": [{"id": "s1", "name": "Space"}]}
+    return mock
+
+
+def test_first_sync_pulls_everything_and_sets_watermark(client, store):
+    """Test that the first run has no filter and records the newest update."""
+    client.iter_team_tasks.return_value = iter([task("a", 1000), task("b", 3000)])
+
+    [result] = SyncEngine(client, store).sync()
+
+    assert result["tasks_changed"] == 2
+    client.iter_team_tasks.assert_called_once_with(
+        "t1", include_closed=True, subtasks=True)
+    assert store.get_state("t1") == {"watermark": 3000, "runs_since_reconcile": 0}
+    assert store.task_ids("t1") == {"a", "b"}
+    assert store.get_teams() == {"teams": [{"id": "t1"}]}
+
+
+def test_next_sync_only_asks_for_changes(client, store):
+    """Test that later runs filter on the stored watermark."""
+    store.set_state("t1", 5_000_000, 0)
+    client.iter_team_tasks.return_value = iter([task("c", 5_000_100)])
+
+    [result] = SyncEngine(client, store).sync(["t1"])
+
+    assert result == {"team_id": "t1", "tasks_changed": 1, "tasks_deleted": 0,
+                      "spaces_removed": 0, "reconciled": False}
+    client.iter_team_tasks.assert_called_once_with(
+        "t1", include_closed=True, subtasks=True,
+        date_updated_gt=5_000_000 - WATERMARK_OVERLAP_MS)
+    assert store.get_state("t1") == {"watermark": 5_000_100, "runs_since_reconcile": 1}
+
+
+def test_reconciliation_removes_deleted_tasks(client, store):
+    """Test that the periodic ID-set comparison deletes vanished tasks."""
+    store.upsert_tasks("t1", [task("a", 1), task("b", 2)])
+    store.set_state("t1", 100_000, 2)
+    client.iter_team_tasks.return_value = iter([task("a", 1), task("c", 70_000)])
+
+    [result] = SyncEngine(client, store, reconcile_every=3).sync(["t1"])
+
+    # One unfiltered pass both refreshes the tasks and finds the deletions.
+    client.iter_team_tasks.assert_called_once_with("t1", include_closed=True, subtasks=True)
+    assert result["reconciled"] is True
+    assert result["tasks_deleted"] == 1 and result["tasks_changed"] == 1
+    assert store.task_ids("t1") == {"a", "c"}
+    assert store.get_state("t1")["runs_since_reconcile"] == 0
+
+
+def test_spaces_are_replaced_every_run(client, store):
+    """Test that spaces removed on the server disappear locally."""
+    store.replace_spaces("t1", [{"id": "s1"}, {"id": "s2"}])
+    store.set_state("t1", 10, 0)
+    client.iter_team_tasks.return_value = iter([])
+
+    [result] = SyncEngine(client, store).sync(["t1"])
+
+    assert result["spaces_removed"] == 1
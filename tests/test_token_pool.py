@@ -0,0 +1,125 @@
+import io
+import json
+import queue
+import sys
+from collections import Counter
+
+import pytest
+
+from benchmarks.mock_server import MockClickUpServer, MockConfig
+from src.token_pool import (QueueSink, TokenPool, TokenUsage, crawl_teams, mask, parse_tokens,
+                            run_batch)
+
+
+@pytest.fixture(scope="module")
+def server():
+    config = MockConfig(teams=4, spaces_per_team=2, folders_per_space=1, lists_per_folder=1,
+                        folderless_lists=1, tasks_per_list=3, latency=0, jitter=0,
+                        payload_bytes=0)
+    with MockClickUpServer(config) as server:
+        yield server
+
+
+@pytest.fixture(scope="module")
+def pool(server):
+    with TokenPool(["pk_first_token_1111", "pk_second_token_2222"], base_url=server.url,
+                   concurrency=4) as pool:
+        yield pool
+
+
+def test_parse_tokens():
+    """Test that tokens may be separated by commas or whitespace and are deduplicated."""
+    assert parse_tokens("a, b\nc,,a") == ["a", "b", "c"]
+    assert parse_tokens(None) == []
+
+
+def test_usage_reporting():
+    """Test masking and the share of the rate budget used."""
+    assert mask("pk_first_token_1111") == "...1111"
+    usage = TokenUsage("...1111", requests=50, limit_per_minute=100)
+    assert usage.utilisation(60) == 0.5
+    assert usage.as_dict(30)["utilisation"] == 1.0
+
+
+def test_pool_requires_tokens():
+    """Test that an empty pool is rejected."""
+    with pytest.raises(ValueError):
+        TokenPool([])
+
+
+def test_crawl_teams(pool):
+    """Test that team crawls are spread over the tokens and merged into one stream."""
+    records = list(crawl_teams(pool, ["1", "2", "3", "4"]))
+    counts = Counter(record["type"] for record in records)
+    assert counts == {"team": 4, "space": 8, "folder": 8, "list": 16, "task": 48}
+    report = pool.report()
+    assert [usage["token"] for usage in report] == ["...1111", "...2222"]
+    assert all(usage["jobs"] >= 1 and usage["requests"] > 0 for usage in report)
+    assert sum(usage["jobs"] for usage in report) == 4
+    assert "...2222" in pool.summary()
+
+
+def test_records_stream_in_chunks():
+    """Test that workers send records in bounded chunks followed by an end marker."""
+    records = queue.Queue()
+    sink = QueueSink(records, job_id=7, chunk_size=2)
+    for index in range(5):
+        sink.write("task", "list", {"id": str(index)})
+    sink.close()
+    messages = [records.get_nowait() for _ in range(records.qsize())]
+    assert [(kind, job_id, len(chunk or [])) for kind, job_id, chunk in messages] == [
+        ("records", 7, 2), ("records", 7, 2), ("records", 7, 1), ("end", 7, 0)]
+    assert sink.counts == {"task": 5}
+
+
+def test_abandoned_run_does_not_leak_records(pool):
+    """Test that records of an abandoned run are not mixed into the next one."""
+    records = crawl_teams(pool, ["1", "2", "3", "4"])
+    next(records)
+    records.close()
+    counts = Counter(record["type"] for record in crawl_teams(pool, ["1", "2"]))
+    assert counts == {"team": 2, "space": 4, "folder": 4, "list": 8, "task": 24}
+
+
+def test_run_batch(pool, server):
+    """Test that batch results from every worker are written with a summary."""
+    operations = [(number, {"op": "create-space", "team_id": "1", "name": f"Pooled {number}"})
+                  for number in range(1, 8)]
+    operations.append((8, {"op": "nope"}))
+    output = io.StringIO()
+    summary = run_batch(pool, iter(operations), output, skip={1}, chunk_size=2)
+    assert summary == {"succeeded": 6, "failed": 1, "skipped": 1}
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert sorted(record["line"] for record in records) == list(range(2, 9))
+    names = {space["name"] for space in server.workspace.spaces("1")}
+    assert {f"Pooled {number}" for number in range(2, 8)} <= names
+
+
+def test_cli_crawl_with_token_pool(server, tmp_path, monkeypatch, capsys):
+    """Test that crawl --token-pool writes one snapshot and reports each token."""
+    from src.main import main
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("CLICKUP_API_TOKEN", "pk_first_token_1111")
+    monkeypatch.setenv("CLICKUP_API_TOKENS", "pk_first_token_1111,pk_second_token_2222")
+    monkeypatch.setattr("sys.argv", ["main.py", "--base-url", server.url, "crawl",
+                                     "snapshot.jsonl", "--token-pool", "--no-tasks",
+                                     "--team", "2", "--team", "3"])
+    main()
+    captured = capsys.readouterr()
+    assert "Crawled 18 objects (2 teams, 4 spaces, 4 folders, 8 lists, 0 tasks)" in captured.out
+    assert "...1111" in captured.err and "...2222" in captured.err
+    assert len((tmp_path / "snapshot.jsonl").read_text().splitlines()) == 18
+
+
+def test_cli_rejects_options_workers_ignore(server, monkeypatch, capsys):
+    """Test that --token-pool refuses client options its workers would not apply."""
+    from src.main import main
+
+    monkeypatch.setenv("CLICKUP_API_TOKEN", "pk_first_token_1111")
+    monkeypatch.setattr(sys, "argv", ["main.py", "--base-url", server.url, "--cache", "c.sqlite",
+                                      "--inject-errors", "0.1", "crawl", "snapshot.jsonl",
+                                      "--token-pool", "--adaptive"])
+    assert main() == 1
+    assert ("--token-pool cannot be combined with --cache, --inject-errors, --adaptive."
+            in capsys.readouterr().out)
@@ -0,0 +1,93 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+import requests
+
+from benchmarks.mock_server import MockClickUpServer, MockConfig
+from src.clickup_client import ClickUpClient
+from src.transport import (HttpxTransport, RecordingTransport, ReplayTransport,
+                           RequestsTransport, build_response)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG = MockConfig(teams=1, spaces_per_team=2, folders_per_space=0, lists_per_folder=0,
+                    folderless_lists=0, tasks_per_list=3, latency=0, jitter=0, payload_bytes=0)
+
+
+def exercise(client):
+    """Makes one of each kind of call: a read, a streamed listing and a mutation."""
+    return (client.get_spaces("1"), list(client.iter_tasks("1_0_0_0")),
+            client.create_space("1", "Recorded"))
+
+
+def test_record_and_replay(tmp_path):
+    """Test that a recording replays the same results without a server."""
+    path = str(tmp_path / "exchanges.jsonl")
+    with MockClickUpServer(CONFIG) as server:
+        recorder = RecordingTransport(RequestsTransport(), path)
+        client = ClickUpClient("secret_token", base_url=server.url, transport=recorder)
+        recorded = exercise(client)
+        client.close()
+
+    with open(path) as stream:
+        exchanges = [json.loads(line) for line in stream]
+    assert [exchange["method"] for exchange in exchanges] == ["GET", "GET", "POST"]
+    assert "secret_token" not in open(path).read()
+
+    client = ClickUpClient("test_token", base_url=server.url, transport=ReplayTransport(path))
+    assert exercise(client) == recorded
+    with pytest.raises(requests.HTTPError):
+        client.get_space("unknown")
+
+
+def test_strict_replay(tmp_path):
+    """Test that a strict replay refuses requests that were not recorded."""
+    path = tmp_path / "empty.jsonl"
+    path.write_text("")
+    client = ClickUpClient("test_token", transport=ReplayTransport(str(path), strict=True))
+    with pytest.raises(LookupError):
+        client.get_teams()
+
+
+def test_build_response():
+    """Test that built responses behave like real ones for the client."""
+    response = build_response("GET", "http://x/team", 429, {"Retry-After": "1"}, b'{"err": 1}')
+    assert response.json() == {"err": 1} and response.headers["retry-after"] == "1"
+    assert b"".join(response.iter_content(2)) == b'{"err": 1}'
+    with pytest.raises(requests.HTTPError):
+        response.raise_for_status()
+
+
+def test_httpx_transport():
+    """Test the httpx transport against the mock server."""
+    pytest.importorskip("httpx")
+    with MockClickUpServer(CONFIG) as server:
+        client = ClickUpClient("test_token", base_url=server.url,
+                               transport=HttpxTransport(http2=False))
+        assert [space["id"] for space in client.get_spaces("1")["spaces"]] == ["1_0", "1_1"]
+        assert len(list(client.iter_tasks("1_0_0_0"))) == 3
+        client.close()
+
+
+def test_root_shims(tmp_path):
+    """Test that the root modules run the src client and CLI, legacy flags included."""
+    recording = tmp_path / "teams.jsonl"
+    recording.write_text(json.dumps({
+        "method": "GET", "url": "https://api.clickup.com/api/v2/team", "request_body": "",
+        "status": 200, "headers": {}, "body": '{"teams": [{"id": "7", "name": "Replayed"}]}',
+    }) + "\n")
+    env = dict(os.environ, CLICKUP_API_TOKEN="test_token")
+    env.pop("CLICKUP_BASE_URL", None)
+    code = ("import sys; path = list(sys.path); import clickup_client; "
+            "print(clickup_client.__file__); print(sys.path == path, 'models' in sys.modules)")
+    shim = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env,
+                          capture_output=True, text=True, check=True)
+    # The shim leaves sys.path alone and adds no top-level names such as models.
+    assert shim.stdout.split() == [os.path.join(ROOT, "src", "clickup_client.py"), "True", "False"]
+
+    legacy = subprocess.run(
+        [sys.executable, os.path.join(ROOT, "main.py"), "--replay", str(recording),
+         "--list-teams"], cwd=tmp_path, env=env, capture_output=True, text=True, check=True)
+    assert "- Name: Replayed, ID: 7" in legacy.stdout
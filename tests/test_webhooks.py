@@ -0,0 +1,105 @@
+import json
+
+import pytest
+import requests
+
+from benchmarks.mock_server import MockClickUpServer, MockConfig
+from src.cache import ResponseCache
+from src.clickup_client import ClickUpClient
+from src.mirror import Mirror
+from src.webhooks import (EventProcessor, EventQueue, WebhookReceiver, registered_webhooks,
+                          sign, verify_signature)
+
+# Deliveries as ClickUp sends them, trimmed to the fields the processor reads.
+RECORDED_EVENTS = [
+    {"event": "spaceUpdated", "space_id": "1_0", "webhook_id": "wh1"},
+    {"event": "taskUpdated", "task_id": "1_0_0_0_3", "webhook_id": "wh1",
+     "history_items": [{"field": "name", "before": "Task 1_0_0_0_3", "after": "Renamed"}]},
+    {"event": "taskDeleted", "task_id": "1_0_0_0_4", "webhook_id": "wh1"},
+    {"event": "folderCreated", "folder_id": "1_0_9", "webhook_id": "wh1"},
+]
+
+
+@pytest.fixture
+def server():
+    config = MockConfig(teams=1, spaces_per_team=2, folders_per_space=1, lists_per_folder=1,
+                        folderless_lists=0, tasks_per_list=5, latency=0, jitter=0,
+                        payload_bytes=0)
+    with MockClickUpServer(config) as server:
+        yield server
+
+
+@pytest.fixture
+def client(server, tmp_path):
+    client = ClickUpClient("test_token", base_url=server.url,
+                           cache=ResponseCache(str(tmp_path / "cache.sqlite")))
+    yield client
+    client.close()
+
+
+def deliver(receiver, event, secret):
+    body = json.dumps(event).encode("utf-8")
+    return requests.post(receiver.url, data=body, headers={"X-Signature": sign(secret, body)})
+
+
+def test_verify_signature():
+    """Test that only the signature of the exact body with the right secret passes."""
+    body = b'{"event": "taskUpdated"}'
+    signature = sign("secret", body)
+    assert verify_signature("secret", body, signature)
+    assert not verify_signature("other", body, signature)
+    assert not verify_signature("secret", body + b" ", signature)
+    assert not verify_signature("secret", body, None)
+
+
+def test_client_webhooks(client, server):
+    """Test registering, listing and deleting webhooks."""
+    created = client.create_webhook("1", "https://example.com/hook", events=["taskUpdated"])
+    webhook_id = created["id"]
+    assert created["webhook"]["events"] == ["taskUpdated"]
+    hooks = registered_webhooks(client, ["1"])
+    assert hooks[webhook_id]["secret"] == created["webhook"]["secret"]
+    assert hooks[webhook_id]["team_id"] == "1"
+
+    client.delete_webhook(webhook_id)
+    assert client.get_webhooks("1") == {"webhooks": []}
+
+
+def test_receiver_applies_recorded_events(client, server, tmp_path):
+    """Test that signed deliveries update the mirror and the cache without polling."""
+    mirror = Mirror(str(tmp_path / "mirror.sqlite"))
+    mirror.upsert("space", [{"id": "1_0", "name": "Space 1_0"}], parent_id="1")
+    mirror.upsert_tasks("1", [{"id": "1_0_0_0_4", "name": "Doomed"}])
+    assert client.get_space("1_0")["name"] == "Space 1_0"  # now cached
+    listings = (lambda: client.get_tasks("1_0_0_0"), lambda: client.get_team_tasks("1"))
+    for listing in listings:
+        assert listing()["tasks"]  # now cached
+    server.workspace.rename_space("1_0", "Renamed space")
+    server.workspace.rename_task("1_0_0_0_3", "Renamed")
+
+    events = EventQueue(EventProcessor(client, mirror=mirror, teams={"wh1": "1"})).start()
+    with WebhookReceiver(events, {"wh1": "s3cret"}) as receiver:
+        for event in RECORDED_EVENTS:
+            assert deliver(receiver, event, "s3cret").status_code == 200
+        events.join()
+    events.stop()
+
+    assert events.processed == len(RECORDED_EVENTS) and events.failed == 0
+    assert mirror.get_space("1_0")["name"] == "Renamed space"
+    assert [task["name"] for task in mirror.query("task")] == ["Renamed"]
+    assert client.get_space("1_0")["name"] == "Renamed space"
+    for listing in listings:
+        names = [task["name"] for task in listing()["tasks"] if task["id"].startswith("1_0_0_0")]
+        assert "Renamed" in names and "Task 1_0_0_0_3" not in names
+    mirror.close()
+
+
+def test_receiver_rejects_bad_signatures(client):
+    """Test that unsigned, mis-signed and malformed deliveries are not queued."""
+    events = EventQueue(EventProcessor(client))
+    with WebhookReceiver(events, {"wh1": "s3cret"}) as receiver:
+        assert deliver(receiver, RECORDED_EVENTS[0], "wrong").status_code == 401
+        unknown = dict(RECORDED_EVENTS[0], webhook_id="wh2")
+        assert deliver(receiver, unknown, "s3cret").status_code == 401
+        assert requests.post(receiver.url, data=b"{").status_code == 400
+        assert receiver.rejected == 2 and receiver.received == 0